@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark BM25 search: Qdrant sparse vectors vs the local scipy CSR index.
+
+Builds a local index from the prepared FAQ in a temporary directory and replays FAQ
+questions against both backends (the Qdrant collection must already be ingested).
+
+Usage:
+    python scripts/bench_bm25.py [--requests 512] [--k 10] [--batch 32]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.rag_core.config import Settings
+from src.rag_core.storage import BM25QdrantClient, LocalBM25Index, client_from_settings
+from src.workers.ingest import bm25_documents_for, item_questions
+
+
+def qps(fn: Any, queries: list[str]) -> float:
+    """Run fn over all queries and return queries per second."""
+    t0 = time.perf_counter()
+    fn(queries)
+    return len(queries) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    with open("data/prepared/faq_prepared.json", encoding="utf-8") as f:
+        faq_data = json.load(f)
+    documents = [doc for item in faq_data for doc in bm25_documents_for(item)]
+    questions = [q for item in faq_data for q in item_questions(item)]
+    queries = (questions * (args.requests // len(questions) + 1))[: args.requests]
+
+    s = Settings()
+    qdrant = BM25QdrantClient(s.qdrant_url, client=client_from_settings(s))
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        local = LocalBM25Index.build(tmp, documents)
+        print(f"Built local index: {len(documents)} docs in {time.perf_counter() - t0:.2f}s")
+
+        def run_qdrant(qs: list[str]) -> None:
+            for q in qs:
+                qdrant.search(q, k=args.k)
+
+        def run_local(qs: list[str]) -> None:
+            for q in qs:
+                local.search(q, k=args.k)
+
+        def run_local_batch(qs: list[str]) -> None:
+            for start in range(0, len(qs), args.batch):
+                local.search_batch(qs[start : start + args.batch], k=args.k)
+
+        # Warm up (Qdrant client loads its BM25 tokenizer on first use)
+        run_qdrant(queries[:4])
+        run_local(queries[:4])
+
+        print(f"{'backend':>24} {'QPS':>10}")
+        print(f"{'qdrant':>24} {qps(run_qdrant, queries):>10.1f}")
+        print(f"{'local':>24} {qps(run_local, queries):>10.1f}")
+        print(f"{f'local batch={args.batch}':>24} {qps(run_local_batch, queries):>10.1f}")
+
+        sample = queries[:100]
+        agree = sum(
+            {h[1]["original_id"] for h in qdrant.search(q, k=1)}
+            == {h[1]["original_id"] for h in local.search(q, k=1)}
+            for q in sample
+        )
+        print(f"Top-1 FAQ item agreement: {agree}/{len(sample)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark query embedding QPS: direct encode_one vs BatchingEmbedder.
+
+Usage:
+    python scripts/bench_embedder.py [--requests 512] [--window-ms 3] [--max-batch 32]
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.rag_core.config import Settings
+from src.rag_core.embeddings import BatchingEmbedder, FastEmbedEmbeddings
+
+
+def load_questions(limit: int) -> list[str]:
+    """Load FAQ questions (original + generated) to use as query traffic."""
+    faq_path = Path("data/prepared/faq_prepared.json")
+    with open(faq_path, encoding="utf-8") as f:
+        faq_data = json.load(f)
+
+    questions = []
+    for item in faq_data:
+        questions.append(item["original_question"])
+        generated = item["generated_questions"]
+        if isinstance(generated, dict):
+            generated = list(generated.values())
+        questions.extend(str(q) for q in generated)
+
+    # Repeat to reach the requested traffic volume
+    return (questions * (limit // len(questions) + 1))[:limit]
+
+
+def run(embedder: Any, queries: list[str], concurrency: int) -> float:
+    """Fire queries through encode_one from `concurrency` threads, return QPS."""
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(embedder.encode_one, queries))
+    return len(queries) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--window-ms", type=float, default=3.0)
+    parser.add_argument("--max-batch", type=int, default=32)
+    args = parser.parse_args()
+
+    s = Settings()
+    base = FastEmbedEmbeddings(s.embedding_model)
+    batched = BatchingEmbedder(base, max_batch=args.max_batch, window_ms=args.window_ms)
+    queries = load_questions(args.requests)
+
+    # Warm up ONNX session
+    base.encode(queries[:8])
+
+    print(f"{'clients':>8} {'direct QPS':>12} {'batched QPS':>12} {'speedup':>8}")
+    for concurrency in (1, 8, 32):
+        direct_qps = run(base, queries, concurrency)
+        batched_qps = run(batched, queries, concurrency)
+        print(
+            f"{concurrency:>8} {direct_qps:>12.1f} {batched_qps:>12.1f} "
+            f"{batched_qps / direct_qps:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
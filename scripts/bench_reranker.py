@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Benchmark rerankers: cross-encoder vs late interaction with precomputed token vectors.
+
+Every generated question of a FAQ item is a query whose correct answer is that item.
+Each query gets a candidate pool of its own item plus randomly drawn other items, and
+both rerankers order the pool. Reports per-query latency and recall@1 / recall@k.
+
+Usage:
+    python scripts/bench_reranker.py [--candidates 20] [--queries 200] [--k 3]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.rag_core.config import Settings
+from src.rag_core.retrieval import (
+    CrossEncoderReranker,
+    LateInteractionReranker,
+    is_late_interaction_model,
+)
+from src.rag_core.storage import TokenVectorStore
+from src.workers.ingest import dense_text, item_questions
+
+
+def evaluate(
+    reranker: Any, queries: list[tuple[str, str, list[tuple[str, dict]]]], k: int
+) -> dict[str, float]:
+    """Rerank every query's pool; return latency percentiles and recall."""
+    latencies, hit1, hitk = [], 0, 0
+    for query, answer_id, pool in queries:
+        t0 = time.perf_counter()
+        ranked = reranker.rerank(query, pool)
+        latencies.append(time.perf_counter() - t0)
+        ids = [meta["source_id"] for _, meta in ranked]
+        hit1 += ids[0] == answer_id
+        hitk += answer_id in ids[:k]
+    ms = np.array(latencies) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "recall@1": hit1 / len(queries),
+        f"recall@{k}": hitk / len(queries),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cross-encoder", default=None)
+    parser.add_argument("--late-interaction", default="answerdotai/answerai-colbert-small-v1")
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    s = Settings()
+    cross_encoder = args.cross_encoder or (
+        "jinaai/jina-reranker-v1-turbo-en"
+        if is_late_interaction_model(s.reranker_model)
+        else s.reranker_model
+    )
+
+    with open("data/prepared/faq_prepared.json", encoding="utf-8") as f:
+        faq_data = json.load(f)
+    docs = [(dense_text(item), {"source_id": f"{item['id']}#0"}) for item in faq_data]
+
+    rng = np.random.default_rng(args.seed)
+    queries = []
+    for i, item in enumerate(faq_data):
+        others = [j for j in range(len(docs)) if j != i]
+        for question in item_questions(item)[1:]:
+            drawn = rng.choice(others, size=min(args.candidates - 1, len(others)), replace=False)
+            pool = [docs[j] for j in rng.permutation([i, *drawn])]
+            queries.append((question, f"{item['id']}#0", pool))
+    queries = [queries[j] for j in rng.permutation(len(queries))[: args.queries]]
+    print(f"{len(queries)} queries, {min(args.candidates, len(docs))} candidates each")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        late = LateInteractionReranker(args.late_interaction, lazy=False)
+        t0 = time.perf_counter()
+        late.store = TokenVectorStore.build(
+            tmp,
+            [meta["source_id"] for _, meta in docs],
+            late.model.passage_embed([text for text, _ in docs]),  # type: ignore[union-attr]
+        )
+        print(f"Precomputed token vectors for {len(docs)} items in {time.perf_counter() - t0:.2f}s")
+
+        rerankers = {
+            cross_encoder: CrossEncoderReranker(cross_encoder, lazy=False),
+            args.late_interaction: late,
+        }
+        for reranker in rerankers.values():
+            reranker.rerank(queries[0][0], queries[0][2])  # warm up
+
+        print(f"{'reranker':>40} {'p50 ms':>8} {'p95 ms':>8} {'R@1':>6} {f'R@{args.k}':>6}")
+        for name, reranker in rerankers.items():
+            r = evaluate(reranker, queries, args.k)
+            print(
+                f"{name:>40} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+                f"{r['recall@1']:>6.2f} {r[f'recall@{args.k}']:>6.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
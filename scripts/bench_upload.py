@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark Qdrant write throughput: single upsert vs BatchUploader.
+
+Writes random vectors into a scratch collection, which is dropped afterwards.
+
+Usage:
+    python scripts/bench_upload.py [--points 20000] [--dim 512] [--batch-size 256]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.rag_core.config import Settings
+from src.rag_core.storage import BatchUploader, point_id
+
+COLLECTION = "bench_upload"
+
+
+def reset(client: QdrantClient, dim: int) -> None:
+    """Recreate the scratch collection."""
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        COLLECTION, vectors_config=VectorParams(size=dim, distance=Distance.COSINE)
+    )
+
+
+def bench_upsert(
+    client: QdrantClient, ids: list[str], vecs: np.ndarray, payloads: list[dict]
+) -> float:
+    """Old path: one blocking upsert of PointStructs built with tolist()."""
+    t0 = time.perf_counter()
+    points = [
+        PointStruct(id=pid, vector=vec.tolist(), payload=payload)
+        for pid, vec, payload in zip(ids, vecs, payloads, strict=True)
+    ]
+    client.upsert(collection_name=COLLECTION, points=points)
+    return len(ids) / (time.perf_counter() - t0)
+
+
+def bench_uploader(
+    client: QdrantClient,
+    ids: list[str],
+    vecs: np.ndarray,
+    payloads: list[dict],
+    batch_size: int,
+    parallel: int,
+) -> float:
+    """New path: batched, parallel upload_collection + one consistency barrier."""
+    uploader = BatchUploader(batch_size=batch_size, parallel=parallel)
+    t0 = time.perf_counter()
+    uploader.upload_vectors(client, COLLECTION, ids, vecs, payloads)
+    uploader.barrier(client, COLLECTION)
+    return len(ids) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    s = Settings()
+    client = QdrantClient(url=s.qdrant_url)
+    rng = np.random.default_rng(0)
+    vecs = rng.standard_normal((args.points, args.dim), dtype=np.float32)
+    ids = [point_id(f"bench-{i}") for i in range(args.points)]
+    payloads = [{"source_id": f"bench-{i}", "text": f"text {i}"} for i in range(args.points)]
+
+    print(f"{'method':>24} {'points/s':>10}")
+    reset(client, args.dim)
+    print(f"{'upsert (tolist)':>24} {bench_upsert(client, ids, vecs, payloads):>10.0f}")
+    for parallel in (1, 2, 4):
+        reset(client, args.dim)
+        pps = bench_uploader(client, ids, vecs, payloads, args.batch_size, parallel)
+        print(f"{f'uploader parallel={parallel}':>24} {pps:>10.0f}")
+    client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    main()
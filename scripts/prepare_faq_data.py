@@ -3,6 +3,7 @@ import json
 import os
 import sys
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Any
 
@@ -11,7 +12,8 @@ from tqdm import tqdm
 # Add src to path to import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from rag_core.generation.openrouter_client import chat_with_openrouter
+from rag_core.config import Settings
+from rag_core.generation.openrouter_client import OpenRouterClient
 
 
 def generate_document_id(doc: dict[str, Any]) -> str:
@@ -23,7 +25,7 @@ def generate_document_id(doc: dict[str, Any]) -> str:
     return document_id
 
 
-def generate_questions(doc: dict[str, Any]) -> list[str]:
+def generate_questions(doc: dict[str, Any], client: OpenRouterClient) -> list[str]:
     """Generate 5 questions using OpenRouter API"""
     prompt_template = """
 You emulate a fantasy player who's thinking to buy subscription.
@@ -47,7 +49,7 @@ Provide the output in parsable JSON without using code blocks:
     )
 
     try:
-        response = chat_with_openrouter(prompt=prompt, model="google/gemini-2.5-flash-lite")
+        response = client.chat(prompt, model="google/gemini-2.5-flash-lite")
 
         # Parse JSON response from the content field
         content = response["choices"][0]["message"]["content"]
@@ -99,15 +101,18 @@ def main() -> None:
     prepared_dir = Path("data/prepared")
     prepared_dir.mkdir(parents=True, exist_ok=True)
 
-    # Generate questions for each document
+    # Generate questions for each document, over one pooled client with bounded concurrency
+    client = OpenRouterClient.from_settings(Settings())
+    unique_docs = {doc["id"]: doc for doc in reversed(documents)}
     results = {}
-    for doc in tqdm(documents, desc="Generating questions"):
-        doc_id = doc["id"]
-        if doc_id in results:
-            continue
-
-        questions = generate_questions(doc)
-        results[doc_id] = questions
+    with ThreadPoolExecutor(max_workers=client.max_concurrency) as pool:
+        futures = {
+            pool.submit(generate_questions, doc, client): doc_id
+            for doc_id, doc in unique_docs.items()
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Generating questions"):
+            results[futures[future]] = future.result()
+    client.close()
 
     # Prepare final data structure - include ALL documents with IDs
     prepared_data = []
@@ -1,11 +1,40 @@
+import json
+from collections.abc import Callable
 from functools import lru_cache
+from pathlib import Path
+from typing import Any
 
 from src.rag_core.config import Settings
-from src.rag_core.embeddings import FastEmbedEmbeddings
-from src.rag_core.generation import Generator, OpenRouterLLM
+from src.rag_core.embeddings import (
+    BatchingEmbedder,
+    CachedEmbeddings,
+    FastEmbedEmbeddings,
+    QueryEmbeddingCache,
+)
+from src.rag_core.generation import (
+    Generator,
+    OpenRouterClient,
+    OpenRouterLLM,
+    PrecomputedAnswers,
+)
+from src.rag_core.observability import SemanticAnswerCache, SingleFlight, TwoLevelCache
 from src.rag_core.pipeline import SimpleRAG
-from src.rag_core.retrieval import CrossEncoderReranker, HybridRetriever
-from src.rag_core.storage import BM25QdrantClient, QdrantVectorStore
+from src.rag_core.retrieval import (
+    CrossEncoderReranker,
+    HybridRetriever,
+    LateInteractionReranker,
+    RerankScoreCache,
+    is_late_interaction_model,
+)
+from src.rag_core.storage import (
+    BM25QdrantClient,
+    LocalBM25Index,
+    NumpyVectorStore,
+    QdrantHybridStore,
+    QdrantVectorStore,
+    TokenVectorStore,
+    client_from_settings,
+)
 
 
 @lru_cache
@@ -18,6 +47,80 @@ def get_settings() -> Settings:
     return Settings()
 
 
+def _corpus_version(s: Settings) -> str:
+    """Content hash of the ingested FAQ file from the ingest manifest ("" if unknown)."""
+    path = Path(s.ingest_manifest_path)
+    if not path.exists():
+        return ""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("file_hash", "")
+
+
+def _semantic_cache(s: Settings, client: Any) -> SemanticAnswerCache | None:
+    """Semantic answer cache for the current corpus, if enabled."""
+    if s.semantic_cache_size <= 0:
+        return None
+    return SemanticAnswerCache(
+        s.semantic_cache_size,
+        threshold=s.semantic_cache_threshold,
+        ttl=s.semantic_cache_ttl,
+        corpus_version=_corpus_version(s),
+        client=client if s.semantic_cache_persist else None,
+        collection_name=s.semantic_cache_collection,
+    )
+
+
+def _precomputed(s: Settings) -> PrecomputedAnswers | None:
+    """Offline answers of the currently ingested FAQ items, if enabled and built."""
+    path = Path(s.precomputed_answers_path)
+    if s.precomputed_min_margin is None or not path.exists():
+        return None
+    manifest_path = Path(s.ingest_manifest_path)
+    item_hashes = None
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            item_hashes = json.load(f).get("items")
+    return PrecomputedAnswers(path, item_hashes=item_hashes)
+
+
+class _CacheVersion:
+    """Models plus current corpus version; the manifest is re-read only when it changes.
+
+    Every model that shapes an answer is part of the version, and so is the
+    ingested file hash, so a model change or a re-ingest of different data makes
+    all earlier cached answers miss without restarting the API.
+    """
+
+    def __init__(self, s: Settings):
+        llm_model = s.openrouter_model if s.openrouter_api_key else "dummy"
+        self.models = "|".join([s.embedding_model, s.reranker_model, llm_model])
+        self.settings = s
+        self.mtime: int | None = None
+        self.version = f"{self.models}|"
+
+    def __call__(self) -> str:
+        try:
+            mtime = Path(self.settings.ingest_manifest_path).stat().st_mtime_ns
+        except OSError:
+            return f"{self.models}|"
+        if mtime != self.mtime:
+            self.mtime = mtime
+            self.version = f"{self.models}|{_corpus_version(self.settings)}"
+        return self.version
+
+
+def _result_cache(s: Settings) -> TwoLevelCache | None:
+    """Whole-answer cache (memory LRU, optionally in front of Redis), if enabled."""
+    if s.answer_cache_size <= 0:
+        return None
+    return TwoLevelCache(
+        s.redis_url if s.answer_cache_redis else None,
+        ttl=s.answer_cache_ttl,
+        namespace="rag_answer:",
+        max_memory_items=s.answer_cache_size,
+    )
+
+
 @lru_cache
 def _get_rag_instance() -> SimpleRAG:
     """Get configured RAG pipeline instance.
@@ -34,30 +137,144 @@ def _get_rag_instance() -> SimpleRAG:
 
     # Pre-warm embedding model
     print("Pre-warming embedding model...")
-    emb = FastEmbedEmbeddings(s.embedding_model)
+    emb: Any = FastEmbedEmbeddings(s.embedding_model)
+    if s.embed_batching:
+        emb = BatchingEmbedder(emb, max_batch=s.embed_max_batch, window_ms=s.embed_batch_window_ms)
+    if s.query_cache_size > 0:
+        redis_tier = None
+        if s.query_cache_redis:
+            # Bounded LRU matrix is the memory level; Redis only shares vectors
+            redis_tier = TwoLevelCache(
+                s.redis_url, ttl=s.query_cache_ttl, namespace="rag_qvec:", max_memory_items=0
+            )
+        emb = CachedEmbeddings(emb, QueryEmbeddingCache(s.query_cache_size, redis_cache=redis_tier))
 
     # Pre-warm reranker model
     print("Pre-warming reranker model...")
-    rr = CrossEncoderReranker(s.reranker_model, lazy=False)  # Force immediate loading
+    rr: Any
+    if is_late_interaction_model(s.reranker_model):
+        # Document token vectors come from ingest; without them candidates are encoded
+        # per request
+        token_dir = Path(s.late_interaction_index_dir)
+        token_store = TokenVectorStore(token_dir) if TokenVectorStore.exists(token_dir) else None
+        rr = LateInteractionReranker(s.reranker_model, lazy=False, store=token_store)
+    else:
+        score_cache = None
+        if s.rerank_cache_size > 0:
+            redis_tier = None
+            if s.rerank_cache_redis:
+                redis_tier = TwoLevelCache(
+                    s.redis_url,
+                    ttl=s.rerank_cache_ttl,
+                    namespace="rag_rerank:",
+                    max_memory_items=0,
+                )
+            score_cache = RerankScoreCache(s.rerank_cache_size, redis_cache=redis_tier)
+        # Force immediate loading
+        rr = CrossEncoderReranker(
+            s.reranker_model,
+            lazy=False,
+            score_cache=score_cache,
+            max_seq_len=s.rerank_max_seq_len,
+            bucket_size=s.rerank_bucket_size,
+            batch_window_ms=s.rerank_batch_window_ms if s.rerank_batching else None,
+            max_batch_pairs=s.rerank_max_batch,
+        )
 
     # Initialize other components (these may fail if services aren't running)
+    client = None
     try:
-        vs = QdrantVectorStore(s.qdrant_url)
-        bm25 = BM25QdrantClient(s.qdrant_url)
-        retr = HybridRetriever(bm25=bm25, vs=vs, reranker=rr, alpha=0.5)
+        client = client_from_settings(s)
+        if s.storage_mode == "hybrid":
+            store = QdrantHybridStore(
+                s.qdrant_url,
+                collection_name=s.hybrid_collection,
+                fusion=s.hybrid_fusion,
+                client=client,
+            )
+            retr = HybridRetriever(
+                hybrid_store=store,
+                reranker=rr,
+                fusion=s.hybrid_fusion,
+                candidate_k=s.retrieval_candidate_k,
+                rerank_top_n=s.rerank_top_n,
+                early_exit_margin=s.rerank_early_exit_margin,
+            )
+        else:
+            vs: Any = (
+                NumpyVectorStore(s.dense_index_dir)
+                if s.dense_backend == "numpy"
+                else QdrantVectorStore(s.qdrant_url, client=client)
+            )
+            bm25: Any = (
+                LocalBM25Index(s.sparse_index_dir)
+                if s.sparse_backend == "local"
+                else BM25QdrantClient(s.qdrant_url, client=client)
+            )
+            retr = HybridRetriever(
+                bm25=bm25,
+                vs=vs,
+                reranker=rr,
+                alpha=0.5,
+                concurrent=s.retrieval_concurrent,
+                leg_timeout=s.retrieval_leg_timeout,
+                leg_workers=s.retrieval_leg_workers,
+                group_sparse=s.bm25_grouped,
+                fusion=s.fusion_method,
+                candidate_k=s.retrieval_candidate_k,
+                rerank_top_n=s.rerank_top_n,
+                early_exit_margin=s.rerank_early_exit_margin,
+            )
     except Exception as e:
         print(f"Warning: Could not connect to Qdrant ({e})")
         print("Models are pre-warmed, but storage services need to be running")
         # Return a minimal RAG instance for testing
         retr = None
 
+    answer_cache = _semantic_cache(s, client)
+    result_cache = _result_cache(s)
+    cache_version: Callable[[], str] = _CacheVersion(s)
+    precomputed = _precomputed(s)
+    coalescer = (
+        SingleFlight(
+            s.redis_url if s.coalesce_redis else None,
+            lock_ttl=s.coalesce_lock_ttl,
+            wait_timeout=s.coalesce_wait_timeout,
+        )
+        if s.coalesce_requests
+        else None
+    )
+
     # Use OpenRouter if API key is provided, otherwise use DummyLLM
     if s.openrouter_api_key:
-        llm = OpenRouterLLM(s.openrouter_model)
+        llm = OpenRouterLLM(s.openrouter_model, client=OpenRouterClient.from_settings(s))
         generator = Generator(emb, llm)
-        return SimpleRAG(emb, retr, generator)
+        return SimpleRAG(
+            emb,
+            retr,
+            generator,
+            llm_concurrency=s.batch_llm_concurrency,
+            answer_cache=answer_cache,
+            coalescer=coalescer,
+            result_cache=result_cache,
+            cache_version=cache_version,
+            precomputed=precomputed,
+            precomputed_min_score=s.precomputed_min_score,
+            precomputed_min_margin=s.precomputed_min_margin,
+        )
     else:
-        return SimpleRAG(emb, retr)
+        return SimpleRAG(
+            emb,
+            retr,
+            llm_concurrency=s.batch_llm_concurrency,
+            answer_cache=answer_cache,
+            coalescer=coalescer,
+            result_cache=result_cache,
+            cache_version=cache_version,
+            precomputed=precomputed,
+            precomputed_min_score=s.precomputed_min_score,
+            precomputed_min_margin=s.precomputed_min_margin,
+        )
 
 
 def get_rag() -> SimpleRAG:
@@ -1,12 +1,15 @@
+import json
 from time import perf_counter
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from starlette.responses import StreamingResponse
 
-from src.api.deps import get_rag
+from src.api.deps import get_rag, get_settings
 from src.rag_core.observability import rag_errors, rag_latency, rag_requests
+from src.rag_core.retrieval import FusionMethod
+from src.rag_core.storage import compile_filter
 
 router = APIRouter()
 
@@ -17,14 +20,46 @@ class AskRequest(BaseModel):
     Attributes:
         query: User question/query string
         k: Number of documents to retrieve (default: 6)
-        filters: Optional filters for retrieval
+        filters: Optional payload filters, e.g. {"lang": "en", "section": ["Rules"]}
         stream: Whether to stream response (default: True)
+        fusion: Score fusion method (default: server setting)
     """
 
     query: str
     k: int = 6
     filters: dict | None = None
     stream: bool = True
+    fusion: FusionMethod | None = None
+
+    @field_validator("filters")
+    @classmethod
+    def _check_filters(cls, v: dict | None) -> dict | None:
+        """Reject unsupported filter operators with 422 instead of failing retrieval."""
+        compile_filter(v)
+        return v
+
+
+class AskBatchRequest(BaseModel):
+    """Request model for batched RAG queries.
+
+    Attributes:
+        queries: User questions (at most Settings.batch_max_queries)
+        k: Number of documents to retrieve per question (default: 6)
+        filters: Optional payload filters shared by all questions
+        fusion: Score fusion method (default: server setting)
+    """
+
+    queries: list[str] = Field(min_length=1)
+    k: int = 6
+    filters: dict | None = None
+    fusion: FusionMethod | None = None
+
+    @field_validator("filters")
+    @classmethod
+    def _check_filters(cls, v: dict | None) -> dict | None:
+        """Reject unsupported filter operators with 422 instead of failing retrieval."""
+        compile_filter(v)
+        return v
 
 
 @router.post("/v1/ask")
@@ -45,7 +80,7 @@ def ask(req: AskRequest, rag: Any = Depends(get_rag)) -> Any:
     t0 = perf_counter()
     try:
         if not req.stream:
-            ans = rag.answer(req.query, k=req.k, filters=req.filters)
+            ans = rag.answer(req.query, k=req.k, filters=req.filters, fusion=req.fusion)
             return ans
 
         def gen() -> Any:
@@ -54,7 +89,9 @@ def ask(req: AskRequest, rag: Any = Depends(get_rag)) -> Any:
             Yields:
                 Server-sent event formatted response chunks
             """
-            for event in rag.answer_stream(req.query, k=req.k, filters=req.filters):
+            for event in rag.answer_stream(
+                req.query, k=req.k, filters=req.filters, fusion=req.fusion
+            ):
                 yield f"data: {event}\n\n"
 
         return StreamingResponse(gen(), media_type="text/event-stream")
@@ -63,3 +100,48 @@ def ask(req: AskRequest, rag: Any = Depends(get_rag)) -> Any:
         raise HTTPException(status_code=500, detail=str(e)) from e
     finally:
         rag_latency.labels(method="ask").observe(perf_counter() - t0)
+
+
+@router.post("/v1/ask/batch")
+def ask_batch(req: AskBatchRequest, rag: Any = Depends(get_rag)) -> Any:
+    """Answer many questions in one request, streamed back as NDJSON.
+
+    Every line is {"index": i, "query": ..., "result": ...} and lines arrive in
+    completion order; a failure after streaming started is reported as a final
+    {"error": ...} line.
+
+    Args:
+        req: AskBatchRequest containing the questions and parameters
+        rag: RAG pipeline instance (dependency injection)
+
+    Returns:
+        Streaming NDJSON response
+
+    Raises:
+        HTTPException: If there are too many questions (413)
+    """
+    limit = get_settings().batch_max_queries
+    if len(req.queries) > limit:
+        raise HTTPException(status_code=413, detail=f"At most {limit} queries per batch")
+    rag_requests.labels(method="ask_batch").inc()
+
+    def gen() -> Any:
+        """Generate one NDJSON line per answered question.
+
+        Yields:
+            JSON lines
+        """
+        t0 = perf_counter()
+        try:
+            for i, result in rag.answer_many(
+                req.queries, k=req.k, filters=req.filters, fusion=req.fusion
+            ):
+                line = {"index": i, "query": req.queries[i], "result": result}
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+        except Exception as e:
+            rag_errors.labels(method="ask_batch").inc()
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            rag_latency.labels(method="ask_batch").observe(perf_counter() - t0)
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
@@ -1,22 +1,31 @@
 """RAG Core - Main RAG pipeline components."""
 
 from .config import Settings
-from .embeddings import FastEmbedEmbeddings
+from .embeddings import (
+    BatchingEmbedder,
+    CachedEmbeddings,
+    DiskEmbeddingCache,
+    FastEmbedEmbeddings,
+    QueryEmbeddingCache,
+)
 from .generation import DummyLLM, Generator, OpenRouterLLM, build_json_prompt, chat_with_openrouter
 from .observability import TwoLevelCache, metrics_endpoint, rag_errors, rag_latency, rag_requests
 from .pipeline import SimpleRAG
-from .processing import fixed_chunk, redact_pii, simple_md_clean
+from .processing import fixed_chunk, normalize_query, redact_pii, simple_md_clean
 from .retrieval import CrossEncoderReranker, HybridRetriever
 from .schema import Answer, Document, PipelineResponse, Query
 
 # Import from submodules
-from .storage import BM25QdrantClient, QdrantVectorStore
+from .storage import BM25QdrantClient, QdrantHybridStore, QdrantVectorStore
 
 __all__ = [
     "Answer",
     # Storage
     "BM25QdrantClient",
+    "BatchingEmbedder",
+    "CachedEmbeddings",
     "CrossEncoderReranker",
+    "DiskEmbeddingCache",
     "Document",
     # Generation
     "DummyLLM",
@@ -27,8 +36,10 @@ __all__ = [
     "HybridRetriever",
     "OpenRouterLLM",
     "PipelineResponse",
+    "QdrantHybridStore",
     "QdrantVectorStore",
     "Query",
+    "QueryEmbeddingCache",
     # Core
     "Settings",
     "SimpleRAG",
@@ -38,6 +49,7 @@ __all__ = [
     "chat_with_openrouter",
     "fixed_chunk",
     "metrics_endpoint",
+    "normalize_query",
     "rag_errors",
     "rag_latency",
     "rag_requests",
@@ -1,13 +1,132 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
+# Score fusion methods; retrieval.fusion.FUSION_METHODS and the request models derive from it
+FusionMethod = Literal["max", "minmax", "zscore", "rrf", "dbsf"]
+
 
 class Settings(BaseSettings):
     qdrant_url: str = "http://localhost:6333"
     redis_url: str = "redis://localhost:6379/0"
     embedding_model: str = "jinaai/jina-embeddings-v2-small-en"
+    # Cross-encoder, or a late-interaction model (e.g. "answerdotai/answerai-colbert-small-v1")
+    # whose document token vectors are precomputed at ingest
     reranker_model: str = "jinaai/jina-reranker-v1-turbo-en"
     openrouter_api_key: str = ""
     openrouter_model: str = "deepseek/deepseek-r1-0528:free"
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
+    # OpenRouter client: seconds per attempt and per call (retries included), attempts on
+    # 429/5xx, requests in flight, pooled keep-alive connections, HTTP/2
+    openrouter_timeout: float = 30.0
+    openrouter_deadline: float = 60.0
+    openrouter_max_retries: int = 3
+    openrouter_max_concurrency: int = 16
+    openrouter_max_connections: int = 32
+    openrouter_http2: bool = True
+
+    # Qdrant client: gRPC transport (binary vectors), timeout in seconds, pool size
+    qdrant_prefer_grpc: bool = False
+    qdrant_grpc_port: int = 6334
+    qdrant_timeout: int | None = None
+    qdrant_pool_size: int | None = None
+
+    # Query embedding micro-batching
+    embed_batching: bool = True
+    embed_batch_window_ms: float = 3.0
+    embed_max_batch: int = 32
+
+    # Query embedding cache (0 disables)
+    query_cache_size: int = 4096
+    query_cache_redis: bool = False
+    query_cache_ttl: int = 86400
+    # Reranker (query, document) score cache: size (0 - disabled), optional Redis tier
+    rerank_cache_size: int = 16384
+    rerank_cache_redis: bool = False
+    rerank_cache_ttl: int = 86400
+    # Cross-encoder batching: pairs from concurrent requests within the window are scored
+    # together, in length-sorted buckets, truncated to max_seq_len tokens (None - model limit)
+    rerank_batching: bool = True
+    rerank_batch_window_ms: float = 3.0
+    rerank_max_batch: int = 64
+    rerank_bucket_size: int = 16
+    rerank_max_seq_len: int | None = None
+    # Semantic answer cache: answers of queries within threshold cosine similarity are
+    # reused (size 0 - disabled, the default: paraphrase-level matches can differ in
+    # meaning); persist keeps entries in a Qdrant collection
+    semantic_cache_size: int = 0
+    semantic_cache_threshold: float = 0.92
+    semantic_cache_ttl: int = 86400
+    semantic_cache_persist: bool = False
+    semantic_cache_collection: str = "answer_cache"
+    # Whole-answer cache (memory LRU of answer_cache_size entries, 0 - disabled, optional
+    # Redis tier), keyed by normalised question, k, filters, models and ingested corpus version
+    answer_cache_size: int = 1024
+    answer_cache_redis: bool = False
+    answer_cache_ttl: int = 3600
+    # Single-flight: identical concurrent questions share one run; with coalesce_redis
+    # also across processes (Redis lock + pub/sub), followers giving up after the timeout
+    coalesce_requests: bool = True
+    coalesce_redis: bool = False
+    coalesce_lock_ttl: int = 60
+    coalesce_wait_timeout: float = 60.0
+
+    # Ingestion: embedding batch size and fastembed data-parallel workers
+    # (0 - one worker per core, None - single process)
+    ingest_batch_size: int = 256
+    ingest_parallel: int | None = None
+    # Per-item content hashes of the last ingest, used for delta ingestion
+    ingest_manifest_path: str = "data/index/manifest.json"
+    # Content-addressed embedding cache for re-ingestion ("" disables)
+    embedding_cache_dir: str = "data/cache/embeddings"
+
+    # Qdrant uploads: points per request, parallel upload workers, retries per batch
+    upload_batch_size: int = 256
+    upload_parallel: int = 1
+    upload_max_retries: int = 3
+
+    # Storage layout: "split" - separate dense and BM25 collections fused in Python,
+    # "hybrid" - one collection with named dense + sparse vectors fused by Qdrant
+    storage_mode: Literal["split", "hybrid"] = "split"
+    hybrid_collection: str = "faq_hybrid"
+    hybrid_fusion: Literal["rrf", "dbsf"] = "rrf"
+
+    # Dense retrieval backend for split mode: "qdrant" or "numpy" (in-process memory-mapped
+    # index built by the ingest worker, float32 or float16)
+    dense_backend: Literal["qdrant", "numpy"] = "qdrant"
+    dense_index_dir: str = "data/index/dense"
+    dense_index_dtype: Literal["float32", "float16"] = "float32"
+    # Document token vectors for a late-interaction reranker_model
+    late_interaction_index_dir: str = "data/index/late_interaction"
+    late_interaction_dtype: Literal["float32", "float16"] = "float16"
+    # Sparse retrieval backend for split mode: "qdrant" or "local" (in-process scipy CSR
+    # BM25 index built by the ingest worker)
+    sparse_backend: Literal["qdrant", "local"] = "qdrant"
+    sparse_index_dir: str = "data/index/bm25"
+
+    # Retrieval
+    retrieval_concurrent: bool = True
+    retrieval_leg_timeout: float | None = 2.0
+    # Worker threads shared by the retrieval legs of all requests
+    retrieval_leg_workers: int = 16
+    # Collapse BM25 question variants to the best one per FAQ item before fusion
+    bm25_grouped: bool = True
+    # Client-side score fusion: "max", "minmax", "zscore", "rrf" or "dbsf" (per request: fusion)
+    fusion_method: FusionMethod = "max"
+    # Rerank cascade: hits fetched per leg, fused candidates sent to the cross-encoder,
+    # and the fused top-1 over top-2 margin that skips the cross-encoder (None - never)
+    retrieval_candidate_k: int = 20
+    rerank_top_n: int = 20
+    rerank_early_exit_margin: float | None = None
+    # Precomputed answers (python -m src.workers.precompute_answers) are returned without the
+    # LLM when the top reranked hit scores at least min_score and beats the runner-up by
+    # min_margin (reranker score units; None - never)
+    precomputed_answers_path: str = "data/index/precomputed_answers.jsonl"
+    precomputed_min_score: float = 0.0
+    precomputed_min_margin: float | None = None
+    # /v1/ask/batch: maximum questions per request and LLM calls in flight
+    batch_max_queries: int = 64
+    batch_llm_concurrency: int = 4
 
     class Config:
         env_prefix = "RAG_"
@@ -1,5 +1,14 @@
 """Embedding modules for text embeddings."""
 
+from .batching import BatchingEmbedder
+from .cache import CachedEmbeddings, QueryEmbeddingCache
+from .disk_cache import DiskEmbeddingCache
 from .embeddings import FastEmbedEmbeddings
 
-__all__ = ["FastEmbedEmbeddings"]
+__all__ = [
+    "BatchingEmbedder",
+    "CachedEmbeddings",
+    "DiskEmbeddingCache",
+    "FastEmbedEmbeddings",
+    "QueryEmbeddingCache",
+]
@@ -0,0 +1,135 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from time import monotonic
+from typing import Any
+
+import numpy as np
+
+from ..observability import rag_embed_batch_size, rag_embed_queue_depth
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingEmbedder:
+    """Micro-batching front-end for an embedder.
+
+    Concurrent ``encode_one`` calls (e.g. from the FastAPI threadpool) are put on a
+    queue; a single worker thread collects them for up to ``window_ms`` or
+    ``max_batch`` items, runs one ``encode`` over the whole batch and hands every
+    caller back its own row. Calls with non-default options bypass the queue.
+    """
+
+    def __init__(self, embedder: Any, max_batch: int = 32, window_ms: float = 3.0):
+        """Initialize batching embedder.
+
+        Args:
+            embedder: Object with encode(texts) -> np.ndarray and encode_one(text)
+            max_batch: Maximum number of queries embedded in one batch
+            window_ms: How long to wait for more queries after the first one arrives
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be positive")
+        self.embedder = embedder
+        self.model_name = getattr(embedder, "model_name", "")
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self._queue: queue.Queue[tuple[str, Future[np.ndarray]]] = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        """Start the batching thread on first use."""
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="embed-batcher", daemon=True
+                    )
+                    self._worker.start()
+
+    def _collect(self) -> list[tuple[str, Future[np.ndarray]]]:
+        """Block for the first request, then gather more until the window closes.
+
+        Returns:
+            Batch of (text, future) pairs
+        """
+        batch = [self._queue.get()]
+        deadline = monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        """Worker loop: embed collected batches and resolve their futures.
+
+        Any error while handling a batch is set on every future of that batch that
+        is still pending, and the loop carries on with the next batch, so callers
+        blocked in ``encode_one`` never wait on a dead worker.
+        """
+        while True:
+            batch = self._collect()
+            try:
+                self._embed_batch(batch)
+            except Exception as e:
+                logger.warning(f"[EMBED] Batch of {len(batch)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _embed_batch(self, batch: list[tuple[str, Future[np.ndarray]]]) -> None:
+        """Embed one batch and resolve its futures.
+
+        Args:
+            batch: Collected (text, future) pairs
+
+        Raises:
+            ValueError: If the embedder returns a different number of rows
+        """
+        rag_embed_queue_depth.set(self._queue.qsize())
+        rag_embed_batch_size.observe(len(batch))
+        vecs = self.embedder.encode([text for text, _ in batch])
+        if len(vecs) != len(batch):
+            raise ValueError(f"embedder returned {len(vecs)} rows for {len(batch)} texts")
+        for row, (_, future) in zip(vecs, batch, strict=True):
+            future.set_result(row)
+
+    def encode(self, texts: str | list[str], normalize: bool = True, **kwargs: Any) -> np.ndarray:
+        """Encode text(s) directly, without queueing.
+
+        Args:
+            texts: String or list of strings to encode
+            normalize: Whether to normalize vectors (L2 norm)
+            **kwargs: Additional options passed to the wrapped embedder
+
+        Returns:
+            Numpy array of embeddings
+        """
+        return self.embedder.encode(texts, normalize=normalize, **kwargs)
+
+    def encode_one(self, text: str, normalize: bool = True, **kwargs: Any) -> np.ndarray:
+        """Encode single string as part of the next micro-batch.
+
+        Args:
+            text: Single string to encode
+            normalize: Whether to normalize vector (L2 norm)
+            **kwargs: Additional options passed to the wrapped embedder
+
+        Returns:
+            Single embedding vector
+        """
+        if kwargs or not normalize:
+            return self.embedder.encode_one(text, normalize=normalize, **kwargs)
+
+        self._ensure_worker()
+        future: Future[np.ndarray] = Future()
+        self._queue.put((text, future))
+        rag_embed_queue_depth.set(self._queue.qsize())
+        return future.result()
@@ -0,0 +1,185 @@
+import base64
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+from ..observability import (
+    TwoLevelCache,
+    rag_embedding_cache_bytes,
+    rag_embedding_cache_hits,
+    rag_embedding_cache_misses,
+)
+from ..processing import normalize_query
+
+
+def _pack(vec: np.ndarray) -> str:
+    """Serialise vector as base64 of its raw float32 bytes (JSON-safe for Redis)."""
+    return base64.b64encode(np.ascontiguousarray(vec, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def _unpack(data: str) -> np.ndarray:
+    """Inverse of _pack."""
+    return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+
+
+class QueryEmbeddingCache:
+    """Bounded LRU cache of query vectors.
+
+    Vectors live as rows of one preallocated float32 matrix; the LRU index only maps
+    keys to row numbers, so an entry costs ``dim * 4`` bytes plus its key. An optional
+    Redis tier (a ``TwoLevelCache`` without its own memory level) shares vectors
+    between processes.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 4096,
+        dim: int | None = None,
+        redis_cache: TwoLevelCache | None = None,
+    ):
+        """Initialize query embedding cache.
+
+        Args:
+            capacity: Maximum number of cached vectors
+            dim: Vector dimension (default: taken from the first stored vector)
+            redis_cache: Optional shared Redis tier
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.redis_cache = redis_cache
+        self._matrix: np.ndarray | None = None
+        self._rows: OrderedDict[str, int] = OrderedDict()
+        self._key_bytes = 0
+        self._lock = threading.Lock()
+        if dim is not None:
+            self._allocate(dim)
+
+    def _allocate(self, dim: int) -> np.ndarray:
+        """Preallocate the vector matrix."""
+        self._matrix = np.zeros((self.capacity, dim), dtype=np.float32)
+        return self._matrix
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the cache (matrix + keys)."""
+        matrix_bytes = self._matrix.nbytes if self._matrix is not None else 0
+        return matrix_bytes + self._key_bytes
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Look up a vector.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Copy of the cached vector or None
+        """
+        with self._lock:
+            row = self._rows.get(key)
+            if row is not None and self._matrix is not None:
+                self._rows.move_to_end(key)
+                return self._matrix[row].copy()
+
+        if self.redis_cache is not None:
+            data = self.redis_cache.get(key)
+            if data is not None:
+                vec = _unpack(data)
+                self._put_local(key, vec)
+                return vec.copy()
+        return None
+
+    def put(self, key: str, vec: np.ndarray) -> None:
+        """Store a vector.
+
+        Args:
+            key: Cache key
+            vec: Vector to store
+        """
+        self._put_local(key, vec)
+        if self.redis_cache is not None:
+            self.redis_cache.set(key, _pack(vec))
+
+    def _put_local(self, key: str, vec: np.ndarray) -> None:
+        """Write vector into the matrix, evicting the least recently used row if full."""
+        with self._lock:
+            matrix = self._matrix if self._matrix is not None else self._allocate(vec.shape[-1])
+
+            row = self._rows.get(key)
+            if row is None:
+                if len(self._rows) < self.capacity:
+                    row = len(self._rows)
+                else:
+                    old_key, row = self._rows.popitem(last=False)
+                    self._key_bytes -= len(old_key)
+                self._rows[key] = row
+                self._key_bytes += len(key)
+            else:
+                self._rows.move_to_end(key)
+            matrix[row] = vec
+            rag_embedding_cache_bytes.set(self.nbytes)
+
+
+class CachedEmbeddings:
+    """Embedder front-end that caches query vectors.
+
+    Keys are the model name plus the normalized query text, so repeated questions
+    that differ only in case, whitespace or punctuation are embedded once.
+    """
+
+    def __init__(self, embedder: Any, cache: QueryEmbeddingCache):
+        """Initialize cached embeddings.
+
+        Args:
+            embedder: Object with encode(texts) and encode_one(text)
+            cache: Query vector cache
+        """
+        self.embedder = embedder
+        self.model_name = getattr(embedder, "model_name", "")
+        self.cache = cache
+
+    def _key(self, text: str) -> str:
+        return f"{self.model_name}|{normalize_query(text)}"
+
+    def encode(self, texts: str | list[str], normalize: bool = True, **kwargs: Any) -> np.ndarray:
+        """Encode text(s) directly, bypassing the cache.
+
+        Args:
+            texts: String or list of strings to encode
+            normalize: Whether to normalize vectors (L2 norm)
+            **kwargs: Additional options passed to the wrapped embedder
+
+        Returns:
+            Numpy array of embeddings
+        """
+        return self.embedder.encode(texts, normalize=normalize, **kwargs)
+
+    def encode_one(self, text: str, normalize: bool = True, **kwargs: Any) -> np.ndarray:
+        """Encode single query, serving repeated queries from the cache.
+
+        Args:
+            text: Single string to encode
+            normalize: Whether to normalize vector (L2 norm)
+            **kwargs: Additional options passed to the wrapped embedder
+
+        Returns:
+            Single embedding vector
+        """
+        if kwargs or not normalize:
+            return self.embedder.encode_one(text, normalize=normalize, **kwargs)
+
+        key = self._key(text)
+        vec = self.cache.get(key)
+        if vec is not None:
+            rag_embedding_cache_hits.inc()
+            return vec
+
+        rag_embedding_cache_misses.inc()
+        vec = self.embedder.encode_one(text)
+        self.cache.put(key, vec)
+        return vec
@@ -0,0 +1,253 @@
+import hashlib
+import logging
+import os
+import re
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 32  # SHA-256
+COPY_ROWS = 65536  # rows copied per step when merging segments
+
+
+def text_digest(text: str) -> bytes:
+    """SHA-256 digest of text, used as the content address of its embedding."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class DiskEmbeddingCache:
+    """Persistent content-addressed embedding cache for re-ingestion.
+
+    One directory per model holds append-only segments: ``seg-<n>.vectors.npy``
+    (float32 matrix, opened memory-mapped) and ``seg-<n>.keys.npy`` (uint8 matrix of
+    SHA-256 digests, row i is the key of vector i). Re-ingests only run the model on
+    texts whose digest is not in the index and write them as a new segment, so an
+    append costs I/O proportional to the new rows. Tail segments are merged while the
+    previous one is no larger than them, which keeps segment sizes geometric: there
+    are O(log N) segments and each row is rewritten O(log N) times over its life.
+    """
+
+    def __init__(self, root: str | Path, model_name: str):
+        """Initialize disk embedding cache.
+
+        Args:
+            root: Cache root directory
+            model_name: Embedding model name (each model gets its own directory)
+        """
+        self.model_name = model_name
+        self.path = Path(root) / re.sub(r"[^\w.-]+", "_", model_name)
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _segment_paths(self, stem: str) -> tuple[Path, Path]:
+        """Vector and key file of a segment."""
+        return self.path / f"{stem}vectors.npy", self.path / f"{stem}keys.npy"
+
+    def _segment_stems(self) -> list[str]:
+        """Committed segments, oldest first (a segment is committed once its keys exist)."""
+        return sorted(p.name.removesuffix("keys.npy") for p in self.path.glob("seg-*.keys.npy"))
+
+    def _next_stem(self) -> str:
+        """Stem of a new segment, ordered after every existing one."""
+        ids = [int(p.name[4:10]) for p in self.path.glob("seg-*.npy") if p.name[4:10].isdigit()]
+        return f"seg-{max(ids, default=-1) + 1:06d}."
+
+    def _load(self) -> None:
+        """Open every segment memory-mapped and build the digest -> row index.
+
+        Rows are numbered globally across segments in order; a digest stored in
+        several segments (after an interrupted merge) resolves to its last copy.
+        """
+        self._stems: list[str] = []
+        self._vectors: list[np.ndarray] = []
+        key_blocks = [np.empty((0, DIGEST_SIZE), dtype=np.uint8)]
+        for stem in self._segment_stems():
+            vectors_path, keys_path = self._segment_paths(stem)
+            keys = np.load(keys_path)
+            vectors = np.load(vectors_path, mmap_mode="r") if vectors_path.exists() else None
+            if vectors is None or len(vectors) != len(keys):
+                logger.warning(f"[EMB CACHE] Segment {keys_path} is inconsistent, ignoring it")
+                continue
+            self._stems.append(stem)
+            self._vectors.append(vectors)
+            key_blocks.append(keys)
+        self.keys = np.concatenate(key_blocks)
+        self._offsets = np.cumsum([0] + [len(v) for v in self._vectors[:-1]], dtype=np.int64)
+        self.index = {key.tobytes(): row for row, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, text: str) -> bool:
+        return text_digest(text) in self.index
+
+    @property
+    def segments(self) -> int:
+        """Number of segment files the cache is spread over."""
+        return len(self._stems)
+
+    def _gather(self, rows: np.ndarray) -> np.ndarray:
+        """Copy global rows out of the segment memory maps.
+
+        Args:
+            rows: Global row numbers
+
+        Returns:
+            float32 matrix of shape (len(rows), dim)
+        """
+        dim = self._vectors[0].shape[1]
+        out = np.empty((len(rows), dim), dtype=np.float32)
+        seg = np.searchsorted(self._offsets, rows, side="right") - 1
+        for s in np.unique(seg):
+            mask = seg == s
+            out[mask] = self._vectors[s][rows[mask] - self._offsets[s]]
+        return out
+
+    def encode_batches(
+        self,
+        embedder: Any,
+        texts: Sequence[str],
+        batch_size: int = 256,
+        parallel: int | None = None,
+    ) -> Iterator[np.ndarray]:
+        """Encode texts through the cache, yielding float32 blocks like encode_batches.
+
+        New or changed texts are embedded by ``embedder`` and appended to the cache
+        first; then every block is gathered (copied) from the segment memory maps,
+        so only one block at a time is held in memory.
+
+        Args:
+            embedder: Object with encode_batches(texts, batch_size, parallel=...) and dim
+            texts: Strings to encode
+            batch_size: Rows per yielded block
+            parallel: fastembed data-parallel workers for cache misses
+
+        Yields:
+            Numpy arrays of shape (rows, dim)
+        """
+        digests = [text_digest(t) for t in texts]
+        missing: dict[bytes, str] = {}
+        for digest, text in zip(digests, texts, strict=True):
+            if digest not in self.index:
+                missing.setdefault(digest, text)
+
+        self.misses += len(missing)
+        self.hits += len(texts) - len(missing)
+        if missing:
+            self._append(embedder, list(missing), list(missing.values()), batch_size, parallel)
+
+        rows = np.fromiter((self.index[d] for d in digests), dtype=np.int64, count=len(digests))
+        for start in range(0, len(rows), batch_size):
+            yield self._gather(rows[start : start + batch_size])
+
+    def _append(
+        self,
+        embedder: Any,
+        digests: list[bytes],
+        texts: list[str],
+        batch_size: int,
+        parallel: int | None,
+    ) -> None:
+        """Embed missing texts straight into a new segment, then merge the tail."""
+        keys = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape(-1, DIGEST_SIZE)
+
+        def fill(out: np.ndarray) -> None:
+            pos = 0
+            for block in embedder.encode_batches(texts, batch_size=batch_size, parallel=parallel):
+                out[pos : pos + len(block)] = block
+                pos += len(block)
+
+        self._write_segment(self._next_stem(), keys, embedder.dim, fill)
+        self._load()
+
+        sizes = [len(v) for v in self._vectors]
+        first, total = len(sizes) - 1, sizes[-1]
+        while first > 0 and sizes[first - 1] <= total:
+            first -= 1
+            total += sizes[first]
+        if first < len(sizes) - 1:
+            self._rewrite(first, np.arange(self._offsets[first], len(self.keys), dtype=np.int64))
+
+    def _write_segment(
+        self, stem: str, keys: np.ndarray, dim: int, fill: Callable[[np.ndarray], None]
+    ) -> None:
+        """Write a segment of len(keys) rows filled by ``fill``.
+
+        Files are replaced atomically: matrix first, then keys, which commit the segment.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        vectors_path, keys_path = self._segment_paths(stem)
+        tmp_vectors = self.path / f"{stem}vectors.tmp"
+        out = np.lib.format.open_memmap(
+            tmp_vectors, mode="w+", dtype=np.float32, shape=(len(keys), dim)
+        )
+        fill(out)
+        out.flush()
+        del out
+        os.replace(tmp_vectors, vectors_path)
+        tmp_keys = self.path / f"{stem}keys.tmp"
+        with open(tmp_keys, "wb") as f:
+            np.save(f, keys)
+        os.replace(tmp_keys, keys_path)
+
+    def _rewrite(self, first: int, keep_rows: np.ndarray) -> None:
+        """Merge segments from ``first`` on into one segment holding keep_rows.
+
+        Rows are copied in COPY_ROWS steps, so memory stays bounded. The merged
+        segment is committed before the old ones are deleted.
+        """
+        if len(keep_rows):
+
+            def fill(out: np.ndarray) -> None:
+                for start in range(0, len(keep_rows), COPY_ROWS):
+                    chunk = keep_rows[start : start + COPY_ROWS]
+                    out[start : start + len(chunk)] = self._gather(chunk)
+
+            dim = self._vectors[0].shape[1]
+            self._write_segment(self._next_stem(), self.keys[keep_rows], dim, fill)
+
+        old = self._stems[first:]
+        self._vectors = []  # release the old memory maps before deleting their files
+        for stem in old:
+            vectors_path, keys_path = self._segment_paths(stem)
+            keys_path.unlink(missing_ok=True)
+            vectors_path.unlink(missing_ok=True)
+        self._load()
+
+    def compact(self, texts: Sequence[str]) -> tuple[int, int]:
+        """Drop entries whose text is no longer referenced, merging all segments into one.
+
+        Args:
+            texts: Texts that are still in use
+
+        Returns:
+            Tuple of (kept, dropped) entry counts
+        """
+        referenced = {text_digest(t) for t in texts}
+        keep_rows = np.array(
+            sorted(row for digest, row in self.index.items() if digest in referenced),
+            dtype=np.int64,
+        )
+        dropped = len(self.index) - len(keep_rows)
+        if dropped or len(self._stems) > 1:
+            self._rewrite(0, keep_rows)
+        return len(keep_rows), dropped
+
+    def stats(self) -> dict[str, float]:
+        """Hit statistics of this cache instance.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
@@ -1,9 +1,18 @@
+from collections.abc import Iterable, Iterator, Sequence, Sized
+from pathlib import Path
 from typing import Any
 
 import numpy as np
 from fastembed import TextEmbedding
 
 
+def _l2_normalize(block: np.ndarray) -> np.ndarray:
+    """L2-normalize rows of a block in place."""
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    block /= norms + 1e-8
+    return block
+
+
 class FastEmbedEmbeddings:
     """FastEmbed wrapper for convenient embedding generation.
 
@@ -19,6 +28,87 @@ class FastEmbedEmbeddings:
         self.model_name = model_name
         self.model = TextEmbedding(model_name=model_name)
 
+    @property
+    def dim(self) -> int:
+        """Embedding dimension of the model."""
+        return int(self.model.embedding_size)
+
+    def encode_batches(
+        self,
+        texts: Iterable[str],
+        batch_size: int = 256,
+        normalize: bool = True,
+        parallel: int | None = None,
+        **kwargs: Any,
+    ) -> Iterator[np.ndarray]:
+        """Encode texts lazily, yielding float32 blocks of up to batch_size rows.
+
+        Only one block is held at a time, so memory stays constant regardless of
+        corpus size.
+
+        Args:
+            texts: Iterable of strings to encode
+            batch_size: Rows per yielded block (also the ONNX batch size)
+            normalize: Whether to normalize vectors (L2 norm)
+            parallel: fastembed data-parallel workers (0 - all cores, None - in-process)
+            **kwargs: Additional options passed to model.embed
+
+        Yields:
+            Numpy arrays of shape (rows, dim)
+        """
+        # Do not allocate a full block for a handful of texts (e.g. a single query)
+        rows = min(batch_size, len(texts)) if isinstance(texts, Sized) else batch_size
+        block = np.empty((rows, self.dim), dtype=np.float32)
+        filled = 0
+        for vec in self.model.embed(texts, batch_size=batch_size, parallel=parallel, **kwargs):
+            block[filled] = vec
+            filled += 1
+            if filled == rows:
+                yield _l2_normalize(block) if normalize else block
+                block = np.empty((rows, self.dim), dtype=np.float32)
+                filled = 0
+        if filled:
+            yield _l2_normalize(block[:filled]) if normalize else block[:filled]
+
+    def encode_into(
+        self,
+        texts: Sequence[str],
+        out: np.ndarray | None = None,
+        batch_size: int = 256,
+        normalize: bool = True,
+        parallel: int | None = None,
+        mmap_path: str | Path | None = None,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Encode texts into a preallocated (optionally memory-mapped) matrix.
+
+        Args:
+            texts: Strings to encode
+            out: Preallocated float32 array of shape (len(texts), dim)
+            batch_size: Rows encoded per batch
+            normalize: Whether to normalize vectors (L2 norm)
+            parallel: fastembed data-parallel workers (0 - all cores, None - in-process)
+            mmap_path: Create ``out`` as a memory-mapped .npy file at this path
+            **kwargs: Additional options passed to model.embed
+
+        Returns:
+            The filled output array
+        """
+        shape = (len(texts), self.dim)
+        if out is None:
+            if mmap_path is not None:
+                out = np.lib.format.open_memmap(mmap_path, mode="w+", dtype=np.float32, shape=shape)
+            else:
+                out = np.empty(shape, dtype=np.float32)
+        elif out.shape != shape:
+            raise ValueError(f"out has shape {out.shape}, expected {shape}")
+
+        start = 0
+        for block in self.encode_batches(texts, batch_size, normalize, parallel, **kwargs):
+            out[start : start + len(block)] = block
+            start += len(block)
+        return out
+
     def encode(self, texts: str | list[str], normalize: bool = True, **kwargs: Any) -> np.ndarray:
         """Encode text(s) into embeddings.
 
@@ -33,15 +123,7 @@ class FastEmbedEmbeddings:
         if isinstance(texts, str):
             texts = [texts]
 
-        embeddings = list(self.model.embed(texts, **kwargs))
-        embeddings_array = np.array(embeddings, dtype=np.float32)
-
-        if normalize:
-            # L2 normalization
-            norms = np.linalg.norm(embeddings_array, axis=1, keepdims=True)
-            embeddings_array = embeddings_array / (norms + 1e-8)
-
-        return embeddings_array
+        return self.encode_into(texts, normalize=normalize, **kwargs)
 
     def encode_one(self, text: str, normalize: bool = True, **kwargs: Any) -> np.ndarray:
         """Encode single string and return vector.
@@ -1,7 +1,27 @@
 """Generation modules for LLM and text generation."""
 
 from .generator import DummyLLM, Generator, OpenRouterLLM
-from .openrouter_client import chat_with_openrouter
+from .openrouter_client import (
+    OpenRouterClient,
+    OpenRouterError,
+    chat_with_openrouter,
+    get_openrouter_client,
+    stream_chat_with_openrouter,
+)
+from .precomputed import PrecomputedAnswers, load_precomputed, validate_answer
 from .prompting import build_json_prompt
 
-__all__ = ["DummyLLM", "Generator", "OpenRouterLLM", "build_json_prompt", "chat_with_openrouter"]
+__all__ = [
+    "DummyLLM",
+    "Generator",
+    "OpenRouterClient",
+    "OpenRouterError",
+    "OpenRouterLLM",
+    "PrecomputedAnswers",
+    "build_json_prompt",
+    "chat_with_openrouter",
+    "get_openrouter_client",
+    "load_precomputed",
+    "stream_chat_with_openrouter",
+    "validate_answer",
+]
@@ -1,12 +1,18 @@
 import json
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from time import perf_counter
 from typing import Any, Protocol
 
-from .openrouter_client import chat_with_openrouter
+from ..observability import rag_llm_tokens_per_second, rag_llm_ttft
+from .openrouter_client import OPENROUTER_BASE_URL, OpenRouterClient, get_openrouter_client
 
 
 class LLMProtocol(Protocol):
-    """Protocol for LLM implementations."""
+    """Protocol for LLM implementations.
+
+    Implementations may also provide ``stream(prompt) -> Iterator[str]`` yielding
+    text deltas; Generator.stream_generate uses it when present.
+    """
 
     def generate(self, prompt: str) -> str:
         """Generate response from prompt."""
@@ -28,16 +34,46 @@ class DummyLLM:
         return json.dumps({"answer": "I don't know", "citations": [], "confidence": 0.0})
 
 
+def _strip_code_fence(content: str) -> str:
+    """Handle markdown-wrapped JSON."""
+    if content.startswith("```json"):
+        # Extract JSON from markdown code block
+        # Remove the opening ```json and closing ``` markers
+        content = content.replace("```json", "").replace("```", "").strip()
+    return content
+
+
+def _error_json(e: Exception) -> str:
+    return json.dumps(
+        {
+            "answer": f"OpenRouter API error: {e!s}",
+            "citations": [],
+            "confidence": 0.0,
+            "error": str(e),
+        }
+    )
+
+
 class OpenRouterLLM:
     """OpenRouter LLM implementation."""
 
-    def __init__(self, model: str = "deepseek/deepseek-r1-0528:free"):
+    def __init__(
+        self,
+        model: str = "deepseek/deepseek-r1-0528:free",
+        base_url: str = OPENROUTER_BASE_URL,
+        api_key: str | None = None,
+        client: OpenRouterClient | None = None,
+    ):
         """Initialize OpenRouter LLM.
 
         Args:
             model: OpenRouter model name
+            base_url: OpenAI-compatible API root (ignored with client)
+            api_key: API key (default: RAG_OPENROUTER_API_KEY; ignored with client)
+            client: Pooled OpenRouter client (default: shared client for base_url)
         """
         self.model = model
+        self.client = client or get_openrouter_client(base_url, api_key or "")
 
     def generate(self, prompt: str) -> str:
         """Generate response using OpenRouter API.
@@ -49,27 +85,62 @@ class OpenRouterLLM:
             Generated response string or error JSON
         """
         try:
-            response = chat_with_openrouter(prompt, self.model)
+            response = self.client.chat(prompt, self.model)
             content = response["choices"][0]["message"]["content"]
             print(f"[DEBUG] OpenRouter response: {content[:200]}...")
+            return _strip_code_fence(content)
+        except Exception as e:
+            print(f"[DEBUG] OpenRouter error: {e}")
+            return _error_json(e)
 
-            # Handle markdown-wrapped JSON
-            if content.startswith("```json"):
-                # Extract JSON from markdown code block
-                # Remove the opening ```json and closing ``` markers
-                content = content.replace("```json", "").replace("```", "").strip()
+    async def agenerate(self, prompt: str) -> str:
+        """Async variant of ``generate``.
 
-            return content
+        Args:
+            prompt: Input prompt for the model
+
+        Returns:
+            Generated response string or error JSON
+        """
+        try:
+            response = await self.client.achat(prompt, self.model)
+            return _strip_code_fence(response["choices"][0]["message"]["content"])
         except Exception as e:
             print(f"[DEBUG] OpenRouter error: {e}")
-            return json.dumps(
-                {
-                    "answer": f"OpenRouter API error: {e!s}",
-                    "citations": [],
-                    "confidence": 0.0,
-                    "error": str(e),
-                }
-            )
+            return _error_json(e)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Stream the response as text deltas while OpenRouter generates it.
+
+        Records time to first token and the decode rate after it (completion tokens
+        from the final usage chunk, else the number of content deltas).
+
+        Args:
+            prompt: Input prompt for the model
+
+        Yields:
+            Content deltas in order
+        """
+        t0 = perf_counter()
+        first_token_at = None
+        deltas = 0
+        completion_tokens = None
+        for chunk in self.client.stream_chat(prompt, self.model):
+            if chunk.get("usage"):
+                completion_tokens = chunk["usage"].get("completion_tokens")
+            for choice in chunk.get("choices", []):
+                content = (choice.get("delta") or {}).get("content")
+                if not content:
+                    continue
+                if first_token_at is None:
+                    first_token_at = perf_counter()
+                    rag_llm_ttft.observe(first_token_at - t0)
+                deltas += 1
+                yield content
+        if first_token_at is not None:
+            elapsed = perf_counter() - first_token_at
+            if elapsed > 0:
+                rag_llm_tokens_per_second.observe((completion_tokens or deltas) / elapsed)
 
 
 class Generator:
@@ -139,39 +210,53 @@ class Generator:
         """
         try:
             raw = self.llm.generate(prompt)
-            return json.loads(raw)
-        except json.JSONDecodeError as e:
+            return self.parse_response(raw)
+        except Exception as e:
             return {
-                "answer": "LLM output parsing error",
+                "answer": "Generation error",
                 "citations": [],
                 "confidence": 0.0,
                 "error": str(e),
             }
-        except Exception as e:
+
+    def parse_response(self, raw: str) -> dict[str, Any]:
+        """Parse raw LLM output (JSON, possibly markdown-wrapped) into an answer.
+
+        Args:
+            raw: Complete LLM response text
+
+        Returns:
+            Answer dictionary, or an error dictionary if the output is not JSON
+        """
+        try:
+            return json.loads(_strip_code_fence(raw.strip()))
+        except json.JSONDecodeError as e:
             return {
-                "answer": "Generation error",
+                "answer": "LLM output parsing error",
                 "citations": [],
                 "confidence": 0.0,
                 "error": str(e),
             }
 
     def stream_generate(self, prompt: str) -> Iterable[str | dict[str, Any]]:
-        """Simulate streaming: yield response chunks.
+        """Stream response chunks as the LLM produces them.
 
         Args:
             prompt: Formatted prompt for the LLM
 
         Yields:
-            Response chunks as JSON strings or parsed objects
+            ``{"delta": text}`` JSON strings; concatenated deltas form the raw
+            answer JSON. A failure is reported as a final ``{"error": ...}`` chunk.
 
         Note:
-            Currently simulates streaming behavior.
+            LLMs without ``stream`` send their whole response as one delta.
         """
         try:
-            # In real implementation, LLM connection with chunks will be here
-            chunk = {"delta": "..."}
-            yield json.dumps(chunk)  # string
-            # Or for convenience:
-            # yield chunk
+            stream = getattr(self.llm, "stream", None)
+            if stream is None:
+                yield json.dumps({"delta": self.llm.generate(prompt)})
+                return
+            for delta in stream(prompt):
+                yield json.dumps({"delta": delta})
         except Exception as e:
             yield json.dumps({"error": str(e)})
@@ -1,13 +1,349 @@
-import os
-from pathlib import Path
+import asyncio
+import json
+import logging
+import threading
+from collections.abc import AsyncIterator, Iterable, Iterator
+from functools import cache
+from time import monotonic
 from typing import Any
 
-import requests
-from dotenv import load_dotenv
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_random_exponential,
+)
+
+from ..config import Settings
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+
+class OpenRouterError(Exception):
+    """Non-200 response from the chat completions endpoint."""
+
+    def __init__(self, status_code: int, body: str):
+        super().__init__(f"OpenRouter API error: {status_code} - {body}")
+        self.status_code = status_code
+
+
+def _retryable(exc: BaseException) -> bool:
+    """Rate limits, server errors and transport failures are worth another attempt."""
+    if isinstance(exc, OpenRouterError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return isinstance(exc, httpx.TransportError)
+
+
+def _log_retry(state: RetryCallState) -> None:
+    exc = state.outcome.exception() if state.outcome else None
+    logger.warning(f"[LLM] Attempt {state.attempt_number} failed ({exc}), retrying")
+
+
+_DONE: dict[str, Any] = {}
+
+
+def iter_sse_data(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Parse the JSON payloads of a chat completions server-sent event stream.
+
+    Comment lines (OpenRouter sends ``: OPENROUTER PROCESSING`` keep-alives) and
+    blank separators are skipped; the stream ends at ``data: [DONE]``.
+
+    Args:
+        lines: Decoded lines of the response body
+
+    Yields:
+        One parsed chunk per ``data:`` line
+
+    Raises:
+        Exception: If the stream reports an error mid-way
+    """
+    for line in lines:
+        chunk = _parse_sse_line(line)
+        if chunk is _DONE:
+            return
+        if chunk is not None:
+            yield chunk
+
+
+def _parse_sse_line(line: str) -> dict[str, Any] | None:
+    """Chunk of one SSE line, None for non-data lines, _DONE at the end marker."""
+    if not line.startswith("data:"):
+        return None
+    payload = line[len("data:") :].strip()
+    if payload == "[DONE]":
+        return _DONE
+    chunk = json.loads(payload)
+    if "error" in chunk:
+        raise Exception(f"OpenRouter stream error: {chunk['error']}")
+    return chunk
+
+
+class OpenRouterClient:
+    """Long-lived OpenRouter (OpenAI-compatible) chat completions client.
+
+    One pooled keep-alive connection set (HTTP/2 where the server offers it) is
+    shared by all calls, so requests skip the TCP/TLS handshake. Every call has a
+    deadline covering all of its attempts; 429, 5xx and transport errors are
+    retried with jittered exponential backoff until the attempts or the deadline
+    run out, and at most ``max_concurrency`` requests are in flight at once.
+    Sync and async interfaces share the settings but not the connections; the
+    async side is bound to the event loop that first uses it.
+    """
+
+    def __init__(
+        self,
+        api_key: str = "",
+        base_url: str = OPENROUTER_BASE_URL,
+        timeout: float = 30.0,
+        deadline: float = 60.0,
+        max_retries: int = 3,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        http2: bool = True,
+    ):
+        """Initialize OpenRouter client.
+
+        Args:
+            api_key: OpenRouter API key
+            base_url: OpenAI-compatible API root
+            timeout: Seconds per attempt (connect, and between streamed chunks)
+            deadline: Seconds per call, retries included
+            max_retries: Attempts per call
+            max_concurrency: Requests in flight at once
+            max_connections: Pooled keep-alive connections
+            http2: Negotiate HTTP/2 with the server
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.http2 = http2
+        self._limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._async_semaphore: asyncio.Semaphore | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, s: Settings) -> "OpenRouterClient":
+        """Build a client from application settings (API key read once, here)."""
+        return cls(
+            api_key=s.openrouter_api_key,
+            base_url=s.openrouter_base_url,
+            timeout=s.openrouter_timeout,
+            deadline=s.openrouter_deadline,
+            max_retries=s.openrouter_max_retries,
+            max_concurrency=s.openrouter_max_concurrency,
+            max_connections=s.openrouter_max_connections,
+            http2=s.openrouter_http2,
+        )
+
+    @property
+    def client(self) -> httpx.Client:
+        """Pooled sync HTTP client, created on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        base_url=self.base_url, http2=self.http2, limits=self._limits
+                    )
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Pooled async HTTP client, created on first use."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.base_url, http2=self.http2, limits=self._limits
+            )
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._async_client
+
+    def close(self) -> None:
+        """Close the sync connection pool."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        """Close the async connection pool."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def _request_kwargs(self, prompt: str, model: str, stream: bool) -> dict[str, Any]:
+        """Headers and body of a chat completions request."""
+        if not self.api_key:
+            raise ValueError("RAG_OPENROUTER_API_KEY not set in .env file.")
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        body: dict[str, Any] = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+        if stream:
+            headers["Accept"] = "text/event-stream"
+            body["stream"] = True
+        return {"headers": headers, "json": body}
+
+    def _retry_options(self) -> dict[str, Any]:
+        return {
+            "stop": stop_after_attempt(self.max_retries) | stop_after_delay(self.deadline),
+            "wait": wait_random_exponential(multiplier=0.5, max=8),
+            "retry": retry_if_exception(_retryable),
+            "before_sleep": _log_retry,
+            "reraise": True,
+        }
+
+    def _attempt_timeout(self, ends: float) -> httpx.Timeout:
+        """Per-attempt timeout, cut short by the call deadline."""
+        remaining = ends - monotonic()
+        if remaining <= 0:
+            raise httpx.TimeoutException("OpenRouter call deadline exceeded")
+        return httpx.Timeout(min(self.timeout, remaining))
+
+    def chat(self, prompt: str, model: str) -> dict[str, Any]:
+        """Send a chat completion request.
+
+        Args:
+            prompt: The user's prompt/question
+            model: The model to use for completion
+
+        Returns:
+            The API response
+        """
+        kwargs = self._request_kwargs(prompt, model, stream=False)
+        ends = monotonic() + self.deadline
+
+        def attempt() -> dict[str, Any]:
+            response = self.client.post(
+                "/chat/completions", timeout=self._attempt_timeout(ends), **kwargs
+            )
+            if response.status_code != 200:
+                raise OpenRouterError(response.status_code, response.text)
+            return response.json()
+
+        with self._semaphore:
+            return Retrying(**self._retry_options())(attempt)
+
+    def stream_chat(self, prompt: str, model: str) -> Iterator[dict[str, Any]]:
+        """Send a streaming chat completion request and yield chunks as they arrive.
+
+        Only opening the stream is retried; once chunks flow a failure is raised.
+
+        Args:
+            prompt: The user's prompt/question
+            model: The model to use for completion
+
+        Yields:
+            Parsed ``chat.completion.chunk`` objects
+        """
+        kwargs = self._request_kwargs(prompt, model, stream=True)
+        ends = monotonic() + self.deadline
+
+        def attempt() -> httpx.Response:
+            request = self.client.build_request(
+                "POST", "/chat/completions", timeout=self._attempt_timeout(ends), **kwargs
+            )
+            response = self.client.send(request, stream=True)
+            if response.status_code != 200:
+                response.read()
+                response.close()
+                raise OpenRouterError(response.status_code, response.text)
+            return response
+
+        with self._semaphore:
+            response = Retrying(**self._retry_options())(attempt)
+            try:
+                yield from iter_sse_data(response.iter_lines())
+            finally:
+                response.close()
+
+    async def achat(self, prompt: str, model: str) -> dict[str, Any]:
+        """Async variant of ``chat``."""
+        kwargs = self._request_kwargs(prompt, model, stream=False)
+        ends = monotonic() + self.deadline
+        client = self.async_client
+
+        async def attempt() -> dict[str, Any]:
+            response = await client.post(
+                "/chat/completions", timeout=self._attempt_timeout(ends), **kwargs
+            )
+            if response.status_code != 200:
+                raise OpenRouterError(response.status_code, response.text)
+            return response.json()
+
+        async with self._async_semaphore:  # type: ignore[union-attr]
+            return await AsyncRetrying(**self._retry_options())(attempt)
+
+    async def astream_chat(self, prompt: str, model: str) -> AsyncIterator[dict[str, Any]]:
+        """Async variant of ``stream_chat``."""
+        kwargs = self._request_kwargs(prompt, model, stream=True)
+        ends = monotonic() + self.deadline
+        client = self.async_client
+
+        async def attempt() -> httpx.Response:
+            request = client.build_request(
+                "POST", "/chat/completions", timeout=self._attempt_timeout(ends), **kwargs
+            )
+            response = await client.send(request, stream=True)
+            if response.status_code != 200:
+                await response.aread()
+                await response.aclose()
+                raise OpenRouterError(response.status_code, response.text)
+            return response
+
+        async with self._async_semaphore:  # type: ignore[union-attr]
+            response: httpx.Response = await AsyncRetrying(**self._retry_options())(attempt)
+            try:
+                async for line in response.aiter_lines():
+                    chunk = _parse_sse_line(line)
+                    if chunk is _DONE:
+                        return
+                    if chunk is not None:
+                        yield chunk
+            finally:
+                await response.aclose()
+
+
+@cache
+def get_openrouter_client(
+    base_url: str = OPENROUTER_BASE_URL, api_key: str = ""
+) -> OpenRouterClient:
+    """Get a process-wide client; settings (and the .env API key) are read once.
+
+    Args:
+        base_url: OpenAI-compatible API root
+        api_key: API key (default: RAG_OPENROUTER_API_KEY from settings)
+
+    Returns:
+        Shared OpenRouterClient instance
+    """
+    s = Settings()
+    return OpenRouterClient(
+        api_key=api_key or s.openrouter_api_key,
+        base_url=base_url,
+        timeout=s.openrouter_timeout,
+        deadline=s.openrouter_deadline,
+        max_retries=s.openrouter_max_retries,
+        max_concurrency=s.openrouter_max_concurrency,
+        max_connections=s.openrouter_max_connections,
+        http2=s.openrouter_http2,
+    )
 
 
 def chat_with_openrouter(
-    prompt: str, model: str = "deepseek/deepseek-r1-0528:free"
+    prompt: str,
+    model: str = "deepseek/deepseek-r1-0528:free",
+    base_url: str = OPENROUTER_BASE_URL,
+    api_key: str | None = None,
 ) -> dict[str, Any]:
     """
     Send a chat completion request to OpenRouter API
@@ -15,28 +351,30 @@ def chat_with_openrouter(
     Args:
         prompt (str): The user's prompt/question
         model (str): The model to use for completion
+        base_url (str): OpenAI-compatible API root
+        api_key (str | None): API key (default: RAG_OPENROUTER_API_KEY)
 
     Returns:
         dict: The API response
     """
-    # Set OpenRouter API key
-    project_root = Path(__file__).parent.parent.parent.parent
-    env_path = project_root / ".env"
-    load_dotenv(dotenv_path=env_path)
-
-    api_key = os.getenv("RAG_OPENROUTER_API_KEY")
-    if not api_key:
-        raise ValueError("RAG_OPENROUTER_API_KEY not set in .env file.")
+    return get_openrouter_client(base_url, api_key or "").chat(prompt, model)
 
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
-    data = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+def stream_chat_with_openrouter(
+    prompt: str,
+    model: str = "deepseek/deepseek-r1-0528:free",
+    base_url: str = OPENROUTER_BASE_URL,
+    api_key: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Send a streaming chat completion request and yield chunks as they arrive.
 
-    response = requests.post(
-        "https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data, timeout=30
-    )
-
-    if response.status_code != 200:
-        raise Exception(f"OpenRouter API error: {response.status_code} - {response.text}")
+    Args:
+        prompt: The user's prompt/question
+        model: The model to use for completion
+        base_url: OpenAI-compatible API root
+        api_key: API key (default: RAG_OPENROUTER_API_KEY)
 
-    return response.json()
+    Yields:
+        Parsed ``chat.completion.chunk`` objects
+    """
+    return get_openrouter_client(base_url, api_key or "").stream_chat(prompt, model)
@@ -0,0 +1,111 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+from .generator import _strip_code_fence
+
+logger = logging.getLogger(__name__)
+
+
+def load_precomputed(path: str | Path) -> dict[str, dict[str, Any]]:
+    """Read a precomputed answer file (JSON lines, later lines win).
+
+    A truncated last line, as left by an interrupted run, is skipped.
+
+    Args:
+        path: Precomputed answer file
+
+    Returns:
+        Entries keyed by source_id (empty if the file does not exist)
+    """
+    path = Path(path)
+    entries: dict[str, dict[str, Any]] = {}
+    if not path.exists():
+        return entries
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"[PRECOMPUTED] Skipping malformed line in {path}")
+                continue
+            entries[entry["source_id"]] = entry
+    return entries
+
+
+def validate_answer(raw: str, source_id: str, min_confidence: float = 0.0) -> dict[str, Any]:
+    """Parse and check an LLM answer generated from a single FAQ item.
+
+    Args:
+        raw: LLM output
+        source_id: The only source the answer may cite
+        min_confidence: Lowest confidence accepted
+
+    Returns:
+        Answer with ``answer``, ``citations`` (always ``[source_id]``) and ``confidence``
+
+    Raises:
+        ValueError: If the output is not a usable answer
+    """
+    try:
+        result = json.loads(_strip_code_fence(raw.strip()))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"not JSON: {e}") from e
+    if not isinstance(result, dict) or "error" in result:
+        raise ValueError(f"not an answer: {raw[:100]}")
+    answer = result.get("answer")
+    if not isinstance(answer, str) or not answer.strip():
+        raise ValueError("empty answer")
+    citations = result.get("citations", [])
+    if not isinstance(citations, list) or any(c != source_id for c in citations):
+        raise ValueError(f"cites sources outside the context: {citations}")
+    confidence = result.get("confidence")
+    if isinstance(confidence, bool) or not isinstance(confidence, int | float):
+        raise ValueError("missing confidence")
+    if not 0.0 <= confidence <= 1.0 or confidence < min_confidence:
+        raise ValueError(f"confidence {confidence} out of range")
+    return {"answer": answer.strip(), "citations": [source_id], "confidence": float(confidence)}
+
+
+class PrecomputedAnswers:
+    """Answers generated offline for every FAQ item, keyed by ``source_id``.
+
+    Built by ``python -m src.workers.precompute_answers``. With ``item_hashes``
+    (from the ingest manifest) only entries generated from the currently
+    ingested version of their item are served.
+    """
+
+    def __init__(self, path: str | Path, item_hashes: dict[str, str] | None = None):
+        """Load precomputed answers.
+
+        Args:
+            path: Precomputed answer file
+            item_hashes: Current content hash per FAQ item ID (None - serve every entry)
+        """
+        entries = load_precomputed(path)
+        if item_hashes is not None:
+            entries = {
+                sid: e
+                for sid, e in entries.items()
+                if item_hashes.get(sid.rsplit("#", 1)[0]) == e.get("item_hash")
+            }
+        self._entries = entries
+        logger.info(f"[PRECOMPUTED] Loaded {len(entries)} answers from {path}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, source_id: str) -> tuple[dict[str, Any], float] | None:
+        """Precomputed answer of a FAQ item.
+
+        Args:
+            source_id: Hit source ID ("<item id>#0")
+
+        Returns:
+            (answer, seconds it took to generate), or None if there is none
+        """
+        entry = self._entries.get(source_id)
+        if entry is None:
+            return None
+        return dict(entry["answer"]), float(entry.get("latency", 0.0))
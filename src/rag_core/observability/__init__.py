@@ -1,6 +1,75 @@
 """Observability modules for monitoring, metrics, and caching."""
 
 from .caching import TwoLevelCache
-from .observability import metrics_endpoint, rag_errors, rag_latency, rag_requests
+from .observability import (
+    metrics_endpoint,
+    rag_answers,
+    rag_cache_hits,
+    rag_cache_misses,
+    rag_coalesced_requests,
+    rag_embed_batch_size,
+    rag_embed_queue_depth,
+    rag_embedding_cache_bytes,
+    rag_embedding_cache_hits,
+    rag_embedding_cache_misses,
+    rag_errors,
+    rag_latency,
+    rag_llm_tokens_per_second,
+    rag_llm_ttft,
+    rag_precomputed_saved_seconds,
+    rag_requests,
+    rag_rerank_batch_size,
+    rag_rerank_cache_hits,
+    rag_rerank_cache_misses,
+    rag_rerank_padding_ratio,
+    rag_rerank_queue_wait,
+    rag_rerank_skipped,
+    rag_retrieval_leg_latency,
+    rag_retrieval_leg_queue_wait,
+    rag_retrieval_leg_timeouts,
+    rag_retrieval_stage_candidates,
+    rag_retrieval_stage_latency,
+    rag_semantic_cache_hits,
+    rag_semantic_cache_misses,
+    rag_semantic_cache_saved_seconds,
+    rag_semantic_cache_similarity,
+)
+from .semantic_cache import SemanticAnswerCache
+from .singleflight import SingleFlight
 
-__all__ = ["TwoLevelCache", "metrics_endpoint", "rag_errors", "rag_latency", "rag_requests"]
+__all__ = [
+    "SemanticAnswerCache",
+    "SingleFlight",
+    "TwoLevelCache",
+    "metrics_endpoint",
+    "rag_answers",
+    "rag_cache_hits",
+    "rag_cache_misses",
+    "rag_coalesced_requests",
+    "rag_embed_batch_size",
+    "rag_embed_queue_depth",
+    "rag_embedding_cache_bytes",
+    "rag_embedding_cache_hits",
+    "rag_embedding_cache_misses",
+    "rag_errors",
+    "rag_latency",
+    "rag_llm_tokens_per_second",
+    "rag_llm_ttft",
+    "rag_precomputed_saved_seconds",
+    "rag_requests",
+    "rag_rerank_batch_size",
+    "rag_rerank_cache_hits",
+    "rag_rerank_cache_misses",
+    "rag_rerank_padding_ratio",
+    "rag_rerank_queue_wait",
+    "rag_rerank_skipped",
+    "rag_retrieval_leg_latency",
+    "rag_retrieval_leg_queue_wait",
+    "rag_retrieval_leg_timeouts",
+    "rag_retrieval_stage_candidates",
+    "rag_retrieval_stage_latency",
+    "rag_semantic_cache_hits",
+    "rag_semantic_cache_misses",
+    "rag_semantic_cache_saved_seconds",
+    "rag_semantic_cache_similarity",
+]
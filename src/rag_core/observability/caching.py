@@ -1,7 +1,9 @@
 import hashlib
 import json
 import logging
+import threading
 import time
+from collections.abc import Sequence
 from typing import Any
 
 import redis
@@ -13,26 +15,32 @@ class TwoLevelCache:
     """Two-level cache implementation.
 
     Combines in-memory dictionary for fast repeated requests within process
-    and Redis for persistent storage between processes/hosts.
+    and Redis for persistent storage between processes/hosts. The memory level
+    is guarded by a lock, so one cache can be shared by worker threads.
     """
 
     def __init__(
         self,
-        redis_url: str = "redis://localhost:6379/0",
+        redis_url: str | None = "redis://localhost:6379/0",
         ttl: int = 300,
         namespace: str = "rag_cache:",
+        max_memory_items: int | None = None,
     ):
         """Initialize two-level cache.
 
         Args:
-            redis_url: Redis connection URL
+            redis_url: Redis connection URL (None - memory only)
             ttl: Time-to-live in seconds for cached items
             namespace: Prefix for Redis keys
+            max_memory_items: Bound on in-memory entries, least recently used evicted
+                first (None - unbounded, 0 - Redis only)
         """
         self.ttl = ttl
         self.namespace = namespace
+        self.max_memory_items = max_memory_items
         self.memory_store: dict[str, tuple[Any, float]] = {}
-        self.redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._lock = threading.Lock()
+        self.redis = redis.Redis.from_url(redis_url, decode_responses=True) if redis_url else None
 
     def _now(self) -> float:
         """Get current timestamp.
@@ -42,6 +50,24 @@ class TwoLevelCache:
         """
         return time.time()
 
+    def _remember(self, key: str, value: Any, expires: float) -> None:
+        """Put value into the in-memory level, respecting max_memory_items.
+
+        Args:
+            key: Namespaced key
+            value: Value to store
+            expires: Expiry timestamp
+        """
+        if self.max_memory_items == 0:
+            return
+        with self._lock:
+            # Re-insert so dict order tracks recency
+            self.memory_store.pop(key, None)
+            self.memory_store[key] = (value, expires)
+            if self.max_memory_items is not None:
+                while len(self.memory_store) > self.max_memory_items:
+                    self.memory_store.pop(next(iter(self.memory_store)))
+
     def _make_key(self, data: str) -> str:
         """Generate stable hash key.
 
@@ -66,22 +92,28 @@ class TwoLevelCache:
         key = self._make_key(raw_key)
 
         # 1. Память
-        value_ttl = self.memory_store.get(key)
-        if value_ttl:
-            value, expires = value_ttl
-            if expires > self._now():
-                logger.debug(f"[CACHE] Memory hit for {raw_key}")
-                return value
-            else:
+        with self._lock:
+            value_ttl = self.memory_store.get(key)
+            if value_ttl:
+                value, expires = value_ttl
+                if expires > self._now():
+                    logger.debug(f"[CACHE] Memory hit for {raw_key}")
+                    if self.max_memory_items is not None:
+                        # Move to the most recently used end
+                        self.memory_store.pop(key, None)
+                        self.memory_store[key] = value_ttl
+                    return value
                 self.memory_store.pop(key, None)
 
         # 2. Redis
+        if self.redis is None:
+            return None
         try:
             data = self.redis.get(key)
             if data is not None:
                 logger.debug(f"[CACHE] Redis hit for {raw_key}")
                 value = json.loads(data)
-                self.memory_store[key] = (value, self._now() + self.ttl)
+                self._remember(key, value, self._now() + self.ttl)
                 return value
         except Exception as e:
             logger.warning(f"[CACHE] Redis error: {e}")
@@ -100,14 +132,82 @@ class TwoLevelCache:
         expires = self._now() + self.ttl
 
         # Память
-        self.memory_store[key] = (value, expires)
+        self._remember(key, value, expires)
 
         # Redis
+        if self.redis is None:
+            return
         try:
             self.redis.setex(key, self.ttl, json.dumps(value))
         except Exception as e:
             logger.warning(f"[CACHE] Redis set error: {e}")
 
+    def get_many(self, raw_keys: Sequence[str]) -> list[Any | None]:
+        """Get several values, fetching memory misses from Redis in one MGET.
+
+        Args:
+            raw_keys: Raw keys to look up
+
+        Returns:
+            Cached value or None for each key
+        """
+        keys = [self._make_key(raw_key) for raw_key in raw_keys]
+        found: list[Any | None] = [None] * len(keys)
+        missing: list[int] = []
+        now = self._now()
+        with self._lock:
+            for i, key in enumerate(keys):
+                value_ttl = self.memory_store.get(key)
+                if value_ttl and value_ttl[1] > now:
+                    found[i] = value_ttl[0]
+                    if self.max_memory_items is not None:
+                        self.memory_store.pop(key, None)
+                        self.memory_store[key] = value_ttl
+                    continue
+                if value_ttl:
+                    self.memory_store.pop(key, None)
+                missing.append(i)
+
+        if self.redis is None or not missing:
+            return found
+        try:
+            data = self.redis.mget([keys[i] for i in missing])
+        except Exception as e:
+            logger.warning(f"[CACHE] Redis error: {e}")
+            return found
+        expires = self._now() + self.ttl
+        for i, raw in zip(missing, data, strict=True):
+            if raw is not None:
+                found[i] = json.loads(raw)
+                self._remember(keys[i], found[i], expires)
+        logger.debug(
+            f"[CACHE] {len(missing)} memory misses, {sum(d is not None for d in data)} Redis hits"
+        )
+        return found
+
+    def set_many(self, items: dict[str, Any]) -> None:
+        """Set several values, writing them to Redis in one pipelined batch.
+
+        Args:
+            items: Raw key -> value to cache
+        """
+        if not items:
+            return
+        expires = self._now() + self.ttl
+        keyed = {self._make_key(raw_key): value for raw_key, value in items.items()}
+        for key, value in keyed.items():
+            self._remember(key, value, expires)
+
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in keyed.items():
+                pipe.setex(key, self.ttl, json.dumps(value))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[CACHE] Redis set error: {e}")
+
     def invalidate(self, raw_key: str) -> None:
         """Remove value from cache.
 
@@ -115,7 +215,10 @@ class TwoLevelCache:
             raw_key: Raw key to remove
         """
         key = self._make_key(raw_key)
-        self.memory_store.pop(key, None)
+        with self._lock:
+            self.memory_store.pop(key, None)
+        if self.redis is None:
+            return
         try:
             self.redis.delete(key)
         except Exception as e:
@@ -21,6 +21,120 @@ rag_latency = Histogram(
     labelnames=["method"],
 )
 
+rag_retrieval_leg_latency = Histogram(
+    f"{METRICS_PREFIX}retrieval_leg_latency_seconds",
+    "Latency of a single retrieval leg",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    labelnames=["leg"],
+)  # leg: bm25|dense|hybrid
+rag_retrieval_leg_queue_wait = Histogram(
+    f"{METRICS_PREFIX}retrieval_leg_queue_wait_seconds",
+    "Time a retrieval leg waits for a free worker of the leg pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+    labelnames=["leg"],
+)
+rag_retrieval_leg_timeouts = Counter(
+    f"{METRICS_PREFIX}retrieval_leg_timeouts_total",
+    "Retrieval legs dropped after missing their timeout",
+    ["leg"],
+)
+
+rag_retrieval_stage_latency = Histogram(
+    f"{METRICS_PREFIX}retrieval_stage_latency_seconds",
+    "Latency of a retrieval cascade stage",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    labelnames=["stage"],
+)  # stage: search|fuse|rerank
+rag_retrieval_stage_candidates = Histogram(
+    f"{METRICS_PREFIX}retrieval_stage_candidates",
+    "Candidates entering a retrieval cascade stage",
+    buckets=(1, 5, 10, 20, 50, 100, 200, 500),
+    labelnames=["stage"],
+)  # stage: fuse|rerank|return
+rag_rerank_skipped = Counter(
+    f"{METRICS_PREFIX}rerank_skipped_total",
+    "Requests answered without the cross-encoder (fused top-1 margin early exit)",
+)
+rag_rerank_cache_hits = Counter(
+    f"{METRICS_PREFIX}rerank_cache_hits_total", "Reranker (query, document) score cache hits"
+)
+rag_rerank_cache_misses = Counter(
+    f"{METRICS_PREFIX}rerank_cache_misses_total", "Reranker (query, document) score cache misses"
+)
+rag_rerank_batch_size = Histogram(
+    f"{METRICS_PREFIX}rerank_batch_size",
+    "(query, document) pairs per cross-encoder call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+rag_rerank_padding_ratio = Histogram(
+    f"{METRICS_PREFIX}rerank_padding_ratio",
+    "Share of padding tokens in a cross-encoder call",
+    buckets=(0.0, 0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9),
+)
+rag_rerank_queue_wait = Histogram(
+    f"{METRICS_PREFIX}rerank_queue_wait_seconds",
+    "Time a rerank request waits for its cross-request batch",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+rag_semantic_cache_hits = Counter(
+    f"{METRICS_PREFIX}semantic_cache_hits_total", "Answers served from the semantic cache"
+)
+rag_semantic_cache_misses = Counter(
+    f"{METRICS_PREFIX}semantic_cache_misses_total", "Semantic answer cache misses"
+)
+rag_semantic_cache_similarity = Histogram(
+    f"{METRICS_PREFIX}semantic_cache_similarity",
+    "Cosine similarity of the closest cached query",
+    buckets=(0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.92, 0.94, 0.96, 0.98, 1.0),
+)
+rag_semantic_cache_saved_seconds = Counter(
+    f"{METRICS_PREFIX}semantic_cache_saved_seconds_total",
+    "Generation time saved by semantic cache hits",
+)
+rag_answers = Counter(
+    f"{METRICS_PREFIX}answers_total",
+    "Answers by source: llm, precomputed, answer_cache or semantic_cache",
+    ["source"],
+)
+rag_precomputed_saved_seconds = Counter(
+    f"{METRICS_PREFIX}precomputed_saved_seconds_total",
+    "Generation time saved by precomputed answers",
+)
+rag_llm_ttft = Histogram(
+    f"{METRICS_PREFIX}llm_time_to_first_token_seconds",
+    "Time from sending a streaming LLM request to its first token",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0),
+)
+rag_llm_tokens_per_second = Histogram(
+    f"{METRICS_PREFIX}llm_tokens_per_second",
+    "LLM decode rate after the first token",
+    buckets=(5, 10, 20, 40, 60, 80, 120, 200, 400),
+)
+rag_coalesced_requests = Counter(
+    f"{METRICS_PREFIX}coalesced_requests_total",
+    "Requests served by joining an identical in-flight request",
+    ["mode", "scope"],
+)
+
+rag_embed_queue_depth = Gauge(
+    f"{METRICS_PREFIX}embed_queue_depth", "Queries waiting for the embedding micro-batcher"
+)
+rag_embed_batch_size = Histogram(
+    f"{METRICS_PREFIX}embed_batch_size",
+    "Queries embedded per micro-batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+rag_embedding_cache_hits = Counter(
+    f"{METRICS_PREFIX}embedding_cache_hits_total", "Query embedding cache hits"
+)
+rag_embedding_cache_misses = Counter(
+    f"{METRICS_PREFIX}embedding_cache_misses_total", "Query embedding cache misses"
+)
+rag_embedding_cache_bytes = Gauge(
+    f"{METRICS_PREFIX}embedding_cache_bytes", "Memory held by the query embedding cache"
+)
+
 service_version = Gauge(f"{METRICS_PREFIX}version", "Service version", ["version"])
 service_version.labels(version="1.2.3").set(1)
 
@@ -0,0 +1,310 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Direction,
+    Distance,
+    ExtendedPointId,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    MatchValue,
+    OrderBy,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    Range,
+    VectorParams,
+)
+
+from .observability import (
+    rag_semantic_cache_hits,
+    rag_semantic_cache_misses,
+    rag_semantic_cache_saved_seconds,
+    rag_semantic_cache_similarity,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fixed namespace so an entry maps to the same persisted point ID in every process
+_POINT_NAMESPACE = uuid.UUID("5b0e3d8e-2f6c-4f0a-9a57-3c1d2e8f4b61")
+
+
+class SemanticAnswerCache:
+    """Answer cache keyed by query-embedding similarity.
+
+    Normalised query vectors live as rows of one preallocated float32 matrix; a
+    lookup is one matrix-vector product, and the most similar live entry of the
+    same scope (k, filters, ...) answers if its cosine similarity reaches
+    ``threshold``. Entries expire after ``ttl`` seconds, the least recently used
+    one is evicted when the matrix is full, and only entries built from the
+    current ``corpus_version`` are served.
+
+    With a Qdrant client, entries are also written to a small collection and
+    loaded back on start, so a restarted process keeps its cache. Point IDs are
+    derived from the entry's query (and scope and corpus version), so re-storing
+    an answer overwrites its point; evicted and expired entries are deleted, which
+    keeps the collection within capacity and TTL.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 2048,
+        threshold: float = 0.92,
+        ttl: int = 86400,
+        corpus_version: str = "",
+        client: QdrantClient | None = None,
+        collection_name: str = "answer_cache",
+    ):
+        """Initialize semantic answer cache.
+
+        Args:
+            capacity: Maximum number of cached answers
+            threshold: Minimum cosine similarity for a hit
+            ttl: Seconds an answer stays valid
+            corpus_version: Version of the indexed corpus answers are built from
+            client: Optional Qdrant client for persistence
+            collection_name: Qdrant collection holding persisted entries
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.corpus_version = corpus_version
+        self.client = client
+        self.collection_name = collection_name
+        self._matrix: np.ndarray | None = None
+        self._live = np.zeros(capacity, dtype=bool)
+        self._scopes = np.full(capacity, -1, dtype=np.int64)
+        self._expires = np.zeros(capacity, dtype=np.float64)
+        self._answers: list[Any] = [None] * capacity
+        self._latency = np.zeros(capacity, dtype=np.float64)
+        self._ids: list[str | None] = [None] * capacity
+        self._rows: dict[str, int] = {}
+        self._stale: list[str] = []
+        self._scope_codes: dict[str, int] = {}
+        self._lru: OrderedDict[int, None] = OrderedDict()
+        self._lock = threading.Lock()
+        if client is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _now(self) -> float:
+        return time.time()
+
+    def lookup(self, qvec: np.ndarray, scope: str = "") -> Any | None:
+        """Find the cached answer of the most similar earlier query.
+
+        Args:
+            qvec: Query vector
+            scope: Request parameters the answer depends on (must match exactly)
+
+        Returns:
+            Cached answer, or None on a miss
+        """
+        q = np.asarray(qvec, dtype=np.float32).ravel()
+        q = q / (np.linalg.norm(q) + 1e-8)
+        with self._lock:
+            code = self._scope_codes.get(scope)
+            if self._matrix is None or code is None:
+                rag_semantic_cache_misses.inc()
+                return None
+            self._drop_expired()
+            candidates = np.flatnonzero(self._live & (self._scopes == code))
+            if len(candidates) == 0:
+                rag_semantic_cache_misses.inc()
+                return None
+            sims = self._matrix[candidates] @ q
+            best = int(np.argmax(sims))
+            similarity = float(sims[best])
+            rag_semantic_cache_similarity.observe(similarity)
+            if similarity < self.threshold:
+                rag_semantic_cache_misses.inc()
+                return None
+            row = int(candidates[best])
+            self._lru.move_to_end(row)
+            rag_semantic_cache_hits.inc()
+            rag_semantic_cache_saved_seconds.inc(self._latency[row])
+            return self._answers[row]
+
+    def put(
+        self,
+        qvec: np.ndarray,
+        answer: Any,
+        scope: str = "",
+        latency: float = 0.0,
+        key: str = "",
+    ) -> None:
+        """Store an answer.
+
+        Args:
+            qvec: Query vector
+            answer: Final answer (JSON-serialisable)
+            scope: Request parameters the answer depends on
+            latency: Seconds it took to produce the answer (reported as saved on hits)
+            key: Normalised query the entry is identified by (default: the vector itself)
+        """
+        q = np.asarray(qvec, dtype=np.float32).ravel()
+        q = q / (np.linalg.norm(q) + 1e-8)
+        expires = self._now() + self.ttl
+        identity = key or q.tobytes().hex()
+        pid = str(uuid.uuid5(_POINT_NAMESPACE, f"{self.corpus_version}|{scope}|{identity}"))
+        self._put_local(pid, q, answer, scope, latency, expires)
+        if self.client is not None:
+            self._persist(pid, q, answer, scope, latency, expires)
+
+    def _free(self, row: int) -> None:
+        """Release a row, remembering its persisted point for deletion (caller holds the lock)."""
+        self._live[row] = False
+        self._answers[row] = None
+        self._lru.pop(row, None)
+        pid = self._ids[row]
+        if pid is not None:
+            self._rows.pop(pid, None)
+            self._ids[row] = None
+            if self.client is not None:
+                self._stale.append(pid)
+
+    def _put_local(
+        self, pid: str, q: np.ndarray, answer: Any, scope: str, latency: float, expires: float
+    ) -> None:
+        """Write an entry into its own, a free or the least recently used row."""
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.capacity, len(q)), dtype=np.float32)
+            free = np.flatnonzero(~self._live)
+            if pid in self._rows:
+                row = self._rows[pid]
+            elif len(free):
+                row = int(free[0])
+            else:
+                row = next(iter(self._lru))
+                self._free(row)
+            self._ids[row] = pid
+            self._rows[pid] = row
+            self._matrix[row] = q
+            self._live[row] = True
+            self._scopes[row] = self._scope_codes.setdefault(scope, len(self._scope_codes))
+            self._expires[row] = expires
+            self._answers[row] = answer
+            self._latency[row] = latency
+            self._lru[row] = None
+            self._lru.move_to_end(row)
+
+    def _drop_expired(self) -> None:
+        """Free rows whose TTL has passed (caller holds the lock)."""
+        expired = np.flatnonzero(self._live & (self._expires <= self._now()))
+        for row in expired:
+            self._free(int(row))
+
+    def clear(self) -> None:
+        """Drop all local entries (e.g. after the corpus changed)."""
+        with self._lock:
+            self._live[:] = False
+            self._answers = [None] * self.capacity
+            self._ids = [None] * self.capacity
+            self._rows.clear()
+            self._lru.clear()
+
+    def _persist(
+        self, pid: str, q: np.ndarray, answer: Any, scope: str, latency: float, expires: float
+    ) -> None:
+        """Write an entry to the Qdrant collection and prune stale points, without waiting."""
+        if self.client is None:
+            return
+        with self._lock:
+            stale: list[ExtendedPointId] = [p for p in self._stale if p != pid]
+            self._stale = []
+        try:
+            if not self.client.collection_exists(self.collection_name):
+                self.client.create_collection(
+                    self.collection_name,
+                    vectors_config=VectorParams(size=len(q), distance=Distance.COSINE),
+                )
+                self.client.create_payload_index(
+                    self.collection_name, "expires", PayloadSchemaType.FLOAT
+                )
+            self.client.upsert(
+                self.collection_name,
+                points=[
+                    PointStruct(
+                        id=pid,
+                        vector=q.tolist(),
+                        payload={
+                            "answer": answer,
+                            "scope": scope,
+                            "latency": latency,
+                            "expires": expires,
+                            "corpus_version": self.corpus_version,
+                        },
+                    )
+                ],
+                wait=False,
+            )
+            # Evicted entries of this process, and expired entries of any process
+            if stale:
+                self.client.delete(
+                    self.collection_name, points_selector=PointIdsList(points=stale), wait=False
+                )
+            self.client.delete(
+                self.collection_name,
+                points_selector=FilterSelector(
+                    filter=Filter(must=[FieldCondition(key="expires", range=Range(lt=self._now()))])
+                ),
+                wait=False,
+            )
+        except Exception as e:
+            logger.warning(f"[SEMANTIC CACHE] Persist error: {e}")
+
+    def _load(self) -> None:
+        """Warm the matrix from the most recent unexpired entries of the current corpus version."""
+        if self.client is None:
+            return
+        try:
+            if not self.client.collection_exists(self.collection_name):
+                return
+            # Ordering needs a range index on expires (a no-op if it already exists)
+            self.client.create_payload_index(
+                self.collection_name, "expires", PayloadSchemaType.FLOAT
+            )
+            points, _ = self.client.scroll(
+                self.collection_name,
+                scroll_filter=Filter(
+                    must=[
+                        FieldCondition(
+                            key="corpus_version", match=MatchValue(value=self.corpus_version)
+                        ),
+                        FieldCondition(key="expires", range=Range(gt=self._now())),
+                    ]
+                ),
+                limit=self.capacity,
+                order_by=OrderBy(key="expires", direction=Direction.DESC),
+                with_payload=True,
+                with_vectors=True,
+            )
+        except Exception as e:
+            logger.warning(f"[SEMANTIC CACHE] Load error: {e}")
+            return
+        # Oldest first, so the most recent entries end up most recently used
+        for point in reversed(points):
+            payload = point.payload
+            if payload is None or "answer" not in payload:
+                continue
+            self._put_local(
+                str(point.id),
+                np.asarray(point.vector, dtype=np.float32),
+                payload["answer"],
+                payload.get("scope", ""),
+                float(payload.get("latency", 0.0)),
+                float(payload["expires"]),
+            )
+        logger.info(f"[SEMANTIC CACHE] Loaded {len(points)} entries from {self.collection_name}")
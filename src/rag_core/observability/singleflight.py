@@ -0,0 +1,305 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+from typing import Any, TypeVar
+
+import redis
+
+from .observability import rag_coalesced_requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Delete the producer lock only if it still holds this producer's token
+_RELEASE_LOCK = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _ProducerLostError(RuntimeError):
+    """The cross-process producer went away before finishing."""
+
+
+class _Flight:
+    """One in-flight computation: its chunks so far and how it ended."""
+
+    def __init__(self) -> None:
+        self.cond = threading.Condition()
+        self.chunks: list[Any] = []
+        self.done = False
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+    def publish(self, chunk: Any) -> None:
+        with self.cond:
+            self.chunks.append(chunk)
+            self.cond.notify_all()
+
+    def finish(self, result: Any = None, error: BaseException | None = None) -> None:
+        with self.cond:
+            self.result, self.error, self.done = result, error, True
+            self.cond.notify_all()
+
+    def wait(self) -> Any:
+        with self.cond:
+            self.cond.wait_for(lambda: self.done)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _ready(self, seen: int) -> bool:
+        """Whether the flight ended or has chunks beyond the first ``seen``."""
+        return self.done or len(self.chunks) > seen
+
+    def follow(self) -> Iterator[Any]:
+        """Replay chunks published so far, then the rest as they arrive."""
+        i = 0
+        while True:
+            with self.cond:
+                self.cond.wait_for(partial(self._ready, i))
+                new, done, error = self.chunks[i:], self.done, self.error
+            i += len(new)
+            yield from new
+            if done and i == len(self.chunks):
+                if error is not None:
+                    raise error
+                return
+
+
+class SingleFlight:
+    """Coalesce identical concurrent requests into one computation.
+
+    Calls with the same key (and the same mode: ``do`` and ``stream`` calls never
+    join each other) made while one is in flight wait for it and share its result; stream followers first get the chunks produced so far, then the rest
+    live. Streams are produced on a background thread, so a leader that
+    disconnects does not cut off its followers.
+
+    With ``redis_url`` the in-process leader also coordinates with other
+    processes: a ``SET NX`` lock elects one producer per key, which appends
+    chunks to a Redis list and announces them on a pub/sub channel; followers in
+    other processes replay the list. If the producer dies (its lock expires) or
+    takes longer than ``wait_timeout``, a follower computes the result itself.
+    Results and chunks must be JSON-serialisable in that mode.
+    """
+
+    def __init__(
+        self,
+        redis_url: str | None = None,
+        lock_ttl: int = 60,
+        wait_timeout: float = 60.0,
+        namespace: str = "rag_flight:",
+    ):
+        """Initialize single-flight coalescer.
+
+        Args:
+            redis_url: Redis connection URL for cross-process coalescing (None - in-process only)
+            lock_ttl: Seconds a producer lock (and its chunk log) lives at most
+            wait_timeout: Seconds a cross-process follower waits before computing itself
+            namespace: Prefix for Redis keys and channels
+        """
+        self.redis = redis.Redis.from_url(redis_url, decode_responses=True) if redis_url else None
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.namespace = namespace
+        self._flights: dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: str) -> tuple[_Flight, bool]:
+        """The flight for key (mode-prefixed) and whether the caller leads it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def _land(self, key: str, flight: _Flight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key: Request identity
+            fn: Computation producing the shared result
+
+        Returns:
+            Result of fn (the same object for every caller)
+        """
+        key = f"answer:{key}"
+        flight, leader = self._join(key)
+        if not leader:
+            rag_coalesced_requests.labels(mode="answer", scope="local").inc()
+            return flight.wait()
+        try:
+            result = self._redis_do(key, fn) if self.redis is not None else fn()
+        except BaseException as e:
+            flight.finish(error=e)
+            raise
+        finally:
+            self._land(key, flight)
+        flight.finish(result)
+        return result
+
+    def stream(self, key: str, fn: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """Stream fn's chunks to all concurrent callers with the same key.
+
+        Args:
+            key: Request identity
+            fn: Computation producing the chunks
+
+        Yields:
+            Every chunk of the shared stream, from the start
+        """
+        key = f"stream:{key}"
+        flight, leader = self._join(key)
+        if leader:
+            source = (lambda: self._redis_stream(key, fn)) if self.redis is not None else fn
+            threading.Thread(
+                target=self._produce, args=(key, flight, source), name="singleflight", daemon=True
+            ).start()
+        else:
+            rag_coalesced_requests.labels(mode="stream", scope="local").inc()
+        yield from flight.follow()
+
+    def _produce(self, key: str, flight: _Flight, fn: Callable[[], Iterable[Any]]) -> None:
+        """Producer thread: publish fn's chunks to the flight."""
+        try:
+            for chunk in fn():
+                flight.publish(chunk)
+        except Exception as e:
+            logger.warning(f"[SINGLEFLIGHT] Stream {key[:50]} failed: {e}")
+            self._land(key, flight)
+            flight.finish(error=e)
+            return
+        self._land(key, flight)
+        flight.finish()
+
+    # Cross-process coordination
+
+    def _keys(self, key: str) -> tuple[str, str, str]:
+        """Lock key, chunk log key and channel for a request key."""
+        base = f"{self.namespace}{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+        return f"{base}:lock", f"{base}:log", base
+
+    def _redis_do(self, key: str, fn: Callable[[], T]) -> T:
+        # Drain the stream so the producer writes its end marker and releases the lock
+        (result,) = self._redis_stream(key, lambda: [fn()], mode="answer")
+        return result
+
+    def _redis_stream(
+        self, key: str, fn: Callable[[], Iterable[Any]], mode: str = "stream"
+    ) -> Iterator[Any]:
+        """Produce through Redis if this process wins the lock, else follow the producer."""
+        r = self.redis
+        if r is None:
+            yield from fn()
+            return
+        lock, log, channel = self._keys(key)
+        token = uuid.uuid4().hex
+        try:
+            leader = bool(r.set(lock, token, nx=True, ex=self.lock_ttl))
+        except redis.RedisError as e:
+            logger.warning(
+                f"[SINGLEFLIGHT] Redis unavailable, not coalescing across processes: {e}"
+            )
+            yield from fn()
+            return
+        if leader:
+            yield from self._redis_produce(r, lock, token, log, channel, fn)
+            return
+        followed = self._redis_follow(r, lock, log, channel)
+        try:
+            first = next(followed)
+        except StopIteration:
+            return
+        except _ProducerLostError:
+            # Nothing was received yet, so computing here duplicates no output
+            yield from fn()
+            return
+        rag_coalesced_requests.labels(mode=mode, scope="redis").inc()
+        yield first
+        yield from followed
+
+    def _redis_produce(
+        self,
+        r: redis.Redis,
+        lock: str,
+        token: str,
+        log: str,
+        channel: str,
+        fn: Callable[[], Iterable[Any]],
+    ) -> Iterator[Any]:
+        """Run fn, mirroring every chunk (then an end marker) to the Redis log.
+
+        The lock is released only while it still holds ``token``: a producer that
+        outlived ``lock_ttl`` must not delete the lock another process took since.
+        Redis failures are logged and never fail the computation.
+        """
+        try:
+            r.delete(log)
+        except redis.RedisError as e:
+            logger.warning(f"[SINGLEFLIGHT] Redis log reset failed: {e}")
+
+        def append(event: dict[str, Any]) -> None:
+            try:
+                r.rpush(log, json.dumps(event))
+                r.expire(log, self.lock_ttl)
+                r.publish(channel, "1")
+            except redis.RedisError as e:
+                logger.warning(f"[SINGLEFLIGHT] Redis append failed: {e}")
+
+        try:
+            for chunk in fn():
+                append({"chunk": chunk})
+                yield chunk
+        except Exception as e:
+            append({"error": str(e)})
+            raise
+        else:
+            append({"end": True})
+        finally:
+            try:
+                r.eval(_RELEASE_LOCK, 1, lock, token)
+            except redis.RedisError as e:
+                logger.warning(f"[SINGLEFLIGHT] Redis lock release failed: {e}")
+
+    def _redis_follow(self, r: redis.Redis, lock: str, log: str, channel: str) -> Iterator[Any]:
+        """Yield another process's chunks as they are appended to its log.
+
+        Raises:
+            _ProducerLostError: If the producer died, timed out or Redis failed
+        """
+        pubsub = r.pubsub(ignore_subscribe_messages=True)
+        received = 0
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            pubsub.subscribe(channel)
+            while time.monotonic() < deadline:
+                for raw in r.lrange(log, received, -1):
+                    received += 1
+                    event = json.loads(raw)
+                    if "end" in event:
+                        return
+                    if "error" in event:
+                        raise RuntimeError(event["error"])
+                    yield event["chunk"]
+                if not r.exists(lock) and r.llen(log) <= received:
+                    raise _ProducerLostError("producer released its lock without finishing")
+                pubsub.get_message(timeout=1.0)
+        except redis.RedisError as e:
+            raise _ProducerLostError(str(e)) from e
+        finally:
+            pubsub.close()
+        raise _ProducerLostError(f"no result within {self.wait_timeout}s")
@@ -1,8 +1,21 @@
+import json
 import time
+from collections.abc import Callable, Iterator
 from collections.abc import Generator as GenType
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
-from src.rag_core.generation import DummyLLM, Generator, build_json_prompt
+from src.rag_core.generation import DummyLLM, Generator, PrecomputedAnswers, build_json_prompt
+from src.rag_core.observability import (
+    SemanticAnswerCache,
+    SingleFlight,
+    TwoLevelCache,
+    rag_answers,
+    rag_cache_hits,
+    rag_cache_misses,
+    rag_precomputed_saved_seconds,
+)
+from src.rag_core.processing import normalize_query
 
 
 class SimpleRAG:
@@ -13,6 +26,14 @@ class SimpleRAG:
         generator: Generator | None = None,
         max_ctx_chars: int = 6000,
         debug: bool = False,
+        llm_concurrency: int = 4,
+        answer_cache: SemanticAnswerCache | None = None,
+        coalescer: SingleFlight | None = None,
+        result_cache: TwoLevelCache | None = None,
+        cache_version: Callable[[], str] | None = None,
+        precomputed: PrecomputedAnswers | None = None,
+        precomputed_min_score: float | None = None,
+        precomputed_min_margin: float | None = None,
     ) -> None:
         """
         Args:
@@ -21,57 +42,305 @@ class SimpleRAG:
             generator: LLM generator (default: DummyLLM)
             max_ctx_chars: Character limit for context in build_json_prompt
             debug: Whether to output debug info about stage timing
+            llm_concurrency: LLM calls in flight at once for answer_many
+            answer_cache: Optional semantic cache of final answers
+            coalescer: Optional single-flight coalescing of identical concurrent questions
+            result_cache: Optional exact-match cache of final answers
+            cache_version: Returns the models and corpus version answers are built from;
+                cached answers of another version are never served
+            precomputed: Optional answers generated offline per FAQ item
+            precomputed_min_score: Lowest top hit score that returns a precomputed answer
+            precomputed_min_margin: Lowest top-1 over top-2 score margin that returns a
+                precomputed answer (precomputed answers are never served unless both
+                thresholds are set)
         """
         self.embedder = embedder
         self.retriever = retriever
         self.generator = generator or Generator(embedder, DummyLLM())
         self.max_ctx_chars = max_ctx_chars
         self.debug = debug
+        self.llm_concurrency = llm_concurrency
+        self.answer_cache = answer_cache
+        self.coalescer = coalescer
+        self.result_cache = result_cache
+        self.cache_version = cache_version or (lambda: "")
+        self.precomputed = precomputed
+        self.precomputed_min_score = precomputed_min_score
+        self.precomputed_min_margin = precomputed_min_margin
 
-    def _prepare_prompt(self, q: str, k: int, filters: dict[str, Any] | None = None) -> str:
-        """Prepare prompt by encoding query and retrieving relevant documents.
+    @staticmethod
+    def _flight_key(q: str, k: int, filters: dict[str, Any] | None, fusion: str | None) -> str:
+        """Identity of a question for coalescing concurrent duplicates."""
+        return json.dumps([normalize_query(q), k, filters, fusion], sort_keys=True)
+
+    def _cache_scope(self, k: int, filters: dict[str, Any] | None, fusion: str | None) -> str:
+        """Request parameters (and cache version) a cached answer is only valid for."""
+        return json.dumps(
+            {"k": k, "filters": filters, "fusion": fusion, "version": self.cache_version()},
+            sort_keys=True,
+        )
+
+    def _cached_result(self, key: str) -> dict[str, Any] | None:
+        """Exact-match cache lookup (None without a cache or on a miss)."""
+        if self.result_cache is None:
+            return None
+        cached = self.result_cache.get(f"{self.cache_version()}|{key}")
+        if cached is None:
+            rag_cache_misses.inc()
+            return None
+        rag_cache_hits.inc()
+        rag_answers.labels(source="answer_cache").inc()
+        print("[DEBUG] Answer cache hit, skipping the pipeline")
+        return cached
+
+    @staticmethod
+    def _replay(answer: dict[str, Any]) -> str:
+        """A cached answer as a single stream chunk."""
+        return json.dumps({"delta": json.dumps(answer, ensure_ascii=False)})
+
+    def _cached_answer(self, qvec: Any, scope: str) -> dict[str, Any] | None:
+        """Semantic cache lookup (None without a cache or on a miss)."""
+        if self.answer_cache is None:
+            return None
+        cached = self.answer_cache.lookup(qvec, scope)
+        if cached is not None:
+            rag_answers.labels(source="semantic_cache").inc()
+            print("[DEBUG] Semantic cache hit, skipping retrieval and generation")
+        return cached
+
+    def _remember(
+        self, key: str, qvec: Any, scope: str, result: dict[str, Any], latency: float
+    ) -> None:
+        """Store a generated answer in the caches, unless generation failed."""
+        if "error" in result:
+            return
+        if self.result_cache is not None:
+            self.result_cache.set(f"{self.cache_version()}|{key}", result)
+        if self.answer_cache is not None and qvec is not None:
+            self.answer_cache.put(qvec, result, scope, latency=latency, key=key)
+
+    def _generate_and_cache(self, prompt: str, key: str, qvec: Any, scope: str) -> dict[str, Any]:
+        """Generate an answer and remember it (with its latency)."""
+        t0 = time.time()
+        result = self.generator.generate(prompt)
+        rag_answers.labels(source="llm").inc()
+        self._remember(key, qvec, scope, result, time.time() - t0)
+        return result
+
+    def _precomputed_answer(self, hits: list) -> dict[str, Any] | None:
+        """Precomputed answer of the top hit, if it clearly wins retrieval.
+
+        Args:
+            hits: Reranked (text, meta, score) hits, best first
+
+        Returns:
+            The top hit's precomputed answer, or None to generate one
+        """
+        min_score, min_margin = self.precomputed_min_score, self.precomputed_min_margin
+        if self.precomputed is None or min_score is None or min_margin is None or not hits:
+            return None
+        top = hits[0][2]
+        margin = top - hits[1][2] if len(hits) > 1 else float("inf")
+        if top < min_score or margin < min_margin:
+            return None
+        found = self.precomputed.get(hits[0][1].get("source_id", ""))
+        if found is None:
+            return None
+        answer, latency = found
+        rag_answers.labels(source="precomputed").inc()
+        rag_precomputed_saved_seconds.inc(latency)
+        print(
+            f"[DEBUG] Precomputed answer (score {top:.3f}, margin {margin:.3f}), skipping the LLM"
+        )
+        return answer
+
+    def _retrieve(
+        self,
+        q: str,
+        k: int,
+        filters: dict[str, Any] | None = None,
+        fusion: str | None = None,
+        qvec: Any = None,
+    ) -> list:
+        """Encode the query (unless already encoded) and retrieve relevant documents.
 
         Args:
             q: User question/query
             k: Number of documents to retrieve
             filters: Optional filters for retrieval
+            fusion: Optional score fusion method for this request
+            qvec: Query vector, if already encoded
 
         Returns:
-            Formatted prompt string ready for LLM
+            (text, meta, score) hits, best first
         """
-        print(f"[DEBUG] Starting prompt preparation for query: {q[:50]}...")
-        t0 = time.time()
-        qvec = self.embedder.encode_one(q)
-        print(f"[DEBUG] Encoding took {time.time() - t0:.3f}s")
+        print(f"[DEBUG] Starting retrieval for query: {q[:50]}...")
+        if qvec is None:
+            t0 = time.time()
+            qvec = self.embedder.encode_one(q)
+            print(f"[DEBUG] Encoding took {time.time() - t0:.3f}s")
 
         t1 = time.time()
         if self.retriever is None:
             print("[DEBUG] Retriever is None, using empty hits")
             hits = []
         else:
-            hits = self.retriever.retrieve(q, qvec, k=k, filters=filters)
+            options = {"fusion": fusion} if fusion else {}
+            hits = self.retriever.retrieve(q, qvec, k=k, filters=filters, **options)
         print(f"[DEBUG] Retrieval took {time.time() - t1:.3f}s — {len(hits)} hits")
+        return hits
 
+    def _prepare_prompt(self, q: str, hits: list) -> str:
+        """Build the LLM prompt from the question and its retrieved documents."""
         prompt = build_json_prompt(q, hits, max_ctx_chars=self.max_ctx_chars)
         print(f"[DEBUG] Prompt prepared, length: {len(prompt)}")
         return prompt
 
-    def answer(self, q: str, k: int = 6, filters: dict[str, Any] | None = None) -> dict[str, Any]:
+    def answer(
+        self,
+        q: str,
+        k: int = 6,
+        filters: dict[str, Any] | None = None,
+        fusion: str | None = None,
+    ) -> dict[str, Any]:
         """Generate answer for user question using RAG pipeline.
 
         Args:
             q: User question/query
             k: Number of documents to retrieve (default: 6)
             filters: Optional filters for retrieval
+            fusion: Optional score fusion method for this request
 
         Returns:
             Generated answer as dictionary
+
+        Note:
+            An exact-match cache hit returns before anything else runs; with a
+            coalescer, concurrent calls for the same question share one run. When the
+            top hit clearly wins retrieval, its precomputed answer skips the LLM.
         """
-        prompt = self._prepare_prompt(q, k, filters)
-        return self.generator.generate(prompt)
+        key = self._flight_key(q, k, filters, fusion)
+        cached = self._cached_result(key)
+        if cached is not None:
+            return cached
+        if self.coalescer is not None:
+            return self.coalescer.do(key, lambda: self._answer(q, k, filters, fusion, key))
+        return self._answer(q, k, filters, fusion, key)
+
+    def _answer(
+        self, q: str, k: int, filters: dict[str, Any] | None, fusion: str | None, key: str
+    ) -> dict[str, Any]:
+        """Uncached, uncoalesced body of answer."""
+        scope = self._cache_scope(k, filters, fusion)
+        qvec = None
+        if self.answer_cache is not None:
+            qvec = self.embedder.encode_one(q)
+            cached = self._cached_answer(qvec, scope)
+            if cached is not None:
+                return cached
+        hits = self._retrieve(q, k, filters, fusion, qvec=qvec)
+        precomputed = self._precomputed_answer(hits)
+        if precomputed is not None:
+            return precomputed
+        return self._generate_and_cache(self._prepare_prompt(q, hits), key, qvec, scope)
+
+    def answer_many(
+        self,
+        queries: list[str],
+        k: int = 6,
+        filters: dict[str, Any] | None = None,
+        fusion: str | None = None,
+    ) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Answer a batch of questions, yielding each answer as soon as it is ready.
+
+        All queries are embedded with one ``encode`` call and retrieved with
+        ``retriever.retrieve_many`` (batched leg searches and one rerank pass); the
+        LLM calls then run on at most ``llm_concurrency`` threads. Questions answered
+        by the exact-match cache are not embedded; those answered by the semantic
+        cache skip retrieval and generation, and those whose top hit has a
+        precomputed answer skip generation.
+
+        Args:
+            queries: User questions
+            k: Number of documents to retrieve per question (default: 6)
+            filters: Optional filters for retrieval, shared by all questions
+            fusion: Optional score fusion method
+
+        Yields:
+            (index into queries, generated answer) in completion order
+        """
+        keys = [self._flight_key(q, k, filters, fusion) for q in queries]
+        pending = []
+        for i, key in enumerate(keys):
+            cached = self._cached_result(key)
+            if cached is not None:
+                yield i, cached
+            else:
+                pending.append(i)
+        if not pending:
+            return
+
+        t0 = time.time()
+        qvecs = self.embedder.encode([queries[i] for i in pending])
+        print(f"[DEBUG] Encoding {len(pending)} queries took {time.time() - t0:.3f}s")
+
+        # Positions in pending that the semantic cache cannot answer either
+        scope = self._cache_scope(k, filters, fusion)
+        misses = []
+        for pos, qvec in enumerate(qvecs):
+            cached = self._cached_answer(qvec, scope)
+            if cached is not None:
+                yield pending[pos], cached
+            else:
+                misses.append(pos)
+        if not misses:
+            return
+
+        t1 = time.time()
+        batch = [queries[pending[pos]] for pos in misses]
+        batch_vecs = qvecs[misses]
+        options = {"fusion": fusion} if fusion else {}
+        if self.retriever is None:
+            hit_lists: list[list] = [[] for _ in batch]
+        elif hasattr(self.retriever, "retrieve_many"):
+            hit_lists = self.retriever.retrieve_many(
+                batch, batch_vecs, k=k, filters=filters, **options
+            )
+        else:
+            hit_lists = [
+                self.retriever.retrieve(q, qvec, k=k, filters=filters, **options)
+                for q, qvec in zip(batch, batch_vecs, strict=True)
+            ]
+        print(f"[DEBUG] Batch retrieval took {time.time() - t1:.3f}s")
+
+        prompts = []
+        for pos, q, hits in zip(misses, batch, hit_lists, strict=True):
+            precomputed = self._precomputed_answer(hits)
+            if precomputed is not None:
+                yield pending[pos], precomputed
+            else:
+                prompts.append((pos, build_json_prompt(q, hits, max_ctx_chars=self.max_ctx_chars)))
+        if not prompts:
+            return
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.llm_concurrency, len(prompts))),
+            thread_name_prefix="rag-llm",
+        ) as pool:
+            futures = {
+                pool.submit(
+                    self._generate_and_cache, p, keys[pending[pos]], qvecs[pos], scope
+                ): pending[pos]
+                for pos, p in prompts
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
 
     def answer_stream(
-        self, q: str, k: int = 6, filters: dict[str, Any] | None = None
+        self,
+        q: str,
+        k: int = 6,
+        filters: dict[str, Any] | None = None,
+        fusion: str | None = None,
     ) -> GenType[str | dict[str, Any], None, None]:
         """Generate streaming answer for user question using RAG pipeline.
 
@@ -79,9 +348,56 @@ class SimpleRAG:
             q: User question/query
             k: Number of documents to retrieve (default: 6)
             filters: Optional filters for retrieval
+            fusion: Optional score fusion method for this request
 
         Yields:
             Streaming response chunks
+
+        Note:
+            Cached and precomputed answers are replayed as a single delta. With a coalescer, a caller
+            asking the same question while its answer is streaming joins that stream
+            (already produced chunks are replayed first).
         """
-        prompt = self._prepare_prompt(q, k, filters)
-        yield from self.generator.stream_generate(prompt)
+        key = self._flight_key(q, k, filters, fusion)
+        cached = self._cached_result(key)
+        if cached is not None:
+            yield self._replay(cached)
+            return
+        if self.coalescer is not None:
+            yield from self.coalescer.stream(
+                key, lambda: self._answer_stream(q, k, filters, fusion, key)
+            )
+            return
+        yield from self._answer_stream(q, k, filters, fusion, key)
+
+    def _answer_stream(
+        self, q: str, k: int, filters: dict[str, Any] | None, fusion: str | None, key: str
+    ) -> Iterator[str | dict[str, Any]]:
+        """Uncached, uncoalesced body of answer_stream; caches the completed answer."""
+        scope = self._cache_scope(k, filters, fusion)
+        qvec = None
+        if self.answer_cache is not None:
+            qvec = self.embedder.encode_one(q)
+            cached = self._cached_answer(qvec, scope)
+            if cached is not None:
+                yield self._replay(cached)
+                return
+        hits = self._retrieve(q, k, filters, fusion, qvec=qvec)
+        precomputed = self._precomputed_answer(hits)
+        if precomputed is not None:
+            yield self._replay(precomputed)
+            return
+        prompt = self._prepare_prompt(q, hits)
+
+        t0 = time.time()
+        rag_answers.labels(source="llm").inc()
+        deltas = []
+        failed = False
+        for chunk in self.generator.stream_generate(prompt):
+            yield chunk
+            event = json.loads(chunk) if isinstance(chunk, str) else chunk
+            failed = failed or "error" in event
+            deltas.append(event.get("delta", ""))
+        if not failed:
+            result = self.generator.parse_response("".join(deltas))
+            self._remember(key, qvec, scope, result, time.time() - t0)
@@ -1,6 +1,14 @@
 """Processing modules for text processing and chunking."""
 
 from .chunking import fixed_chunk, simple_md_clean
+from .normalize import normalize_query
 from .pii import EMAIL_PATTERN, PHONE_PATTERN, redact_pii
 
-__all__ = ["EMAIL_PATTERN", "PHONE_PATTERN", "fixed_chunk", "redact_pii", "simple_md_clean"]
+__all__ = [
+    "EMAIL_PATTERN",
+    "PHONE_PATTERN",
+    "fixed_chunk",
+    "normalize_query",
+    "redact_pii",
+    "simple_md_clean",
+]
@@ -0,0 +1,22 @@
+import re
+
+# Compile patterns once for speed
+_PUNCT = re.compile(r"[^\w\s]")
+_WS = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text for use as a cache key.
+
+    Lowercases, drops punctuation and collapses whitespace, so trivially different
+    spellings of the same question ("How much is Premium?" / "how much is premium")
+    map to the same key.
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        Normalized query text
+    """
+    text = _PUNCT.sub(" ", text.casefold())
+    return _WS.sub(" ", text).strip()
@@ -1,6 +1,20 @@
 """Retrieval modules for document retrieval and reranking."""
 
+from .fusion import FUSION_METHODS, FusionMethod, fuse
+from .late_interaction import LateInteractionReranker, is_late_interaction_model
+from .rerank_batching import RerankBatcher
 from .rerankers import CrossEncoderReranker
 from .retriever import HybridRetriever
+from .score_cache import RerankScoreCache
 
-__all__ = ["CrossEncoderReranker", "HybridRetriever"]
+__all__ = [
+    "FUSION_METHODS",
+    "CrossEncoderReranker",
+    "FusionMethod",
+    "HybridRetriever",
+    "LateInteractionReranker",
+    "RerankBatcher",
+    "RerankScoreCache",
+    "fuse",
+    "is_late_interaction_model",
+]
@@ -0,0 +1,120 @@
+from collections.abc import Callable, Sequence
+from typing import Any, get_args
+
+import numpy as np
+
+from ..config import FusionMethod
+
+Hits = list[tuple[Any, dict, float]]
+
+FUSION_METHODS: tuple[str, ...] = get_args(FusionMethod)
+RRF_K = 60
+
+
+def hit_key(hit: tuple[Any, dict, float]) -> Any:
+    """Identity of a hit across legs: its source_id, falling back to the hit itself."""
+    meta = hit[1] or {}
+    return meta.get("source_id") or hit[0]
+
+
+def _max(scores: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Divide by the leg maximum (the original HybridRetriever behaviour)."""
+    top = scores[present].max()
+    return np.where(present, scores / top if top else scores, 0.0)
+
+
+def _minmax(scores: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Rescale the leg to [0, 1]."""
+    lo, hi = scores[present].min(), scores[present].max()
+    span = hi - lo
+    return np.where(present, (scores - lo) / span if span else 1.0, 0.0)
+
+
+def _zscore(scores: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Standardise the leg; candidates it missed get its lowest z-score."""
+    values = scores[present]
+    std = values.std()
+    z = (scores - values.mean()) / std if std else np.zeros_like(scores)
+    return np.where(present, z, z[present].min())
+
+
+def _dbsf(scores: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Distribution-based score fusion: clip to mean +/- 3 std, rescale to [0, 1]."""
+    values = scores[present]
+    mean, std = values.mean(), values.std()
+    if not std:
+        return np.where(present, 1.0, 0.0)
+    lo = mean - 3 * std
+    return np.where(present, np.clip((scores - lo) / (6 * std), 0.0, 1.0), 0.0)
+
+
+def _rrf(ranks: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """Reciprocal rank fusion term 1 / (RRF_K + rank)."""
+    return np.where(present, 1.0 / (RRF_K + ranks), 0.0)
+
+
+_NORMALISERS: dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "max": _max,
+    "minmax": _minmax,
+    "zscore": _zscore,
+    "dbsf": _dbsf,
+}
+
+
+def fuse(legs: Sequence[Hits], weights: Sequence[float], method: str = "max") -> Hits:
+    """Fuse ranked hit lists from several retrieval legs.
+
+    Candidates get a row through one key -> row map; each leg's scores (or ranks)
+    are scattered into a NumPy column over all candidates, normalised and added with
+    the leg's weight. Metadata comes from the first leg that returned the candidate.
+
+    Args:
+        legs: Hit lists, each sorted by descending score
+        weights: Weight of each leg
+        method: One of FUSION_METHODS
+
+    Returns:
+        Fused hits sorted by descending score
+
+    Raises:
+        ValueError: If method is unknown
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unknown fusion method '{method}', expected one of {FUSION_METHODS}")
+
+    rows: dict[Any, int] = {}
+    first_hit: list[tuple[Any, dict, float]] = []
+    positions = []  # per leg: (candidate rows, scores, 1-based ranks)
+    for hits in legs:
+        leg_rows = np.empty(len(hits), dtype=np.int64)
+        for i, hit in enumerate(hits):
+            key = hit_key(hit)
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = len(first_hit)
+                first_hit.append(hit)
+            leg_rows[i] = row
+        leg_scores = np.fromiter((h[2] for h in hits), dtype=np.float64, count=len(hits))
+        positions.append((leg_rows, leg_scores, np.arange(1, len(hits) + 1, dtype=np.float64)))
+
+    n = len(first_hit)
+    if n == 0:
+        return []
+
+    fused = np.zeros(n, dtype=np.float64)
+    for (leg_rows, leg_scores, leg_ranks), weight in zip(positions, weights, strict=True):
+        if len(leg_rows) == 0:
+            continue
+        present = np.zeros(n, dtype=bool)
+        present[leg_rows] = True
+        # Reversed so a candidate repeated within a leg keeps its best (first) entry
+        column = np.zeros(n, dtype=np.float64)
+        if method == "rrf":
+            column[leg_rows[::-1]] = leg_ranks[::-1]
+            fused += weight * _rrf(column, present)
+        else:
+            column[leg_rows[::-1]] = leg_scores[::-1]
+            fused += weight * _NORMALISERS[method](column, present)
+
+    order = np.argsort(-fused, kind="stable")
+    return [(first_hit[i][0], first_hit[i][1] or {}, float(fused[i])) for i in order]
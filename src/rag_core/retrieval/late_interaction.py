@@ -0,0 +1,142 @@
+from collections.abc import Sequence
+from functools import cache
+from typing import Any
+
+import numpy as np
+from fastembed import LateInteractionTextEmbedding
+
+from ..storage.token_store import TokenVectorStore
+
+
+@cache
+def is_late_interaction_model(model_name: str) -> bool:
+    """Whether fastembed serves model_name as a late-interaction (ColBERT) model."""
+    supported = LateInteractionTextEmbedding.list_supported_models()
+    return model_name.lower() in {m["model"].lower() for m in supported}
+
+
+def maxsim(query: np.ndarray, docs: Sequence[np.ndarray]) -> np.ndarray:
+    """ColBERT MaxSim scores of documents against a query.
+
+    All document token matrices are stacked, scored against the query tokens with
+    one matrix product, and the per-document maxima are taken with
+    ``np.maximum.reduceat`` over the document boundaries.
+
+    Args:
+        query: (query_tokens, dim) query embeddings
+        docs: Per-document (tokens, dim) embeddings, each with at least one token
+
+    Returns:
+        Score per document: sum over query tokens of the best matching document token
+    """
+    if not docs:
+        return np.empty(0, dtype=np.float32)
+    starts = np.zeros(len(docs), dtype=np.int64)
+    starts[1:] = np.cumsum([len(d) for d in docs])[:-1]
+    sim = np.concatenate(docs).astype(np.float32, copy=False) @ query.astype(np.float32).T
+    return np.maximum.reduceat(sim, starts, axis=0).sum(axis=1)
+
+
+class LateInteractionReranker:
+    """Late-interaction (ColBERT-style) reranker using FastEmbed.
+
+    Document token embeddings are read from a ``TokenVectorStore`` built at ingest,
+    keyed by the candidate's ``source_id``; only candidates missing from the store
+    are encoded per request. Scoring is a vectorised MaxSim against the query's
+    token matrix. Same ``rerank`` contract as CrossEncoderReranker.
+    """
+
+    def __init__(self, model_name: str, lazy: bool = True, store: TokenVectorStore | None = None):
+        """Initialize late-interaction reranker.
+
+        Args:
+            model_name: Late-interaction model name (FastEmbed compatible)
+            lazy: Lazy model loading (load on first rerank call)
+            store: Precomputed document token embeddings
+        """
+        self.model_name = model_name
+        self.store = store
+        self.model: LateInteractionTextEmbedding | None = None
+        if not lazy:
+            self._load_model()
+
+    def _load_model(self) -> None:
+        """Load FastEmbed LateInteractionTextEmbedding model if not already loaded."""
+        if self.model is None:
+            self.model = LateInteractionTextEmbedding(model_name=self.model_name)
+
+    def _doc_matrices(
+        self, model: LateInteractionTextEmbedding, candidates: Sequence[tuple[str, Any]]
+    ) -> list[np.ndarray]:
+        """Token matrices of candidates: from the store, else encoded now."""
+        docs: list[np.ndarray | None] = [None] * len(candidates)
+        missing = []
+        for i, candidate in enumerate(candidates):
+            meta = candidate[1] if isinstance(candidate[1], dict) else {}
+            key = meta.get("source_id")
+            if self.store is not None and key is not None and key in self.store:
+                docs[i] = self.store.get(key)
+            else:
+                missing.append(i)
+        if missing:
+            encoded = model.passage_embed([str(candidates[i][0]) for i in missing])
+            for i, matrix in zip(missing, encoded, strict=True):
+                docs[i] = np.asarray(matrix, dtype=np.float32)
+        return docs  # type: ignore[return-value]
+
+    def rerank(
+        self, query: str, candidates: list[tuple[str, Any]], return_scores: bool = False
+    ) -> list[tuple[str, Any, float]]:
+        """Rerank candidates based on query relevance.
+
+        Args:
+            query: Query string
+            candidates: List of (document_text, metadata) tuples
+            return_scores: Whether to return (doc, meta, score) tuples
+
+        Returns:
+            Reranked list of candidates
+        """
+        return self.rerank_many([query], [candidates], return_scores)[0]
+
+    def rerank_many(
+        self,
+        queries: list[str],
+        candidate_lists: list[list[tuple[str, Any]]],
+        return_scores: bool = False,
+    ) -> list[list[Any]]:
+        """Rerank the candidates of several queries; queries are encoded in one call.
+
+        Args:
+            queries: Query strings
+            candidate_lists: Candidates of each query, as for rerank
+            return_scores: Whether to return (doc, meta, score) tuples
+
+        Returns:
+            One reranked list per query
+        """
+        if not any(candidate_lists):
+            return [[] for _ in candidate_lists]
+
+        self._load_model()
+        if self.model is None:
+            raise RuntimeError("Model not loaded")
+        query_matrices = self.model.query_embed(queries)
+
+        results: list[list[Any]] = []
+        for q, candidates in zip(query_matrices, candidate_lists, strict=True):
+            if not candidates:
+                results.append([])
+                continue
+            scores = maxsim(
+                np.asarray(q, dtype=np.float32), self._doc_matrices(self.model, candidates)
+            )
+            # Sort by descending score
+            order = np.argsort(-scores, kind="stable")
+            if return_scores:
+                results.append(
+                    [(candidates[i][0], candidates[i][1], float(scores[i])) for i in order]
+                )
+            else:
+                results.append([candidates[i] for i in order])
+        return results
@@ -0,0 +1,204 @@
+import logging
+import queue
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Future
+from time import monotonic
+from typing import Any
+
+import numpy as np
+
+from ..observability import (
+    rag_rerank_batch_size,
+    rag_rerank_padding_ratio,
+    rag_rerank_queue_wait,
+)
+
+logger = logging.getLogger(__name__)
+
+Pair = tuple[str, str]
+
+
+def _tokenizer(model: Any) -> Any:
+    """The HF tokenizer behind a fastembed TextCrossEncoder, if it is loaded."""
+    return getattr(getattr(model, "model", None), "tokenizer", None)
+
+
+def limit_sequence_length(model: Any, max_seq_len: int) -> None:
+    """Truncate (query, document) pairs to at most max_seq_len tokens.
+
+    Only ever lowers the limit fastembed derived from the tokenizer config; the
+    longest input is trimmed first, which for FAQ pairs is the document.
+
+    Args:
+        model: fastembed TextCrossEncoder
+        max_seq_len: Maximum tokens per pair, special tokens included
+    """
+    tokenizer = _tokenizer(model)
+    if tokenizer is None:
+        logger.warning("[RERANK] Tokenizer not available, max_seq_len not applied")
+        return
+    current = (tokenizer.truncation or {}).get("max_length")
+    if current is None or max_seq_len < current:
+        tokenizer.enable_truncation(max_length=max_seq_len)
+
+
+def pair_lengths(model: Any, pairs: Sequence[Pair]) -> np.ndarray:
+    """Token length of every pair after truncation.
+
+    Tokenizing costs far less than running the ONNX model over padding, so pairs
+    are tokenized once up front to bucket them. Without a tokenizer the word
+    count is used as a proxy.
+
+    Args:
+        model: fastembed TextCrossEncoder
+        pairs: (query, document) pairs
+
+    Returns:
+        Integer array of lengths
+    """
+    tokenizer = _tokenizer(model)
+    if tokenizer is None:
+        return np.array([len(q.split()) + len(d.split()) for q, d in pairs], dtype=np.int64)
+    return np.array(
+        [sum(enc.attention_mask) for enc in tokenizer.encode_batch(list(pairs))], dtype=np.int64
+    )
+
+
+def score_pairs(model: Any, pairs: Sequence[Pair], bucket_size: int = 16) -> np.ndarray:
+    """Score pairs in length buckets, so each ONNX batch pads to similar lengths.
+
+    Args:
+        model: Object with rerank_pairs(pairs, batch_size) (fastembed TextCrossEncoder)
+        pairs: (query, document) pairs
+        bucket_size: Pairs per model call
+
+    Returns:
+        Scores in the order of pairs
+    """
+    scores = np.empty(len(pairs), dtype=np.float64)
+    if not pairs:
+        return scores
+    lengths = pair_lengths(model, pairs)
+    order = np.argsort(lengths, kind="stable")
+    for start in range(0, len(order), bucket_size):
+        bucket = order[start : start + bucket_size]
+        bucket_lengths = lengths[bucket]
+        longest = int(bucket_lengths.max())
+        if longest:
+            rag_rerank_padding_ratio.observe(1.0 - bucket_lengths.sum() / (longest * len(bucket)))
+        rag_rerank_batch_size.observe(len(bucket))
+        scores[bucket] = list(
+            model.rerank_pairs([pairs[i] for i in bucket], batch_size=len(bucket))
+        )
+    return scores
+
+
+class RerankBatcher:
+    """Cross-request micro-batching for a cross-encoder.
+
+    Concurrent ``score`` calls put their (query, document) pairs on a queue; a
+    single worker thread collects requests for up to ``window_ms`` or ``max_pairs``
+    pairs, scores all of them through ``score_pairs`` (length buckets of
+    ``bucket_size``) and hands every caller back its own scores.
+    """
+
+    def __init__(
+        self, model: Any, max_pairs: int = 64, window_ms: float = 3.0, bucket_size: int = 16
+    ):
+        """Initialize rerank batcher.
+
+        Args:
+            model: Object with rerank_pairs(pairs, batch_size) (fastembed TextCrossEncoder)
+            max_pairs: Pairs collected before a batch is scored without waiting further
+            window_ms: How long to wait for more requests after the first one arrives
+            bucket_size: Pairs per model call
+        """
+        if max_pairs < 1 or bucket_size < 1:
+            raise ValueError("max_pairs and bucket_size must be positive")
+        self.model = model
+        self.max_pairs = max_pairs
+        self.window = window_ms / 1000.0
+        self.bucket_size = bucket_size
+        self._queue: queue.Queue[tuple[list[Pair], Future[np.ndarray], float]] = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self) -> None:
+        """Start the batching thread on first use."""
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="rerank-batcher", daemon=True
+                    )
+                    self._worker.start()
+
+    def _collect(self) -> list[tuple[list[Pair], Future[np.ndarray], float]]:
+        """Block for the first request, then gather more until the window closes.
+
+        Returns:
+            Batch of (pairs, future, enqueue time) requests
+        """
+        batch = [self._queue.get()]
+        n_pairs = len(batch[0][0])
+        deadline = monotonic() + self.window
+        while n_pairs < self.max_pairs:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            n_pairs += len(request[0])
+        return batch
+
+    def _run(self) -> None:
+        """Worker loop: score collected requests and resolve their futures."""
+        while True:
+            batch = self._collect()
+            started = monotonic()
+            for _, _, enqueued in batch:
+                rag_rerank_queue_wait.observe(started - enqueued)
+            pairs = [pair for request_pairs, _, _ in batch for pair in request_pairs]
+            try:
+                scores = score_pairs(self.model, pairs, self.bucket_size)
+            except Exception as e:
+                logger.warning(f"[RERANK] Batch of {len(pairs)} pairs failed: {e}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for request_pairs, future, _ in batch:
+                future.set_result(scores[start : start + len(request_pairs)])
+                start += len(request_pairs)
+
+    def score(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        """Score documents against a query as part of the next micro-batch.
+
+        Args:
+            query: Query string
+            texts: Document texts
+
+        Returns:
+            Scores in the order of texts
+        """
+        return self.score_pairs([(query, text) for text in texts])
+
+    def score_pairs(self, pairs: Sequence[Pair]) -> np.ndarray:
+        """Score (query, document) pairs as part of the next micro-batch.
+
+        Args:
+            pairs: (query, document) pairs, possibly of several queries
+
+        Returns:
+            Scores in the order of pairs
+        """
+        if not pairs:
+            return np.empty(0, dtype=np.float64)
+        self._ensure_worker()
+        future: Future[np.ndarray] = Future()
+        self._queue.put((list(pairs), future, monotonic()))
+        return future.result()
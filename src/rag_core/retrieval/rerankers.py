@@ -3,19 +3,48 @@ from typing import Any
 import numpy as np
 from fastembed.rerank.cross_encoder import TextCrossEncoder
 
+from ..observability import rag_rerank_cache_hits, rag_rerank_cache_misses
+from .rerank_batching import RerankBatcher, limit_sequence_length, score_pairs
+from .score_cache import RerankScoreCache, pair_key
+
 
 class CrossEncoderReranker:
     """Cross-encoder reranker for document ranking using FastEmbed."""
 
-    def __init__(self, model_name: str, lazy: bool = True, device: str | None = None):
+    def __init__(
+        self,
+        model_name: str,
+        lazy: bool = True,
+        device: str | None = None,
+        score_cache: RerankScoreCache | None = None,
+        max_seq_len: int | None = None,
+        bucket_size: int = 16,
+        batch_window_ms: float | None = None,
+        max_batch_pairs: int = 64,
+    ):
         """Initialize CrossEncoder reranker.
 
         Args:
             model_name: CrossEncoder model name (FastEmbed compatible)
             lazy: Lazy model loading (load on first rerank call) - defaults to True
             device: Device to use ('cpu', 'cuda', etc.) - ignored for FastEmbed
+            score_cache: Optional cache of (query, document) scores; only cache
+                misses are sent to the cross-encoder
+            max_seq_len: Truncate (query, document) pairs to this many tokens
+                (None - the model's own limit)
+            bucket_size: Pairs per model call; pairs are sorted by token length first
+                so each call pads to similar lengths
+            batch_window_ms: Batch pairs from concurrent requests arriving within this
+                window (None - score each request on its own)
+            max_batch_pairs: Pairs collected before a cross-request batch is scored
         """
         self.model_name = model_name
+        self.score_cache = score_cache
+        self.max_seq_len = max_seq_len
+        self.bucket_size = bucket_size
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_pairs = max_batch_pairs
+        self.batcher: RerankBatcher | None = None
         self.device = device  # Keep for compatibility but FastEmbed handles device automatically
         self.model: TextCrossEncoder | None = None
         if not lazy:
@@ -25,6 +54,28 @@ class CrossEncoderReranker:
         """Load FastEmbed TextCrossEncoder model if not already loaded."""
         if self.model is None:
             self.model = TextCrossEncoder(model_name=self.model_name)
+            if self.max_seq_len is not None:
+                limit_sequence_length(self.model, self.max_seq_len)
+        if self.batch_window_ms is not None and self.batcher is None:
+            self.batcher = RerankBatcher(
+                self.model,
+                max_pairs=self.max_batch_pairs,
+                window_ms=self.batch_window_ms,
+                bucket_size=self.bucket_size,
+            )
+
+    def _score(self, pairs: list[tuple[str, str]]) -> np.ndarray:
+        """Run the cross-encoder over (query, text) pairs.
+
+        Returns:
+            Scores in the order of pairs
+        """
+        self._load_model()
+        if self.batcher is not None:
+            return self.batcher.score_pairs(pairs)
+        if self.model is None:
+            raise RuntimeError("Model not loaded")
+        return score_pairs(self.model, pairs, self.bucket_size)
 
     def rerank(
         self, query: str, candidates: list[tuple[str, Any]], return_scores: bool = False
@@ -39,28 +90,59 @@ class CrossEncoderReranker:
         Returns:
             Reranked list of candidates
         """
-        if not candidates:
-            return []
+        return self.rerank_many([query], [candidates], return_scores)[0]
 
-        self._load_model()
+    def rerank_many(
+        self,
+        queries: list[str],
+        candidate_lists: list[list[tuple[str, Any]]],
+        return_scores: bool = False,
+    ) -> list[list[Any]]:
+        """Rerank the candidates of several queries in one cross-encoder pass.
 
+        Pairs of all queries share the length buckets (and the cross-request batch),
+        so a batch of questions costs far fewer model calls than one call each.
+
+        Args:
+            queries: Query strings
+            candidate_lists: Candidates of each query, as for rerank
+            return_scores: Whether to return (doc, meta, score) tuples
+
+        Returns:
+            One reranked list per query
+        """
         # Ensure all texts are strings
-        texts = []
-        for c in candidates:
-            text = c[0]
-            if not isinstance(text, str):
-                text = str(text)
-            texts.append(text)
-
-        # FastEmbed rerank expects query and list of documents
-        if self.model is None:
-            raise RuntimeError("Model not loaded")
-        scores = list(self.model.rerank(query, texts))
+        pairs = [
+            (q, str(c[0])) for q, cands in zip(queries, candidate_lists, strict=True) for c in cands
+        ]
+        scores = np.empty(len(pairs), dtype=np.float64)
+        missing = list(range(len(pairs)))
+        keys: list[str] = []
+        if self.score_cache is not None and pairs:
+            keys = [pair_key(self.model_name, q, text) for q, text in pairs]
+            missing = []
+            for i, score in enumerate(self.score_cache.get_many(keys)):
+                if score is None:
+                    missing.append(i)
+                else:
+                    scores[i] = score
+            rag_rerank_cache_hits.inc(len(pairs) - len(missing))
+            rag_rerank_cache_misses.inc(len(missing))
 
-        # Sort by descending score
-        order = np.argsort(-np.array(scores))
+        if missing:
+            scores[missing] = self._score([pairs[i] for i in missing])
+            if self.score_cache is not None:
+                self.score_cache.put_many({keys[i]: float(scores[i]) for i in missing})
 
-        if return_scores:
-            return [(candidates[i][0], candidates[i][1], float(scores[i])) for i in order]
-        else:
-            return [candidates[i] for i in order]
+        results = []
+        start = 0
+        for candidates in candidate_lists:
+            own = scores[start : start + len(candidates)]
+            start += len(candidates)
+            # Sort by descending score
+            order = np.argsort(-own, kind="stable")
+            if return_scores:
+                results.append([(candidates[i][0], candidates[i][1], float(own[i])) for i in order])
+            else:
+                results.append([candidates[i] for i in order])
+        return results
@@ -1,63 +1,452 @@
+import logging
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache, partial
+from time import perf_counter
 from typing import Any
 
 import numpy as np
 
+from ..observability import (
+    rag_rerank_skipped,
+    rag_retrieval_leg_latency,
+    rag_retrieval_leg_queue_wait,
+    rag_retrieval_leg_timeouts,
+    rag_retrieval_stage_candidates,
+    rag_retrieval_stage_latency,
+)
+from .fusion import FUSION_METHODS, Hits, fuse
+
+logger = logging.getLogger(__name__)
+
+# Both legs of every request share one pool, so a burst of requests cannot
+# spawn an unbounded number of threads.
+LEG_POOL_WORKERS = 16
+
+
+@lru_cache
+def _leg_executor(workers: int = LEG_POOL_WORKERS) -> ThreadPoolExecutor:
+    """Get the process-wide thread pool used for retrieval legs.
+
+    Args:
+        workers: Pool size
+
+    Returns:
+        Shared ThreadPoolExecutor
+    """
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="retrieval-leg")
+
+
+def _timed_leg(
+    leg: str,
+    fn: Callable[[], Any],
+    submitted: float | None = None,
+    started: dict[str, float] | None = None,
+) -> Any:
+    """Run one retrieval leg and export its latency.
+
+    Args:
+        leg: Leg name used as metric label ("bm25" or "dense")
+        fn: Zero-argument callable performing the search
+        submitted: When the leg was queued on the pool, to export its queue wait
+        started: Receives the leg's start time under its name
+
+    Returns:
+        Hits returned by the leg
+    """
+    t0 = perf_counter()
+    if started is not None:
+        started[leg] = t0
+    if submitted is not None:
+        rag_retrieval_leg_queue_wait.labels(leg=leg).observe(t0 - submitted)
+    try:
+        return fn()
+    finally:
+        rag_retrieval_leg_latency.labels(leg=leg).observe(perf_counter() - t0)
+
 
 class HybridRetriever:
-    def __init__(self, bm25: Any, vs: Any, reranker: Any = None, alpha: float = 0.5) -> None:
+    def __init__(
+        self,
+        bm25: Any = None,
+        vs: Any = None,
+        reranker: Any = None,
+        alpha: float = 0.5,
+        concurrent: bool = True,
+        leg_timeout: float | None = None,
+        executor: ThreadPoolExecutor | None = None,
+        leg_workers: int = LEG_POOL_WORKERS,
+        hybrid_store: Any = None,
+        group_sparse: bool = True,
+        fusion: str = "max",
+        candidate_k: int | None = None,
+        rerank_top_n: int | None = None,
+        early_exit_margin: float | None = None,
+    ) -> None:
         """
         Args:
             bm25: BM25 search object (has .search(query, k) → [(id, meta, score), ...])
             vs: Vector store (has .search(qvec, k) → [(id, meta, score), ...])
             reranker: Optional reranker
             alpha: Weight of vector search (0..1)
+            concurrent: Run BM25 and dense legs at the same time
+            leg_timeout: Seconds a leg may run in concurrent mode, counted from when it
+                starts on the pool, not from when it is queued (None - no limit)
+            executor: Thread pool for the legs (default: shared process-wide pool)
+            leg_workers: Size of the shared process-wide pool when no executor is given
+            hybrid_store: Single-collection store fusing both legs server-side
+                (has .search(query, qvec, k) → [(text, meta, score), ...]).
+                When set, bm25 and vs are not used.
+            group_sparse: Collapse BM25 question variants to one hit per FAQ item
+                (uses bm25.search_grouped)
+            fusion: Default score fusion, one of FUSION_METHODS ("max" - max-normalised
+                alpha-weighted sum, "minmax", "zscore", "rrf", "dbsf")
+            candidate_k: Hits fetched per leg before fusion (None - the final k);
+                never less than the final k
+            rerank_top_n: Fused candidates sent to the reranker (None - all of them);
+                candidates below the cut keep their fused order after the reranked ones
+            early_exit_margin: Skip the reranker when the fused top-1 score beats
+                top-2 by at least this much (None - always rerank). The margin is in
+                fused score units, so it depends on the fusion method
         """
+        if hybrid_store is None and (bm25 is None or vs is None):
+            raise ValueError("Either hybrid_store or both bm25 and vs must be provided")
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method '{fusion}', expected one of {FUSION_METHODS}")
         self.bm25 = bm25
         self.vs = vs
         self.reranker = reranker
         self.alpha = alpha
+        self.concurrent = concurrent
+        self.leg_timeout = leg_timeout
+        self.executor = executor or _leg_executor(leg_workers)
+        self.hybrid_store = hybrid_store
+        self.group_sparse = group_sparse
+        self.fusion = fusion
+        self.candidate_k = candidate_k
+        self.rerank_top_n = rerank_top_n
+        self.early_exit_margin = early_exit_margin
+
+    def _search_legs(
+        self, query: str, qvec: np.ndarray, k: int, filters: dict | None
+    ) -> tuple[Hits, Hits]:
+        """Run the sparse and dense searches.
+
+        In concurrent mode both legs are submitted to the thread pool and waited on
+        together, so the cost is the slower leg instead of the sum. A leg that fails
+        or misses ``leg_timeout`` is dropped and the answer comes from the other one.
+
+        Args:
+            query: Query text for BM25
+            qvec: Query vector for dense search
+            k: Number of hits per leg
+            filters: Optional filters for both legs
+
+        Returns:
+            Tuple of (bm25_hits, dense_hits)
+
+        Raises:
+            TimeoutError: If neither leg finished within ``leg_timeout``
+        """
+        sparse_search = self.bm25.search_grouped if self.group_sparse else self.bm25.search
+        return self._run_legs(
+            {
+                "bm25": lambda: sparse_search(query, k=k, filters=filters),
+                "dense": lambda: self.vs.search(qvec, k=k, filters=filters),
+            },
+            empty=[],
+        )
+
+    def _search_legs_batch(
+        self, queries: list[str], qvecs: np.ndarray, k: int, filters: dict | None
+    ) -> tuple[list[Hits], list[Hits]]:
+        """Run the sparse and dense searches for a batch of queries.
+
+        Each leg answers the whole batch with its ``search_batch`` when it has one
+        (one sparse-dense product, one ``query_batch_points`` round trip), else
+        query by query; both legs still run concurrently.
+
+        Returns:
+            Tuple of (bm25_hits, dense_hits), one hit list per query in each
+        """
+
+        def sparse() -> list[Hits]:
+            if hasattr(self.bm25, "search_batch"):
+                return self.bm25.search_batch(
+                    queries, k=k, filters=filters, grouped=self.group_sparse
+                )
+            search = self.bm25.search_grouped if self.group_sparse else self.bm25.search
+            return [search(q, k=k, filters=filters) for q in queries]
+
+        def dense() -> list[Hits]:
+            if hasattr(self.vs, "search_batch"):
+                return self.vs.search_batch(qvecs, k=k, filters=filters)
+            return [self.vs.search(qvec, k=k, filters=filters) for qvec in qvecs]
+
+        return self._run_legs({"bm25": sparse, "dense": dense}, empty=[[] for _ in queries])
+
+    def _run_legs(self, legs: dict[str, Callable[[], Any]], empty: Any) -> tuple[Any, Any]:
+        """Run the bm25 and dense leg callables, concurrently unless disabled.
+
+        Each leg's ``leg_timeout`` runs from when a pool worker picks it up, so legs
+        queued behind a busy pool under load are not dropped for time they spent
+        waiting (``rag_retrieval_leg_queue_wait_seconds`` shows that wait).
+
+        Args:
+            legs: Leg name -> zero-argument search callable
+            empty: Result used for a leg that failed or timed out
+
+        Returns:
+            Tuple of (bm25 result, dense result)
+
+        Raises:
+            TimeoutError: If neither leg finished within ``leg_timeout``
+        """
+        if not self.concurrent:
+            return _timed_leg("bm25", legs["bm25"]), _timed_leg("dense", legs["dense"])
+
+        submitted = perf_counter()
+        started: dict[str, float] = {}
+        futures: dict[str, Future[Any]] = {
+            leg: self.executor.submit(_timed_leg, leg, fn, submitted, started)
+            for leg, fn in legs.items()
+        }
+        timed_out = self._await_legs(futures, started)
+
+        results: dict[str, Any] = {}
+        errors: list[BaseException] = []
+        for leg, future in futures.items():
+            if leg in timed_out:
+                rag_retrieval_leg_timeouts.labels(leg=leg).inc()
+                logger.warning(f"[RETRIEVAL] {leg} leg timed out after {self.leg_timeout}s")
+                continue
+            exc = future.exception()
+            if exc is not None:
+                errors.append(exc)
+                logger.warning(f"[RETRIEVAL] {leg} leg failed: {exc}")
+                continue
+            results[leg] = future.result()
+
+        if not results:
+            if errors:
+                raise errors[0]
+            raise TimeoutError(f"No retrieval leg finished within {self.leg_timeout}s")
+
+        return results.get("bm25", empty), results.get("dense", empty)
+
+    def _await_legs(self, futures: dict[str, Future[Any]], started: dict[str, float]) -> set[str]:
+        """Wait for every leg to finish or exceed ``leg_timeout`` since it started.
+
+        Args:
+            futures: Leg name -> running or queued leg
+            started: Leg name -> start time, filled in by the legs as they start
+
+        Returns:
+            Names of the legs that timed out
+        """
+        if self.leg_timeout is None:
+            wait(futures.values())
+            return set()
+        pending = dict(futures)
+        timed_out: set[str] = set()
+        while pending:
+            now = perf_counter()
+            for leg in [leg for leg in pending if leg in started]:
+                if now >= started[leg] + self.leg_timeout and not pending[leg].done():
+                    timed_out.add(leg)
+                    del pending[leg]
+            if not pending:
+                break
+            # Queued legs have no deadline yet; re-check once the started ones may expire
+            deadlines = [started[leg] + self.leg_timeout for leg in pending if leg in started]
+            wait_for = min(deadlines) - now if deadlines else self.leg_timeout
+            done, _ = wait(
+                pending.values(), timeout=max(wait_for, 0.0), return_when=FIRST_COMPLETED
+            )
+            pending = {leg: f for leg, f in pending.items() if f not in done}
+        return timed_out
 
     def retrieve(
-        self, query: str, qvec: np.ndarray, k: int = 10, filters: dict | None = None
+        self,
+        query: str,
+        qvec: np.ndarray,
+        k: int = 10,
+        filters: dict | None = None,
+        fusion: str | None = None,
+        candidate_k: int | None = None,
+        rerank_top_n: int | None = None,
     ) -> list[tuple[str, dict, float]]:
-        bm25_hits = self.bm25.search(query, k=k, filters=filters)
-        dense_hits = self.vs.search(qvec, k=k, filters=filters)
-
-        # Normalize scores to [0, 1] range
-        bm25_scores = {doc_id: score for doc_id, _, score in bm25_hits}
-        dense_scores = {doc_id: score for doc_id, _, score in dense_hits}
-
-        if bm25_scores:
-            max_bm25 = max(bm25_scores.values())
-            bm25_scores = {doc_id: s / max_bm25 for doc_id, s in bm25_scores.items()}
-        if dense_scores:
-            max_dense = max(dense_scores.values())
-            dense_scores = {doc_id: s / max_dense for doc_id, s in dense_scores.items()}
-
-        # Combine scores using alpha weighting
-        all_ids = set(bm25_scores) | set(dense_scores)
-        fused = {}
-        meta_map = {}
-
-        for doc_id in all_ids:
-            bm25_s = bm25_scores.get(doc_id, 0.0)
-            dense_s = dense_scores.get(doc_id, 0.0)
-            # alpha=0.5 means equal weight for both
-            fused_score = (1 - self.alpha) * bm25_s + self.alpha * dense_s
-            fused[doc_id] = fused_score
-
-            # Get metadata from either source
-            meta = next((m for i, m, _ in bm25_hits if i == doc_id), None)
-            if not meta:
-                meta = next((m for i, m, _ in dense_hits if i == doc_id), {})
-            meta_map[doc_id] = meta
-
-        # Sort by fused score
-        ranked = sorted(fused.items(), key=lambda x: x[1], reverse=True)
-        ranked_hits = [(doc_id, meta_map[doc_id] or {}, score) for doc_id, score in ranked]
-
-        # Apply reranker if available
-        if self.reranker:
-            ranked_hits = self.reranker.rerank(query, ranked_hits, return_scores=True)
+        """Retrieve, fuse and rerank hits for a query.
+
+        The cascade oversamples ``candidate_k`` hits per leg, fuses them, sends the
+        best ``rerank_top_n`` to the reranker and returns the best ``k``. Every stage
+        exports its candidate count and latency.
 
+        Args:
+            query: Query text for BM25
+            qvec: Query vector for dense search
+            k: Number of hits to return
+            filters: Optional filters for both legs
+            fusion: Fusion method for this request (default: retriever setting)
+            candidate_k: Hits per leg for this request (default: retriever setting)
+            rerank_top_n: Candidates to rerank for this request (default: retriever setting)
+
+        Returns:
+            List of (text, metadata, score) tuples
+        """
+        fusion = fusion or self.fusion
+        candidate_k = max(k, candidate_k or self.candidate_k or k)
+        rerank_top_n = rerank_top_n or self.rerank_top_n
+
+        t0 = perf_counter()
+        if self.hybrid_store is not None:
+            # Qdrant fuses server-side and only knows RRF and DBSF
+            server_fusion = fusion if fusion in ("rrf", "dbsf") else None
+            ranked_hits = _timed_leg(
+                "hybrid",
+                lambda: self.hybrid_store.search(
+                    query, qvec, k=candidate_k, filters=filters, fusion=server_fusion
+                ),
+            )
+            rag_retrieval_stage_latency.labels(stage="search").observe(perf_counter() - t0)
+        else:
+            ranked_hits = self._fuse_legs(query, qvec, candidate_k, filters, fusion)
+        rag_retrieval_stage_candidates.labels(stage="rerank").observe(len(ranked_hits))
+
+        if self.reranker and not self._early_exit(ranked_hits):
+            ranked_hits = self._rerank(query, ranked_hits, rerank_top_n)
+
+        rag_retrieval_stage_candidates.labels(stage="return").observe(min(k, len(ranked_hits)))
         return ranked_hits[:k]
+
+    def retrieve_many(
+        self,
+        queries: list[str],
+        qvecs: np.ndarray,
+        k: int = 10,
+        filters: dict | None = None,
+        fusion: str | None = None,
+        candidate_k: int | None = None,
+        rerank_top_n: int | None = None,
+    ) -> list[Hits]:
+        """Retrieve, fuse and rerank hits for a batch of queries.
+
+        Same cascade as ``retrieve``, but each leg searches the whole batch at once
+        and the reranker scores the candidates of all queries in one pass.
+
+        Args:
+            queries: Query texts for BM25
+            qvecs: Query vectors for dense search, one row per query
+            k: Number of hits to return per query
+            filters: Optional filters for both legs, shared by all queries
+            fusion: Fusion method (default: retriever setting)
+            candidate_k: Hits per leg (default: retriever setting)
+            rerank_top_n: Candidates to rerank per query (default: retriever setting)
+
+        Returns:
+            One list of (text, metadata, score) tuples per query
+        """
+        fusion = fusion or self.fusion
+        candidate_k = max(k, candidate_k or self.candidate_k or k)
+        rerank_top_n = rerank_top_n or self.rerank_top_n
+
+        t0 = perf_counter()
+        if self.hybrid_store is not None:
+            # Server-side fusion has no batched form for prefetch queries
+            server_fusion = fusion if fusion in ("rrf", "dbsf") else None
+            ranked = [
+                _timed_leg(
+                    "hybrid",
+                    partial(
+                        self.hybrid_store.search,
+                        q,
+                        v,
+                        k=candidate_k,
+                        filters=filters,
+                        fusion=server_fusion,
+                    ),
+                )
+                for q, v in zip(queries, qvecs, strict=True)
+            ]
+            rag_retrieval_stage_latency.labels(stage="search").observe(perf_counter() - t0)
+        else:
+            bm25_lists, dense_lists = self._search_legs_batch(queries, qvecs, candidate_k, filters)
+            t1 = perf_counter()
+            rag_retrieval_stage_latency.labels(stage="search").observe(t1 - t0)
+            ranked = []
+            for bm25_hits, dense_hits in zip(bm25_lists, dense_lists, strict=True):
+                rag_retrieval_stage_candidates.labels(stage="fuse").observe(
+                    len(bm25_hits) + len(dense_hits)
+                )
+                ranked.append(fuse([bm25_hits, dense_hits], [1 - self.alpha, self.alpha], fusion))
+            rag_retrieval_stage_latency.labels(stage="fuse").observe(perf_counter() - t1)
+
+        todo = []
+        for i, hits in enumerate(ranked):
+            rag_retrieval_stage_candidates.labels(stage="rerank").observe(len(hits))
+            if self.reranker and hits and not self._early_exit(hits):
+                todo.append(i)
+        if todo:
+            heads = [ranked[i][:rerank_top_n] if rerank_top_n else ranked[i] for i in todo]
+            t2 = perf_counter()
+            rerank_many = getattr(self.reranker, "rerank_many", None)
+            if rerank_many is not None:
+                reranked = rerank_many([queries[i] for i in todo], heads, return_scores=True)
+            else:
+                reranked = [
+                    self.reranker.rerank(queries[i], head, return_scores=True)
+                    for i, head in zip(todo, heads, strict=True)
+                ]
+            rag_retrieval_stage_latency.labels(stage="rerank").observe(perf_counter() - t2)
+            for i, head, out in zip(todo, heads, reranked, strict=True):
+                ranked[i] = out + ranked[i][len(head) :]
+
+        for hits in ranked:
+            rag_retrieval_stage_candidates.labels(stage="return").observe(min(k, len(hits)))
+        return [hits[:k] for hits in ranked]
+
+    def _early_exit(self, hits: Hits) -> bool:
+        """Whether the fused ranking is decisive enough to skip the reranker."""
+        if self.early_exit_margin is None or len(hits) < 2:
+            return False
+        if hits[0][2] - hits[1][2] < self.early_exit_margin:
+            return False
+        rag_rerank_skipped.inc()
+        return True
+
+    def _rerank(self, query: str, hits: Hits, top_n: int | None) -> Hits:
+        """Rerank the head of the fused list, keeping the tail in fused order.
+
+        Args:
+            query: Query text
+            hits: Fused hits sorted by descending score
+            top_n: Number of head candidates to rerank (None - all)
+
+        Returns:
+            Reranked head followed by the untouched tail
+        """
+        head, tail = (hits[:top_n], hits[top_n:]) if top_n else (hits, [])
+        t0 = perf_counter()
+        reranked = self.reranker.rerank(query, head, return_scores=True)
+        rag_retrieval_stage_latency.labels(stage="rerank").observe(perf_counter() - t0)
+        return reranked + tail
+
+    def _fuse_legs(
+        self, query: str, qvec: np.ndarray, k: int, filters: dict | None, fusion: str
+    ) -> Hits:
+        """Search both legs and fuse their scores client-side.
+
+        Returns:
+            Fused hits sorted by descending score
+        """
+        t0 = perf_counter()
+        bm25_hits, dense_hits = self._search_legs(query, qvec, k, filters)
+        t1 = perf_counter()
+        rag_retrieval_stage_latency.labels(stage="search").observe(t1 - t0)
+        rag_retrieval_stage_candidates.labels(stage="fuse").observe(
+            len(bm25_hits) + len(dense_hits)
+        )
+        # alpha=0.5 means equal weight for both
+        fused = fuse([bm25_hits, dense_hits], [1 - self.alpha, self.alpha], fusion)
+        rag_retrieval_stage_latency.labels(stage="fuse").observe(perf_counter() - t1)
+        return fused
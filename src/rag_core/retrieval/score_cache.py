@@ -0,0 +1,87 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+
+from ..observability import TwoLevelCache
+from ..processing import normalize_query
+
+
+def pair_key(model_name: str, query: str, text: str) -> str:
+    """Cache key of a (query, document) pair: model, normalized query, content hash."""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{model_name}|{normalize_query(query)}|{digest}"
+
+
+class RerankScoreCache:
+    """Bounded LRU cache of cross-encoder scores.
+
+    Scores are plain floats keyed by ``pair_key``. An optional Redis tier (a
+    ``TwoLevelCache`` without its own memory level) shares scores between processes;
+    it is only consulted for pairs missing from the local LRU.
+    """
+
+    def __init__(self, capacity: int = 16384, redis_cache: TwoLevelCache | None = None):
+        """Initialize rerank score cache.
+
+        Args:
+            capacity: Maximum number of cached scores
+            redis_cache: Optional shared Redis tier
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.redis_cache = redis_cache
+        self._scores: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def get_many(self, keys: Sequence[str]) -> list[float | None]:
+        """Look up scores.
+
+        Args:
+            keys: Pair keys
+
+        Returns:
+            Cached score or None for each key
+        """
+        found: list[float | None] = []
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key)
+                if score is not None:
+                    self._scores.move_to_end(key)
+                found.append(score)
+
+        if self.redis_cache is not None:
+            # One MGET for every local miss instead of a round trip per pair
+            missing = [i for i, score in enumerate(found) if score is None]
+            shared = {}
+            if missing:
+                remote = self.redis_cache.get_many([keys[i] for i in missing])
+                for i, score in zip(missing, remote, strict=True):
+                    if score is not None:
+                        found[i] = shared[keys[i]] = float(score)
+            self._put_local(shared)
+        return found
+
+    def put_many(self, scores: dict[str, float]) -> None:
+        """Store scores.
+
+        Args:
+            scores: Pair key -> score
+        """
+        self._put_local(scores)
+        if self.redis_cache is not None:
+            self.redis_cache.set_many(scores)
+
+    def _put_local(self, scores: dict[str, float]) -> None:
+        """Write scores into the LRU, evicting the least recently used entries."""
+        with self._lock:
+            for key, score in scores.items():
+                self._scores[key] = score
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.capacity:
+                self._scores.popitem(last=False)
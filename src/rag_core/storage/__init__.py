@@ -1,6 +1,30 @@
 """Storage modules for vector stores and BM25."""
 
+from .bm25_local import LocalBM25Index
 from .bm25_qdrant import BM25QdrantClient
+from .client import client_from_settings, get_qdrant_client
+from .columns import PayloadColumns
+from .filters import compile_filter, ensure_payload_indexes
+from .hybrid_qdrant import QdrantHybridStore
+from .ids import delete_stale_points, point_id
+from .token_store import TokenVectorStore
+from .upload import BatchUploader
+from .vectorstore_numpy import NumpyVectorStore
 from .vectorstore_qdrant import QdrantVectorStore
 
-__all__ = ["BM25QdrantClient", "QdrantVectorStore"]
+__all__ = [
+    "BM25QdrantClient",
+    "BatchUploader",
+    "LocalBM25Index",
+    "NumpyVectorStore",
+    "PayloadColumns",
+    "QdrantHybridStore",
+    "QdrantVectorStore",
+    "TokenVectorStore",
+    "client_from_settings",
+    "compile_filter",
+    "delete_stale_points",
+    "ensure_payload_indexes",
+    "get_qdrant_client",
+    "point_id",
+]
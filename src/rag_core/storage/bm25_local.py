@@ -0,0 +1,226 @@
+import json
+import logging
+import re
+from collections import Counter
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from py_rust_stemmers import SnowballStemmer
+from scipy import sparse
+
+from .bm25_qdrant import item_hit
+from .columns import PayloadColumns
+from .ids import point_id
+from .versions import current_version, new_version, publish
+
+logger = logging.getLogger(__name__)
+
+MATRIX_PARTS = ("data", "indices", "indptr")
+META_FILE = "meta.json"
+PAYLOAD_FILE = "payload.json"
+INDEX_FIELDS = ("lang", "section", "original_id")
+
+# Common English function words; they carry no signal for FAQ matching
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it its "
+    "me my of on or so than that the their them then there these this to was we what "
+    "when where which who why will with you your".split()
+)
+
+_stemmer = SnowballStemmer("english")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords removed and Snowball stemming."""
+    words = [w for w in re.findall(r"\w+", text.casefold()) if w not in STOPWORDS]
+    return _stemmer.stem_words(words)
+
+
+class LocalBM25Index:
+    """In-process BM25 with the same search contract as BM25QdrantClient.
+
+    At build time every document's BM25 term weights (IDF and length normalisation
+    included) are baked into a CSR document-term matrix saved as ``.npy`` parts. At
+    query time the parts are memory-mapped, a query is a binary term vector, and
+    scoring is one sparse matrix-vector product (one sparse-dense product for a
+    batch of queries). Each build is written to its own version directory and
+    published through an atomic ``CURRENT`` pointer (see versions.publish), so a
+    reader never combines matrix parts or metadata of different builds.
+    """
+
+    def __init__(self, path: str | Path):
+        """Open an index built by ``build``.
+
+        Args:
+            path: Index directory
+        """
+        self.path = Path(path)
+        self.version_path = current_version(self.path)
+        with open(self.version_path / META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+        self.vocab: dict[str, int] = meta["vocab"]
+        self.ids: list[str] = meta["ids"]
+        parts = [np.load(self.version_path / f"{name}.npy", mmap_mode="r") for name in MATRIX_PARTS]
+        self.matrix = sparse.csr_matrix(tuple(parts), shape=tuple(meta["shape"]), copy=False)
+        self.payload = PayloadColumns.load(self.version_path / PAYLOAD_FILE, INDEX_FIELDS)
+        # Integer FAQ item code per document, for max-per-item reductions
+        groups = [str(g) for g in self.payload.columns.get("original_id", self.ids)]
+        _, self.group_codes = np.unique(np.asarray(groups, dtype=object), return_inverse=True)
+        logger.info(
+            f"[BM25 LOCAL] Opened {self.version_path}: {self.matrix.shape[0]} docs, "
+            f"{self.matrix.shape[1]} terms, {self.matrix.nnz} postings"
+        )
+
+    @classmethod
+    def build(
+        cls,
+        path: str | Path,
+        documents: list[dict[str, Any]],
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> "LocalBM25Index":
+        """Build and save an index, then open it.
+
+        Args:
+            path: Index directory
+            documents: Same documents as BM25QdrantClient.upsert_documents
+            k1: BM25 term frequency saturation
+            b: BM25 length normalisation
+
+        Returns:
+            Opened LocalBM25Index
+        """
+        path = Path(path)
+        vocab: dict[str, int] = {}
+        rows, cols, tfs = [], [], []
+        lengths = np.zeros(len(documents), dtype=np.float32)
+        for row, doc in enumerate(documents):
+            terms = Counter(tokenize(doc["text"]))
+            lengths[row] = sum(terms.values())
+            for term, tf in terms.items():
+                rows.append(row)
+                cols.append(vocab.setdefault(term, len(vocab)))
+                tfs.append(tf)
+
+        n_docs = len(documents)
+        rows_arr = np.asarray(rows, dtype=np.int64)
+        tf_arr = np.asarray(tfs, dtype=np.float32)
+        df = np.bincount(np.asarray(cols, dtype=np.int64), minlength=len(vocab))
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = max(float(lengths.mean()), 1e-8) if n_docs else 1.0
+        norm = k1 * (1 - b + b * lengths / avgdl)
+        weights = idf[cols] * tf_arr * (k1 + 1) / (tf_arr + norm[rows_arr])
+
+        matrix = sparse.csr_matrix(
+            (weights, (rows_arr, np.asarray(cols, dtype=np.int32))),
+            shape=(n_docs, len(vocab)),
+            dtype=np.float32,
+        )
+        matrix.sort_indices()
+        version = new_version(path)
+        for name in MATRIX_PARTS:
+            np.save(version / f"{name}.npy", getattr(matrix, name))
+
+        ids = [
+            (
+                point_id(doc["original_id"], doc["variant_ix"])
+                if "original_id" in doc and "variant_ix" in doc
+                else point_id(doc["id"])
+            )
+            for doc in documents
+        ]
+        PayloadColumns.from_rows(documents, INDEX_FIELDS).save(version / PAYLOAD_FILE)
+        with open(version / META_FILE, "w", encoding="utf-8") as f:
+            json.dump(
+                {"shape": list(matrix.shape), "k1": k1, "b": b, "vocab": vocab, "ids": ids}, f
+            )
+        publish(path, version)
+        return cls(path)
+
+    def _query_matrix(self, queries: Sequence[str]) -> np.ndarray:
+        """Dense (terms x queries) binary matrix of known query terms."""
+        q = np.zeros((self.matrix.shape[1], len(queries)), dtype=np.float32)
+        for j, query in enumerate(queries):
+            cols = [self.vocab[t] for t in tokenize(query) if t in self.vocab]
+            q[cols, j] = 1.0
+        return q
+
+    def _top_k(
+        self, scores: np.ndarray, k: int, mask: np.ndarray | None, grouped: bool = False
+    ) -> list[tuple[str, dict[str, Any], float]]:
+        """Select the k best matching documents (or FAQ items) from a score column."""
+        if mask is not None:
+            scores = np.where(mask, scores, 0.0)
+        matched = np.flatnonzero(scores > 0)
+        if grouped:
+            # Best variant per item: first occurrence of each group in descending order
+            matched = matched[np.argsort(-scores[matched], kind="stable")]
+            _, first = np.unique(self.group_codes[matched], return_index=True)
+            matched = matched[np.sort(first)][:k]
+            return [item_hit(self.payload.row(int(i)), float(scores[i])) for i in matched]
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(self.ids[i], self.payload.row(int(i)), float(scores[i])) for i in matched]
+
+    def _mask(self, filters: dict[str, Any] | None) -> np.ndarray | None:
+        """Filter mask; variants carry their FAQ item ID as original_id."""
+        if filters and "source_id" in filters:
+            filters = {("original_id" if f == "source_id" else f): v for f, v in filters.items()}
+        return self.payload.mask(filters)
+
+    def search(
+        self, query: str, k: int = 10, filters: dict[str, Any] | None = None
+    ) -> list[tuple[str, dict[str, Any], float]]:
+        """Search using BM25.
+
+        Args:
+            query: Search query text
+            k: Number of results to return
+            filters: Optional payload filters (see compile_filter)
+
+        Returns:
+            List of (doc_id, metadata, score) tuples
+        """
+        return self.search_batch([query], k=k, filters=filters)[0]
+
+    def search_grouped(
+        self, query: str, k: int = 10, filters: dict[str, Any] | None = None
+    ) -> list[tuple[str, dict[str, Any], float]]:
+        """Search using BM25, returning the best question variant of k distinct FAQ items.
+
+        Args:
+            query: Search query text
+            k: Number of FAQ items to return
+            filters: Optional payload filters (see compile_filter)
+
+        Returns:
+            List of (text, metadata, score) tuples, see item_hit
+        """
+        return self.search_batch([query], k=k, filters=filters, grouped=True)[0]
+
+    def search_batch(
+        self,
+        queries: Sequence[str],
+        k: int = 10,
+        filters: dict[str, Any] | None = None,
+        grouped: bool = False,
+    ) -> list[list[tuple[str, dict[str, Any], float]]]:
+        """Score a batch of queries with one sparse-dense matrix product.
+
+        Args:
+            queries: Search query texts
+            k: Number of results per query
+            filters: Optional payload filters applied to every query
+            grouped: Collapse hits to one per FAQ item, as search_grouped
+
+        Returns:
+            One hit list per query, as returned by search (or search_grouped)
+        """
+        if not queries:
+            return []
+        scores = np.asarray(self.matrix @ self._query_matrix(queries))
+        mask = self._mask(filters)
+        return [self._top_k(scores[:, j], k, mask, grouped) for j in range(len(queries))]
@@ -1,15 +1,60 @@
 from typing import Any
 
 from qdrant_client import QdrantClient
-from qdrant_client.models import Document, Modifier, PointStruct, SparseVectorParams
+from qdrant_client.models import (
+    Document,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    MatchAny,
+    Modifier,
+    PointStruct,
+    QueryRequest,
+    SparseVectorParams,
+)
+
+from .client import get_qdrant_client
+from .filters import compile_filter, ensure_payload_indexes
+from .ids import point_id
+from .upload import BatchUploader
+
+BM25_INDEX_FIELDS = ("lang", "section", "original_id")
+
+
+def item_hit(payload: dict[str, Any], score: float) -> tuple[str, dict[str, Any], float]:
+    """Turn the best BM25 variant of a FAQ item into an item-level hit.
+
+    The hit is keyed like dense hits (``source_id`` = "<original_id>#0") and keeps
+    the question variant that matched as ``matched_question``.
+
+    Args:
+        payload: Payload of the best-scoring variant
+        score: Its BM25 score
+
+    Returns:
+        (text, metadata, score) tuple
+    """
+    meta = dict(payload)
+    meta["matched_question"] = meta.get("question", "")
+    meta["source_id"] = f"{meta.get('original_id', meta.get('id'))}#0"
+    text = f"Q: {meta['matched_question']}\nA: {meta.get('answer', '')}"
+    return text, meta, score
 
 
 class BM25QdrantClient:
     """BM25 client using Qdrant's sparse vector capabilities."""
 
-    def __init__(self, url: str = "http://localhost:6333", collection_name: str = "bm25_documents"):
-        self.client = QdrantClient(url=url)
+    def __init__(
+        self,
+        url: str = "http://localhost:6333",
+        collection_name: str = "bm25_documents",
+        uploader: BatchUploader | None = None,
+        client: QdrantClient | None = None,
+    ):
+        # Stores share one pooled client per connection options unless given one
+        self.client = client or get_qdrant_client(url)
         self.collection_name = collection_name
+        self.uploader = uploader or BatchUploader()
         self._ensure_collection()
 
     def _ensure_collection(self) -> None:
@@ -26,20 +71,28 @@ class BM25QdrantClient:
                     )
                 },
             )
+        ensure_payload_indexes(self.client, self.collection_name, BM25_INDEX_FIELDS)
 
-    def upsert_documents(self, documents: list[dict[str, Any]]) -> None:
+    def upsert_documents(self, documents: list[dict[str, Any]], wait: bool = True) -> None:
         """Insert documents into BM25 collection.
 
+        Point IDs are derived from ('original_id', 'variant_ix') when present, else
+        from 'id', so re-inserting a document overwrites its previous version.
+
         Args:
             documents: List of dicts with 'text', 'id', and other metadata
+            wait: Wait until the points are searchable (else call flush() later)
         """
         points = []
-        for i, doc in enumerate(documents):
-            point_id = i  # Use integer ID
+        for doc in documents:
+            if "original_id" in doc and "variant_ix" in doc:
+                pid = point_id(doc["original_id"], doc["variant_ix"])
+            else:
+                pid = point_id(doc["id"])
 
             points.append(
                 PointStruct(
-                    id=point_id,
+                    id=pid,
                     vector={
                         "bm25": Document(
                             text=doc["text"],
@@ -55,7 +108,30 @@ class BM25QdrantClient:
             )
 
         if points:
-            self.client.upsert(collection_name=self.collection_name, points=points)
+            self.uploader.upload_points(self.client, self.collection_name, points)
+            if wait:
+                self.flush()
+
+    def flush(self) -> None:
+        """Wait until all uploaded documents are applied and searchable."""
+        self.uploader.barrier(self.client, self.collection_name)
+
+    def delete_sources(self, source_ids: list[str]) -> None:
+        """Delete all question variants of the given FAQ items.
+
+        Args:
+            source_ids: Original FAQ item IDs
+        """
+        if not source_ids:
+            return
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(
+                filter=Filter(
+                    must=[FieldCondition(key="original_id", match=MatchAny(any=source_ids))]
+                )
+            ),
+        )
 
     def search(
         self, query: str, k: int = 10, filters: dict[str, Any] | None = None
@@ -65,18 +141,13 @@ class BM25QdrantClient:
         Args:
             query: Search query text
             k: Number of results to return
+            filters: Optional payload filters (see compile_filter)
 
         Returns:
             List of (doc_id, metadata, score) tuples
         """
-        # Build query filter if provided
-        query_filter = None
-        if filters and "lang" in filters:
-            from qdrant_client.models import FieldCondition, Filter, MatchValue
-
-            query_filter = Filter(
-                must=[FieldCondition(key="lang", match=MatchValue(value=filters["lang"]))]
-            )
+        # Build query filter; variants carry their FAQ item ID as original_id
+        query_filter = compile_filter(filters, aliases={"source_id": "original_id"})
 
         results = self.client.query_points(
             collection_name=self.collection_name,
@@ -92,9 +163,82 @@ class BM25QdrantClient:
 
         hits = []
         for result in results.points:
-            doc_id = result.id
-            metadata = dict(result.payload)
+            doc_id = str(result.id)
+            metadata = dict(result.payload or {})
             score = float(result.score)
             hits.append((doc_id, metadata, score))
 
         return hits
+
+    def search_batch(
+        self,
+        queries: list[str],
+        k: int = 10,
+        filters: dict[str, Any] | None = None,
+        grouped: bool = False,
+    ) -> list[list[tuple[str, dict[str, Any], float]]]:
+        """Search several queries in one ``query_batch_points`` round trip.
+
+        Qdrant has no batched grouping API, so grouped searches run one by one.
+
+        Args:
+            queries: Search query texts
+            k: Number of results per query
+            filters: Optional payload filters applied to every query
+            grouped: Collapse hits to one per FAQ item, as search_grouped
+
+        Returns:
+            One hit list per query, as returned by search (or search_grouped)
+        """
+        if grouped:
+            return [self.search_grouped(q, k=k, filters=filters) for q in queries]
+        if not queries:
+            return []
+        query_filter = compile_filter(filters, aliases={"source_id": "original_id"})
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=[
+                QueryRequest(
+                    query=Document(text=q, model="Qdrant/bm25"),
+                    using="bm25",
+                    limit=k,
+                    filter=query_filter,
+                    with_payload=True,
+                )
+                for q in queries
+            ],
+        )
+        return [
+            [(str(p.id), dict(p.payload or {}), float(p.score)) for p in response.points]
+            for response in responses
+        ]
+
+    def search_grouped(
+        self, query: str, k: int = 10, filters: dict[str, Any] | None = None
+    ) -> list[tuple[str, dict[str, Any], float]]:
+        """Search using BM25, returning the best question variant of k distinct FAQ items.
+
+        Args:
+            query: Search query text
+            k: Number of FAQ items to return
+            filters: Optional payload filters (see compile_filter)
+
+        Returns:
+            List of (text, metadata, score) tuples, see item_hit
+        """
+        query_filter = compile_filter(filters, aliases={"source_id": "original_id"})
+        results = self.client.query_points_groups(
+            collection_name=self.collection_name,
+            group_by="original_id",
+            query=Document(text=query, model="Qdrant/bm25"),
+            using="bm25",
+            limit=k,
+            group_size=1,
+            with_payload=True,
+            query_filter=query_filter,
+        )
+        return [
+            item_hit(group.hits[0].payload or {}, float(group.hits[0].score))
+            for group in results.groups
+            if group.hits
+        ]
@@ -0,0 +1,60 @@
+import logging
+from functools import cache
+
+from qdrant_client import QdrantClient
+
+from ..config import Settings
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def get_qdrant_client(
+    url: str = "http://localhost:6333",
+    prefer_grpc: bool = False,
+    grpc_port: int = 6334,
+    timeout: int | None = None,
+    pool_size: int | None = None,
+) -> QdrantClient:
+    """Get a process-wide Qdrant client for the given connection options.
+
+    Stores created with the same options share one client and therefore one
+    connection pool (HTTP keep-alive or gRPC channels). With ``prefer_grpc`` vectors
+    are sent as binary protobuf floats instead of JSON text.
+
+    Args:
+        url: Qdrant REST URL (host is reused for gRPC)
+        prefer_grpc: Use gRPC transport where available
+        grpc_port: Qdrant gRPC port
+        timeout: Request timeout in seconds
+        pool_size: HTTP connection / gRPC channel pool size (None - client default)
+
+    Returns:
+        Shared QdrantClient instance
+    """
+    logger.info(f"[QDRANT] Connecting to {url} ({'gRPC' if prefer_grpc else 'REST'})")
+    return QdrantClient(
+        url=url,
+        prefer_grpc=prefer_grpc,
+        grpc_port=grpc_port,
+        timeout=timeout,
+        pool_size=pool_size,
+    )
+
+
+def client_from_settings(s: Settings) -> QdrantClient:
+    """Get the shared Qdrant client configured by settings.
+
+    Args:
+        s: Application settings
+
+    Returns:
+        Shared QdrantClient instance
+    """
+    return get_qdrant_client(
+        s.qdrant_url,
+        prefer_grpc=s.qdrant_prefer_grpc,
+        grpc_port=s.qdrant_grpc_port,
+        timeout=s.qdrant_timeout,
+        pool_size=s.qdrant_pool_size,
+    )
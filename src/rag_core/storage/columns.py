@@ -0,0 +1,146 @@
+import json
+import os
+from collections.abc import Hashable, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .filters import KEYWORD_INDEX_FIELDS, RANGE_OPS
+
+
+class PayloadColumns:
+    """Column-oriented payload store for the in-process indexes.
+
+    Payloads are kept as one list per field instead of one dict per point, saved as
+    a JSON sidecar next to the index matrix. Boolean row masks are precomputed for
+    every value of the indexed fields, so filters use the same syntax as
+    ``compile_filter`` and cost a few vectorised ANDs.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, list[Any]],
+        n: int,
+        index_fields: Sequence[str] = KEYWORD_INDEX_FIELDS,
+    ):
+        """Initialize payload columns.
+
+        Args:
+            columns: Field name -> list of n values (None where a row lacks the field)
+            n: Number of rows
+            index_fields: Fields to precompute per-value masks for
+        """
+        self.columns = columns
+        self.n = n
+        self._masks: dict[str, dict[Hashable, np.ndarray]] = {}
+        for field in index_fields:
+            if field in columns:
+                self._masks[field] = self._value_masks(columns[field])
+
+    def _value_masks(self, values: list[Any]) -> dict[Hashable, np.ndarray]:
+        """One boolean mask per distinct hashable value of a column."""
+        codes: dict[Hashable, list[int]] = {}
+        for row, value in enumerate(values):
+            if isinstance(value, Hashable):
+                codes.setdefault(value, []).append(row)
+        masks = {}
+        for value, rows in codes.items():
+            mask = np.zeros(self.n, dtype=bool)
+            mask[rows] = True
+            masks[value] = mask
+        return masks
+
+    @classmethod
+    def from_rows(
+        cls, rows: Sequence[dict[str, Any]], index_fields: Sequence[str] = KEYWORD_INDEX_FIELDS
+    ) -> "PayloadColumns":
+        """Build columns from per-point payload dicts."""
+        fields = dict.fromkeys(key for row in rows for key in row)
+        columns = {field: [row.get(field) for row in rows] for field in fields}
+        return cls(columns, len(rows), index_fields)
+
+    @classmethod
+    def load(
+        cls, path: str | Path, index_fields: Sequence[str] = KEYWORD_INDEX_FIELDS
+    ) -> "PayloadColumns":
+        """Load columns from a JSON sidecar."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["columns"], data["n"], index_fields)
+
+    def save(self, path: str | Path) -> None:
+        """Write columns to a JSON sidecar atomically."""
+        tmp = Path(f"{path}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"n": self.n, "columns": self.columns}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def row(self, i: int) -> dict[str, Any]:
+        """Reassemble the payload of one row."""
+        return {field: values[i] for field, values in self.columns.items() if values[i] is not None}
+
+    def _match(self, field: str, values: list[Any]) -> np.ndarray:
+        """Rows whose field equals any of values."""
+        masks = self._masks.get(field)
+        if masks is not None:
+            mask = np.zeros(self.n, dtype=bool)
+            for value in values:
+                if value in masks:
+                    mask |= masks[value]
+            return mask
+        column = self.columns.get(field, [None] * self.n)
+        wanted = {v for v in values if isinstance(v, Hashable)}
+        return np.fromiter(
+            (isinstance(v, Hashable) and v in wanted for v in column), dtype=bool, count=self.n
+        )
+
+    def _range(self, field: str, spec: dict[str, Any]) -> np.ndarray:
+        """Rows whose numeric field satisfies all range bounds."""
+        values = self.columns.get(field, [None] * self.n)
+        column = np.array(
+            [v if isinstance(v, int | float) else np.nan for v in values], dtype=np.float64
+        )
+        mask = ~np.isnan(column)
+        if "gt" in spec:
+            mask &= column > spec["gt"]
+        if "gte" in spec:
+            mask &= column >= spec["gte"]
+        if "lt" in spec:
+            mask &= column < spec["lt"]
+        if "lte" in spec:
+            mask &= column <= spec["lte"]
+        return mask
+
+    def mask(self, filters: dict[str, Any] | None) -> np.ndarray | None:
+        """Boolean mask of rows matching all filters.
+
+        Args:
+            filters: Same syntax as compile_filter
+
+        Returns:
+            Boolean array of length n, or None if there is nothing to filter on
+
+        Raises:
+            ValueError: If a field uses an unsupported operator
+        """
+        if not filters:
+            return None
+        mask = np.ones(self.n, dtype=bool)
+        for field, spec in filters.items():
+            if isinstance(spec, list):
+                mask &= self._match(field, spec)
+            elif not isinstance(spec, dict):
+                mask &= self._match(field, [spec])
+            elif set(spec) - {"eq", "in", *RANGE_OPS} or not spec:
+                raise ValueError(f"Unsupported filter for '{field}': {spec}")
+            elif "eq" in spec:
+                mask &= self._match(field, [spec["eq"]])
+            elif "in" in spec:
+                mask &= self._match(field, list(spec["in"]))
+            else:
+                mask &= self._range(field, spec)
+        return mask
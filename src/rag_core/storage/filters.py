@@ -0,0 +1,99 @@
+import json
+import logging
+from functools import lru_cache
+from typing import Any
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Condition,
+    FieldCondition,
+    Filter,
+    MatchAny,
+    MatchValue,
+    PayloadSchemaType,
+    Range,
+)
+
+logger = logging.getLogger(__name__)
+
+# Payload fields that get a keyword index and can be filtered cheaply
+KEYWORD_INDEX_FIELDS = ("lang", "section", "source_id")
+RANGE_OPS = ("gt", "gte", "lt", "lte")
+
+
+def _condition(key: str, spec: Any) -> FieldCondition:
+    """Compile one field spec into a FieldCondition.
+
+    Supported specs: a scalar (equality), a list (any of), ``{"eq": v}``,
+    ``{"in": [...]}`` and ``{"gt"|"gte"|"lt"|"lte": number, ...}``.
+    """
+    if isinstance(spec, list):
+        return FieldCondition(key=key, match=MatchAny(any=spec))
+    if not isinstance(spec, dict):
+        return FieldCondition(key=key, match=MatchValue(value=spec))
+
+    unknown = set(spec) - {"eq", "in", *RANGE_OPS}
+    if unknown or len(spec) == 0:
+        raise ValueError(f"Unsupported filter for '{key}': {spec}")
+    if "eq" in spec:
+        return FieldCondition(key=key, match=MatchValue(value=spec["eq"]))
+    if "in" in spec:
+        return FieldCondition(key=key, match=MatchAny(any=list(spec["in"])))
+    return FieldCondition(key=key, range=Range(**{op: spec[op] for op in RANGE_OPS if op in spec}))
+
+
+@lru_cache(maxsize=1024)
+def _compile(canonical: str, aliases: tuple[tuple[str, str], ...]) -> Filter | None:
+    """Compile a canonical JSON filter (cached, so repeated filters cost one lookup)."""
+    filters = json.loads(canonical)
+    renames = dict(aliases)
+    must: list[Condition] = []
+    for key, spec in filters.items():
+        must.append(_condition(renames.get(key, key), spec))
+    return Filter(must=must) if must else None
+
+
+def compile_filter(
+    filters: dict[str, Any] | None, aliases: dict[str, str] | None = None
+) -> Filter | None:
+    """Turn a request ``filters`` dict into a Qdrant Filter.
+
+    All fields must match (AND). Example::
+
+        {"lang": "en", "section": ["Rules", "Scoring"], "version": {"gte": 2}}
+
+    Args:
+        filters: Mapping of payload field to value, list, or operator dict
+        aliases: Field renames for a store's payload layout (e.g. source_id -> original_id)
+
+    Returns:
+        Compiled Filter or None if there is nothing to filter on
+
+    Raises:
+        ValueError: If a field uses an unsupported operator
+    """
+    if not filters:
+        return None
+    canonical = json.dumps(filters, sort_keys=True, default=str)
+    return _compile(canonical, tuple(sorted((aliases or {}).items())))
+
+
+def ensure_payload_indexes(
+    client: QdrantClient, collection_name: str, fields: tuple[str, ...] = KEYWORD_INDEX_FIELDS
+) -> None:
+    """Create keyword payload indexes for fields that do not have one yet.
+
+    Args:
+        client: Qdrant client
+        collection_name: Collection to index
+        fields: Payload fields to index
+    """
+    existing = client.get_collection(collection_name).payload_schema or {}
+    for field in fields:
+        if field not in existing:
+            logger.info(f"[QDRANT] Creating payload index {collection_name}.{field}")
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
@@ -0,0 +1,195 @@
+from typing import Any
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance,
+    Document,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    Fusion,
+    FusionQuery,
+    MatchAny,
+    Modifier,
+    PointStruct,
+    Prefetch,
+    SparseVectorParams,
+    VectorParams,
+)
+
+from .client import get_qdrant_client
+from .filters import compile_filter, ensure_payload_indexes
+from .ids import point_id
+from .upload import BatchUploader
+
+DENSE_VECTOR = "dense"
+SPARSE_VECTOR = "bm25"
+SPARSE_MODEL = "Qdrant/bm25"
+
+
+class QdrantHybridStore:
+    """Single collection holding a named dense vector and a named BM25 sparse vector.
+
+    Both legs of hybrid search run inside Qdrant as ``prefetch`` queries of one
+    ``query_points`` call and are fused server-side (RRF or DBSF), so a query costs
+    one round trip and one payload transfer.
+    """
+
+    def __init__(
+        self,
+        url: str = "http://localhost:6333",
+        collection_name: str = "faq_hybrid",
+        dense_size: int = 512,
+        fusion: str = "rrf",
+        uploader: BatchUploader | None = None,
+        client: QdrantClient | None = None,
+    ):
+        # Stores share one pooled client per connection options unless given one
+        self.client = client or get_qdrant_client(url)
+        self.collection_name = collection_name
+        self.dense_size = dense_size
+        self.fusion = fusion
+        self.uploader = uploader or BatchUploader()
+        self._ensure_collection()
+
+    def _ensure_collection(self) -> None:
+        """Create hybrid collection if it does not exist."""
+        try:
+            self.client.get_collection(self.collection_name)
+        except Exception:
+            self.client.create_collection(
+                collection_name=self.collection_name,
+                vectors_config={
+                    DENSE_VECTOR: VectorParams(size=self.dense_size, distance=Distance.COSINE)
+                },
+                sparse_vectors_config={SPARSE_VECTOR: SparseVectorParams(modifier=Modifier.IDF)},
+            )
+        ensure_payload_indexes(self.client, self.collection_name)
+
+    def insert_items(
+        self,
+        doc_id: str,
+        texts: list[str],
+        sparse_texts: list[str],
+        metas: list[dict[str, Any]],
+        vecs: Any,
+        wait: bool = True,
+    ) -> None:
+        """Insert FAQ items with both their dense and sparse vectors.
+
+        Dense rows are handed to the batched uploader as NumPy arrays, as in
+        QdrantVectorStore; the BM25 ``Document`` vectors are turned into sparse vectors
+        client-side during the upload.
+
+        Args:
+            doc_id: Parent document ID
+            texts: Texts the dense vectors were computed from (stored in payload)
+            sparse_texts: Texts indexed by BM25 (e.g. all question variants + answer)
+            metas: Per-item metadata, must contain ``source_id``
+            vecs: Dense embeddings, one row per item
+            wait: Wait until the points are searchable (else call flush() later)
+        """
+        points = []
+        vectors = np.asarray(vecs, dtype=np.float32)
+        for text, sparse_text, meta, vec in zip(texts, sparse_texts, metas, vectors, strict=True):
+            source_id = meta["source_id"]
+            payload = {
+                "document_id": doc_id,
+                "chunk_ix": 0,
+                "text": text,
+                "lang": meta.get("lang", ""),
+                **meta,
+            }
+            points.append(
+                PointStruct(
+                    id=point_id(source_id),
+                    vector={
+                        DENSE_VECTOR: vec,
+                        SPARSE_VECTOR: Document(text=sparse_text, model=SPARSE_MODEL),
+                    },
+                    payload=payload,
+                )
+            )
+
+        if points:
+            self.uploader.upload_points(self.client, self.collection_name, points)
+            if wait:
+                self.flush()
+
+    def flush(self) -> None:
+        """Wait until all uploaded items are applied and searchable."""
+        self.uploader.barrier(self.client, self.collection_name)
+
+    def delete_sources(self, source_ids: list[str]) -> None:
+        """Delete all points of the given FAQ items.
+
+        Args:
+            source_ids: IDs of items to remove
+        """
+        if not source_ids:
+            return
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(
+                filter=Filter(
+                    must=[FieldCondition(key="source_id", match=MatchAny(any=source_ids))]
+                )
+            ),
+        )
+
+    def search(
+        self,
+        query: str,
+        qvec: Any,
+        k: int = 5,
+        filters: dict | None = None,
+        fusion: str | None = None,
+        prefetch_k: int | None = None,
+    ) -> list[tuple[str, dict[str, Any], float]]:
+        """Hybrid search fused server-side.
+
+        Args:
+            query: Query text for the BM25 leg
+            qvec: Query vector for the dense leg
+            k: Number of fused results to return
+            filters: Optional payload filters applied to both legs (see compile_filter)
+            fusion: "rrf" or "dbsf" (default: store setting)
+            prefetch_k: Candidates fetched per leg before fusion (default: k)
+
+        Returns:
+            List of (text, metadata, score) tuples
+        """
+        query_filter = compile_filter(filters)
+
+        leg_limit = max(prefetch_k or k, k)
+        results = self.client.query_points(
+            collection_name=self.collection_name,
+            prefetch=[
+                Prefetch(
+                    query=Document(text=query, model=SPARSE_MODEL),
+                    using=SPARSE_VECTOR,
+                    limit=leg_limit,
+                    filter=query_filter,
+                ),
+                Prefetch(
+                    query=np.asarray(qvec, dtype=np.float32).tolist(),
+                    using=DENSE_VECTOR,
+                    limit=leg_limit,
+                    filter=query_filter,
+                ),
+            ],
+            query=FusionQuery(fusion=Fusion(fusion or self.fusion)),
+            limit=k,
+            with_payload=True,
+        )
+
+        hits = []
+        for result in results.points:
+            meta = dict(result.payload or {})
+            meta["source_id"] = (
+                f"{meta.get('source_id', meta.get('document_id'))}#{meta.get('chunk_ix', 0)}"
+            )
+            hits.append((meta.get("text", ""), meta, float(result.score)))
+
+        return hits
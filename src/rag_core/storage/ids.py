@@ -0,0 +1,57 @@
+import uuid
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import ExtendedPointId, PointIdsList
+
+# Fixed namespace so the same (source_id, chunk_ix) maps to the same point ID in every
+# run, on every host and in every collection
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "ffs-rag/points")
+
+
+def point_id(source_id: str, chunk_ix: int = 0) -> str:
+    """Deterministic point ID derived from the source item and chunk index.
+
+    Re-ingesting the same item overwrites its own points instead of whatever happened
+    to sit at the same position in the previous run.
+
+    Args:
+        source_id: ID of the source item (e.g. FAQ item ID)
+        chunk_ix: Index of the chunk / variant within the item
+
+    Returns:
+        UUIDv5 string
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{source_id}#{chunk_ix}"))
+
+
+def delete_stale_points(
+    client: QdrantClient, collection_name: str, keep: set[str], batch_size: int = 1024
+) -> int:
+    """Delete every point whose ID is not in ``keep``.
+
+    Removes leftovers a full re-ingest would not overwrite: items gone from the
+    corpus and points written under an older ID scheme (e.g. loop-index integers).
+
+    Args:
+        client: Qdrant client
+        collection_name: Collection to prune
+        keep: Point IDs of the current corpus (see point_id)
+        batch_size: Points scrolled and deleted per request
+
+    Returns:
+        Number of deleted points
+    """
+    stale: list[ExtendedPointId] = []
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name, limit=batch_size, offset=offset, with_payload=False
+        )
+        stale.extend(p.id for p in points if str(p.id) not in keep)
+        if offset is None:
+            break
+    for start in range(0, len(stale), batch_size):
+        client.delete(
+            collection_name, points_selector=PointIdsList(points=stale[start : start + batch_size])
+        )
+    return len(stale)
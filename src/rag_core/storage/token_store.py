@@ -0,0 +1,184 @@
+import hashlib
+import json
+import logging
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from .versions import current_version, new_version, publish
+
+logger = logging.getLogger(__name__)
+
+TOKENS_FILE = "tokens.npy"
+OFFSETS_FILE = "offsets.npy"
+KEYS_FILE = "keys.json"
+NPY_HEADER_SIZE = 128  # fixed .npy header, rewritten once the row count is known
+
+
+def text_digest(text: str) -> str:
+    """SHA-256 hex digest of a document text, recorded to detect changed documents."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _npy_header(dtype: np.dtype, shape: tuple[int, int]) -> bytes:
+    """Version 1.0 ``.npy`` header padded to NPY_HEADER_SIZE bytes."""
+    fields = f"{{'descr': {dtype.str!r}, 'fortran_order': False, 'shape': {shape}, }}"
+    fields = fields.ljust(NPY_HEADER_SIZE - 10 - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + len(fields).to_bytes(2, "little") + fields.encode("latin1")
+
+
+def _stream_npy(path: Path, blocks: Iterable[np.ndarray], dtype: np.dtype) -> list[int]:
+    """Write row blocks one by one into a ``.npy`` matrix without stacking them in memory.
+
+    Args:
+        path: Output file
+        blocks: (rows, dim) blocks sharing one dim
+        dtype: Storage dtype
+
+    Returns:
+        Row count of each block
+    """
+    lengths: list[int] = []
+    dim = 0
+    with open(path, "wb") as f:
+        f.write(b"\0" * NPY_HEADER_SIZE)
+        for block in blocks:
+            block = np.ascontiguousarray(block, dtype=dtype)
+            if lengths and block.shape[1] != dim:
+                raise ValueError(f"Got a block of dim {block.shape[1]}, expected {dim}")
+            dim = block.shape[1]
+            f.write(block.tobytes())
+            lengths.append(len(block))
+        f.seek(0)
+        f.write(_npy_header(dtype, (sum(lengths), dim)))
+    return lengths
+
+
+class TokenVectorStore:
+    """Memory-mapped per-document token embeddings for late-interaction reranking.
+
+    Token vectors of all documents are stacked into one ``(tokens, dim)`` ``.npy``
+    matrix; ``offsets`` holds each document's first row (plus a final end row) and
+    a JSON sidecar maps document keys (``source_id``) to their position and the
+    digest of the text they were encoded from. Each build is written to its own
+    version directory and published through an atomic ``CURRENT`` pointer (see
+    versions.publish), so offsets always match the token matrix they index.
+    """
+
+    def __init__(self, path: str | Path):
+        """Open a store built by ``build``.
+
+        Args:
+            path: Store directory
+        """
+        self.path = Path(path)
+        self.version_path = current_version(self.path)
+        self.tokens = np.load(self.version_path / TOKENS_FILE, mmap_mode="r")
+        self.offsets = np.load(self.version_path / OFFSETS_FILE)
+        with open(self.version_path / KEYS_FILE, encoding="utf-8") as f:
+            sidecar = json.load(f)
+        self.rows: dict[str, int] = {key: i for i, key in enumerate(sidecar["keys"])}
+        self.digests: dict[str, str] = dict(zip(sidecar["keys"], sidecar["digests"], strict=True))
+        logger.info(
+            f"[TOKEN STORE] Opened {self.version_path}: {len(self.rows)} documents, "
+            f"{len(self.tokens)} x {self.tokens.shape[1]} {self.tokens.dtype} token vectors"
+        )
+
+    @staticmethod
+    def exists(path: str | Path) -> bool:
+        """Whether a store has been published at ``path``."""
+        return (current_version(Path(path)) / KEYS_FILE).exists()
+
+    @classmethod
+    def build(
+        cls,
+        path: str | Path,
+        keys: Sequence[str],
+        matrices: Iterable[np.ndarray],
+        dtype: str = "float32",
+        digests: Sequence[str] | None = None,
+    ) -> "TokenVectorStore":
+        """Write a new store into a fresh version directory, publish it and open it.
+
+        Matrices are streamed into the token file one by one, so memory stays at
+        one document's tokens however large the corpus is.
+
+        Args:
+            path: Store directory
+            keys: Document keys, one per matrix
+            matrices: Per-document (tokens, dim) embeddings in the order of keys
+            dtype: Storage dtype, "float32" or "float16"
+            digests: Digest of each document's text (see text_digest), used by update
+
+        Returns:
+            Opened TokenVectorStore
+        """
+        path = Path(path)
+        version = new_version(path)
+        lengths = _stream_npy(version / TOKENS_FILE, matrices, np.dtype(dtype))
+        if len(lengths) != len(keys):
+            raise ValueError(f"Got {len(lengths)} matrices for {len(keys)} keys")
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(lengths)
+        np.save(version / OFFSETS_FILE, offsets)
+        with open(version / KEYS_FILE, "w", encoding="utf-8") as f:
+            json.dump({"keys": list(keys), "digests": list(digests or [""] * len(keys))}, f)
+        publish(path, version)
+        return cls(path)
+
+    @classmethod
+    def update(
+        cls,
+        path: str | Path,
+        keys: Sequence[str],
+        texts: Sequence[str],
+        encode: Callable[[list[str]], Iterable[np.ndarray]],
+        dtype: str = "float32",
+    ) -> tuple["TokenVectorStore", int]:
+        """Rebuild the store, encoding only documents that are new or whose text changed.
+
+        Token matrices of unchanged documents are copied from the current store at
+        ``path``; removed documents are dropped.
+
+        Args:
+            path: Store directory
+            keys: Document keys
+            texts: Document texts, one per key
+            encode: Encodes a list of texts into per-text (tokens, dim) matrices, in order
+            dtype: Storage dtype, "float32" or "float16"
+
+        Returns:
+            (opened TokenVectorStore, number of documents encoded)
+        """
+        path = Path(path)
+        old = cls(path) if cls.exists(path) else None
+        digests = [text_digest(t) for t in texts]
+        reuse = [
+            old is not None and old.digests.get(key) == digest
+            for key, digest in zip(keys, digests, strict=True)
+        ]
+        todo = [text for text, reused in zip(texts, reuse, strict=True) if not reused]
+
+        def matrices() -> Iterator[np.ndarray]:
+            encoded = iter(encode(todo)) if todo else iter(())
+            for key, reused in zip(keys, reuse, strict=True):
+                yield old.get(key) if old is not None and reused else next(encoded)
+
+        store = cls.build(path, keys, matrices(), dtype, digests)
+        return store, len(todo)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    def get(self, key: str) -> np.ndarray:
+        """Token matrix of one document as float32.
+
+        Raises:
+            KeyError: If the document is not in the store
+        """
+        i = self.rows[key]
+        return np.asarray(self.tokens[self.offsets[i] : self.offsets[i + 1]], dtype=np.float32)
@@ -0,0 +1,141 @@
+import logging
+from collections.abc import Callable, Sequence
+from time import perf_counter
+from typing import Any, TypeVar
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointIdsList, PointStruct
+from tenacity import Retrying, stop_after_attempt, wait_exponential
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Nil UUID: never used by point_id(), so deleting it is a no-op write
+BARRIER_POINT_ID = "00000000-0000-0000-0000-000000000000"
+
+
+class BatchUploader:
+    """Streams points to Qdrant in batches, in parallel, without waiting per batch.
+
+    Batches are sent with ``wait=False`` (Qdrant acknowledges receipt, not
+    application). ``barrier()`` then issues one no-op write with ``wait=True``: the
+    update queue of a collection is applied in order, so once the barrier is applied
+    every earlier batch is too. Whole uploads are retried with exponential backoff,
+    which is safe because point IDs are deterministic and upserts idempotent.
+    """
+
+    def __init__(self, batch_size: int = 256, parallel: int = 1, max_retries: int = 3):
+        """Initialize uploader.
+
+        Args:
+            batch_size: Points per request
+            parallel: Number of parallel upload workers
+            max_retries: Attempts per batch (client side) and per upload call (tenacity)
+        """
+        self.batch_size = batch_size
+        self.parallel = parallel
+        self.max_retries = max_retries
+        self.points = 0
+        self.seconds = 0.0
+
+    def _retry(self, fn: Callable[[], T]) -> T:
+        """Run fn with exponential backoff retries."""
+        retrying = Retrying(
+            stop=stop_after_attempt(self.max_retries),
+            wait=wait_exponential(multiplier=0.5, max=10),
+            before_sleep=lambda state: logger.warning(
+                f"[UPLOAD] Attempt {state.attempt_number} failed, retrying"
+            ),
+            reraise=True,
+        )
+        return retrying(fn)
+
+    def _timed(self, n: int, fn: Callable[[], Any]) -> None:
+        """Run an upload and account its points and duration."""
+        t0 = perf_counter()
+        self._retry(fn)
+        elapsed = perf_counter() - t0
+        self.points += n
+        self.seconds += elapsed
+        logger.info(f"[UPLOAD] {n} points in {elapsed:.2f}s ({n / max(elapsed, 1e-9):.0f} pts/s)")
+
+    def upload_vectors(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        ids: Sequence[str],
+        vectors: Any,
+        payloads: Sequence[dict[str, Any]],
+    ) -> None:
+        """Upload a block of vectors; NumPy arrays are passed through as-is.
+
+        Args:
+            client: Qdrant client
+            collection_name: Target collection
+            ids: Point IDs
+            vectors: np.ndarray (or dict of named np.ndarray) with one row per point
+            payloads: Point payloads
+        """
+        self._timed(
+            len(ids),
+            lambda: client.upload_collection(
+                collection_name=collection_name,
+                vectors=vectors,
+                payload=payloads,
+                ids=ids,
+                batch_size=self.batch_size,
+                parallel=self.parallel,
+                max_retries=self.max_retries,
+                wait=False,
+            ),
+        )
+
+    def upload_points(
+        self, client: QdrantClient, collection_name: str, points: Sequence[PointStruct]
+    ) -> None:
+        """Upload prepared points (e.g. with ``Document`` vectors needing inference).
+
+        Args:
+            client: Qdrant client
+            collection_name: Target collection
+            points: Points to upload
+        """
+        self._timed(
+            len(points),
+            lambda: client.upload_points(
+                collection_name=collection_name,
+                points=points,
+                batch_size=self.batch_size,
+                parallel=self.parallel,
+                max_retries=self.max_retries,
+                wait=False,
+            ),
+        )
+
+    def barrier(self, client: QdrantClient, collection_name: str) -> None:
+        """Block until every previously uploaded batch has been applied.
+
+        Args:
+            client: Qdrant client
+            collection_name: Collection to synchronise
+        """
+        self._retry(
+            lambda: client.delete(
+                collection_name=collection_name,
+                points_selector=PointIdsList(points=[BARRIER_POINT_ID]),
+                wait=True,
+            )
+        )
+
+    def stats(self) -> dict[str, float]:
+        """Upload throughput accumulated by this uploader.
+
+        Returns:
+            Dictionary with points, seconds and points_per_sec
+        """
+        return {
+            "points": self.points,
+            "seconds": self.seconds,
+            "points_per_sec": self.points / self.seconds if self.seconds else 0.0,
+        }
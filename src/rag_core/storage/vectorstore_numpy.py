@@ -0,0 +1,187 @@
+import logging
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .columns import PayloadColumns
+from .versions import current_version, new_version, publish
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+PAYLOAD_FILE = "payload.json"
+SCORE_BLOCK_ROWS = 65536  # float16 rows upcast per step when scoring
+
+
+class NumpyVectorStore:
+    """In-process dense index with the same search contract as QdrantVectorStore.
+
+    The L2-normalised corpus matrix is a memory-mapped ``.npy`` file (float32 or
+    float16), so uvicorn workers opening the same index share its pages through the
+    OS page cache. Payloads live in a columnar JSON sidecar with precomputed filter
+    masks. A query is one matrix-vector product plus ``argpartition`` for top-k.
+
+    Each build goes into its own ``v-<n>`` directory under the index path and is
+    published by atomically replacing the ``CURRENT`` pointer file, so readers
+    always open a matrix and sidecar from the same build.
+    """
+
+    def __init__(self, path: str | Path):
+        """Open an index built by ``build``.
+
+        Args:
+            path: Index directory (its ``CURRENT`` version, or the files directly in
+                it for indexes built before versioning)
+
+        Raises:
+            ValueError: If the matrix and payload sidecar disagree on the row count
+        """
+        self.path = Path(path)
+        self.version_path = current_version(self.path)
+        self.vectors = np.load(self.version_path / VECTORS_FILE, mmap_mode="r")
+        self.payload = PayloadColumns.load(self.version_path / PAYLOAD_FILE)
+        if len(self.vectors) != len(self.payload):
+            raise ValueError(
+                f"Index at {self.version_path} is inconsistent: {len(self.vectors)} vectors, "
+                f"{len(self.payload)} payloads"
+            )
+        logger.info(
+            f"[NUMPY INDEX] Opened {self.version_path}: {len(self.vectors)} x "
+            f"{self.vectors.shape[1]} {self.vectors.dtype}"
+        )
+
+    @classmethod
+    def build(
+        cls,
+        path: str | Path,
+        doc_id: str,
+        texts: list[str],
+        metas: list[dict[str, Any]],
+        blocks: Iterable[np.ndarray],
+        dim: int,
+        dtype: str = "float32",
+    ) -> "NumpyVectorStore":
+        """Write a new index from streamed embedding blocks and open it.
+
+        The matrix and payload sidecar are written into a fresh version directory,
+        then published by swapping ``CURRENT`` (see versions.publish). Processes that
+        already map the old matrix keep reading it until they reopen.
+
+        Args:
+            path: Index directory
+            doc_id: Parent document ID
+            texts: Chunk texts (stored in payload)
+            metas: Chunk metadata, one per text
+            blocks: Embedding blocks covering all texts in order
+            dim: Embedding dimension
+            dtype: Storage dtype, "float32" or "float16"
+
+        Returns:
+            Opened NumpyVectorStore
+        """
+        path = Path(path)
+        version = new_version(path)
+        out = np.lib.format.open_memmap(
+            version / VECTORS_FILE, mode="w+", dtype=np.dtype(dtype), shape=(len(texts), dim)
+        )
+        start = 0
+        for block in blocks:
+            block = np.asarray(block, dtype=np.float32)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            out[start : start + len(block)] = block / (norms + 1e-8)
+            start += len(block)
+        if start != len(texts):
+            raise ValueError(f"Got {start} vectors for {len(texts)} texts")
+        out.flush()
+        del out
+
+        payloads = [
+            {
+                "document_id": doc_id,
+                "chunk_ix": meta.get("chunk_ix", i),
+                "text": text,
+                "source_id": meta.get("source_id", doc_id),
+                "lang": meta.get("lang", ""),
+                **meta,
+            }
+            for i, (text, meta) in enumerate(zip(texts, metas, strict=True))
+        ]
+        PayloadColumns.from_rows(payloads).save(version / PAYLOAD_FILE)
+
+        publish(path, version)
+        for name in (VECTORS_FILE, PAYLOAD_FILE):
+            # Unversioned files of an index built before versioning
+            (path / name).unlink(missing_ok=True)
+        return cls(path)
+
+    def _scores(self, q: np.ndarray) -> np.ndarray:
+        """Cosine scores of all rows against normalised queries (dim x queries)."""
+        if self.vectors.dtype == np.float32:
+            return self.vectors @ q
+        # No BLAS for float16: upcast in bounded blocks
+        scores = np.empty((len(self.vectors), *q.shape[1:]), dtype=np.float32)
+        for start in range(0, len(self.vectors), SCORE_BLOCK_ROWS):
+            block = self.vectors[start : start + SCORE_BLOCK_ROWS]
+            scores[start : start + len(block)] = block.astype(np.float32) @ q
+        return scores
+
+    def search(
+        self, qvec: Any, k: int = 5, filters: dict | None = None
+    ) -> list[tuple[str, dict[str, Any], float]]:
+        """Search for similar vectors.
+
+        Args:
+            qvec: Query vector
+            k: Number of results to return
+            filters: Optional payload filters (see compile_filter)
+
+        Returns:
+            List of (text, metadata, score) tuples
+        """
+        return self.search_batch(np.asarray(qvec, dtype=np.float32).reshape(1, -1), k, filters)[0]
+
+    def search_batch(
+        self, qvecs: Any, k: int = 5, filters: dict | None = None
+    ) -> list[list[tuple[str, dict[str, Any], float]]]:
+        """Search for several query vectors with one matrix-matrix product.
+
+        Args:
+            qvecs: Query vectors, one per row
+            k: Number of results per query
+            filters: Optional payload filters applied to every query
+
+        Returns:
+            One hit list per query, as returned by search
+        """
+        q = np.asarray(qvecs, dtype=np.float32)
+        if len(q) == 0:
+            return []
+        q = q / (np.linalg.norm(q, axis=1, keepdims=True) + 1e-8)
+        scores = self._scores(q.T)
+        mask = self.payload.mask(filters)
+        return [self._top_k(scores[:, j], k, mask) for j in range(len(q))]
+
+    def _top_k(
+        self, scores: np.ndarray, k: int, mask: np.ndarray | None
+    ) -> list[tuple[str, dict[str, Any], float]]:
+        """Select the k best rows from a score column."""
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+            k = min(k, int(mask.sum()))
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        hits = []
+        for row in top:
+            meta = self.payload.row(int(row))
+            meta["source_id"] = (
+                f"{meta.get('source_id', meta.get('document_id'))}#{meta.get('chunk_ix', 0)}"
+            )
+            hits.append((meta.get("text", ""), meta, float(scores[row])))
+        return hits
@@ -1,21 +1,37 @@
 import uuid
 from typing import Any
 
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance,
     FieldCondition,
     Filter,
-    MatchValue,
-    PointStruct,
+    FilterSelector,
+    MatchAny,
+    QueryRequest,
+    ScoredPoint,
     VectorParams,
 )
 
+from .client import get_qdrant_client
+from .filters import compile_filter, ensure_payload_indexes
+from .ids import point_id
+from .upload import BatchUploader
+
 
 class QdrantVectorStore:
-    def __init__(self, url: str = "http://localhost:6333", collection_name: str = "documents"):
-        self.client = QdrantClient(url=url)
+    def __init__(
+        self,
+        url: str = "http://localhost:6333",
+        collection_name: str = "documents",
+        uploader: BatchUploader | None = None,
+        client: QdrantClient | None = None,
+    ):
+        # Stores share one pooled client per connection options unless given one
+        self.client = client or get_qdrant_client(url)
         self.collection_name = collection_name
+        self.uploader = uploader or BatchUploader()
         self._ensure_collection()
 
     def _ensure_collection(self) -> None:
@@ -28,6 +44,7 @@ class QdrantVectorStore:
                 collection_name=self.collection_name,
                 vectors_config=VectorParams(size=512, distance=Distance.COSINE),
             )
+        ensure_payload_indexes(self.client, self.collection_name)
 
     def upsert_document(self, meta: dict) -> str:
         """Create or update document, return document_id."""
@@ -48,47 +65,114 @@ class QdrantVectorStore:
         return document_id
 
     def insert_chunks(
-        self, doc_id: str, texts: list[str], metas: list[dict[str, Any]], vecs: Any
+        self,
+        doc_id: str,
+        texts: list[str],
+        metas: list[dict[str, Any]],
+        vecs: Any,
+        start_ix: int = 0,
+        wait: bool = True,
     ) -> None:
-        """Insert chunks with embeddings into Qdrant."""
-        points = []
-        for i, (text, meta, vec) in enumerate(zip(texts, metas, vecs, strict=False)):
-            point_id = i  # Use integer ID
-            point_meta = {
-                "document_id": doc_id,
-                "chunk_ix": i,
-                "text": text,
-                "source_id": meta.get("source_id", doc_id),
-                "lang": meta.get("lang", ""),
-                **meta,
-            }
-
-            points.append(PointStruct(id=point_id, vector=vec.tolist(), payload=point_meta))
-
-        if points:
-            self.client.upsert(collection_name=self.collection_name, points=points)
+        """Insert chunks with embeddings into Qdrant.
+
+        Point IDs are derived from (source_id, chunk_ix), so re-inserting a chunk
+        overwrites its previous version. ``chunk_ix`` is taken from the chunk metadata
+        if present, otherwise from the position offset by ``start_ix`` (so a corpus
+        can be inserted in blocks). Vectors are uploaded as a NumPy matrix in parallel
+        batches; with ``wait=False`` call ``flush()`` after the last block.
+        """
+        ids = []
+        payloads = []
+        for i, (text, meta) in enumerate(zip(texts, metas, strict=False), start=start_ix):
+            source_id = meta.get("source_id", doc_id)
+            chunk_ix = meta.get("chunk_ix", i)
+            payloads.append(
+                {
+                    "document_id": doc_id,
+                    "chunk_ix": chunk_ix,
+                    "text": text,
+                    "source_id": source_id,
+                    "lang": meta.get("lang", ""),
+                    **meta,
+                }
+            )
+            ids.append(point_id(source_id, chunk_ix))
+
+        if ids:
+            vectors = np.asarray(vecs, dtype=np.float32)[: len(ids)]
+            self.uploader.upload_vectors(self.client, self.collection_name, ids, vectors, payloads)
+            if wait:
+                self.flush()
+
+    def flush(self) -> None:
+        """Wait until all uploaded chunks are applied and searchable."""
+        self.uploader.barrier(self.client, self.collection_name)
+
+    def delete_sources(self, source_ids: list[str]) -> None:
+        """Delete all chunks of the given source items."""
+        if not source_ids:
+            return
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(
+                filter=Filter(
+                    must=[FieldCondition(key="source_id", match=MatchAny(any=source_ids))]
+                )
+            ),
+        )
 
     def search(
         self, qvec: Any, k: int = 5, filters: dict | None = None
     ) -> list[tuple[str, dict[str, Any], float]]:
         """Search for similar vectors."""
-        query_filter = None
-        if filters and "lang" in filters:
-            query_filter = Filter(
-                must=[FieldCondition(key="lang", match=MatchValue(value=filters["lang"]))]
-            )
+        query_filter = compile_filter(filters)
 
-        search_results = self.client.search(
+        # NumPy query vectors go out as packed floats (protobuf over gRPC)
+        results = self.client.query_points(
             collection_name=self.collection_name,
-            query_vector=qvec.tolist(),
+            query=np.asarray(qvec, dtype=np.float32),
             limit=k,
             query_filter=query_filter,
             with_payload=True,
         )
+        return self._hits(results.points)
+
+    def search_batch(
+        self, qvecs: Any, k: int = 5, filters: dict | None = None
+    ) -> list[list[tuple[str, dict[str, Any], float]]]:
+        """Search for several query vectors in one ``query_batch_points`` round trip.
+
+        Args:
+            qvecs: Query vectors, one per row
+            k: Number of results per query
+            filters: Optional payload filters applied to every query
+
+        Returns:
+            One hit list per query, as returned by search
+        """
+        query_filter = compile_filter(filters)
+        requests = [
+            QueryRequest(
+                query=np.asarray(qvec, dtype=np.float32).tolist(),
+                limit=k,
+                filter=query_filter,
+                with_payload=True,
+            )
+            for qvec in qvecs
+        ]
+        if not requests:
+            return []
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name, requests=requests
+        )
+        return [self._hits(response.points) for response in responses]
 
+    @staticmethod
+    def _hits(points: list[ScoredPoint]) -> list[tuple[str, dict[str, Any], float]]:
+        """Convert scored points to (text, metadata, score) hits."""
         hits = []
-        for result in search_results:
-            meta = dict(result.payload)
+        for result in points:
+            meta = dict(result.payload or {})
             meta["document_id"] = meta.get("document_id", "")
             meta["chunk_ix"] = meta.get("chunk_ix", 0)
             meta["source_id"] = (
@@ -0,0 +1,65 @@
+import os
+import shutil
+from pathlib import Path
+
+CURRENT_FILE = "CURRENT"  # names the version directory readers open
+
+
+def current_version(path: Path) -> Path:
+    """Directory of the published build of the index at ``path``.
+
+    Args:
+        path: Index directory
+
+    Returns:
+        Version directory named by ``CURRENT`` (``path`` itself if none was published)
+    """
+    pointer = path / CURRENT_FILE
+    if pointer.exists():
+        return path / pointer.read_text(encoding="utf-8").strip()
+    return path
+
+
+def versions(path: Path) -> list[Path]:
+    """Version directories under the index path, oldest first."""
+    if not path.exists():
+        return []
+    dirs = [p for p in path.glob("v-*") if p.is_dir() and p.name[2:].isdigit()]
+    return sorted(dirs, key=lambda p: int(p.name[2:]))
+
+
+def new_version(path: Path) -> Path:
+    """Create the directory of the next build, numbered after every existing one.
+
+    Args:
+        path: Index directory
+
+    Returns:
+        Empty ``v-<n>`` directory, invisible to readers until published
+    """
+    existing = versions(path)
+    last = int(existing[-1].name[2:]) if existing else 0
+    version = path / f"v-{last + 1:06d}"
+    version.mkdir(parents=True)
+    return version
+
+
+def publish(path: Path, version: Path) -> None:
+    """Atomically point ``CURRENT`` at a fully written version directory.
+
+    Readers either see the previous build or the new one, never a mix of their
+    files. Every version except the new and the previously published one (which
+    readers may still be opening) is deleted, including leftovers of interrupted
+    builds.
+
+    Args:
+        path: Index directory
+        version: Directory created by new_version
+    """
+    previous = current_version(path)
+    tmp = path / f"{CURRENT_FILE}.tmp"
+    tmp.write_text(version.name, encoding="utf-8")
+    os.replace(tmp, path / CURRENT_FILE)
+    for old in versions(path):
+        if old not in (version, previous):
+            shutil.rmtree(old, ignore_errors=True)
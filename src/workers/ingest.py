@@ -1,25 +1,288 @@
+import argparse
 import hashlib
 import json
+from collections.abc import Iterable
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any
+
+import numpy as np
+from fastembed import LateInteractionTextEmbedding
 
 from src.rag_core.config import Settings
-from src.rag_core.embeddings import FastEmbedEmbeddings
-from src.rag_core.storage import BM25QdrantClient, QdrantVectorStore
+from src.rag_core.embeddings import DiskEmbeddingCache, FastEmbedEmbeddings
+from src.rag_core.retrieval import is_late_interaction_model
+from src.rag_core.storage import (
+    BatchUploader,
+    BM25QdrantClient,
+    LocalBM25Index,
+    NumpyVectorStore,
+    QdrantHybridStore,
+    QdrantVectorStore,
+    TokenVectorStore,
+    client_from_settings,
+    delete_stale_points,
+    point_id,
+)
 
 
 def file_hash(p: Path) -> str:
     return hashlib.sha256(p.read_bytes()).hexdigest()
 
 
+def item_hash(item: dict) -> str:
+    """Content hash of a FAQ item (question, answer, section, generated questions)."""
+    return hashlib.sha256(json.dumps(item, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def load_manifest(path: Path) -> dict:
+    """Load the manifest of the previous ingest run (empty if there is none)."""
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    """Atomically write the ingest manifest."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    tmp.replace(path)
+
+
+def collection_counts(client: Any, names: list[str]) -> dict[str, int | None]:
+    """Exact point count of each collection (None if it does not exist)."""
+    return {
+        name: client.count(name, exact=True).count if client.collection_exists(name) else None
+        for name in names
+    }
+
+
+def plan_ingest(
+    hashes: dict[str, str],
+    manifest: dict,
+    counts: dict[str, int | None],
+    embedding_model: str,
+    storage_mode: str,
+    full: bool = False,
+) -> tuple[bool, set[str], list[str]]:
+    """Decide what to (re-)ingest from the previous run's manifest.
+
+    The manifest lives on the host, so it survives a wiped Qdrant volume
+    (``make down``). A delta is only trusted when the manifest was written for the
+    same embedding model and storage mode and every collection still holds the
+    number of points recorded in it; otherwise every item is ingested.
+
+    Args:
+        hashes: Content hash per current FAQ item ID
+        manifest: Manifest of the previous run (empty if none)
+        counts: Current point count per collection (None if missing)
+        embedding_model: Embedding model of this run
+        storage_mode: Storage layout of this run
+        full: Ingest every item regardless of the manifest
+
+    Returns:
+        (delta ingest?, IDs of items to ingest, IDs of items to delete)
+    """
+    previous = manifest.get("items", {})
+    compatible = (
+        manifest.get("embedding_model") == embedding_model
+        and manifest.get("storage_mode") == storage_mode
+    )
+    recorded = manifest.get("points", {})
+    intact = all(n is not None and n == recorded.get(name) for name, n in counts.items())
+    if compatible and not intact and not full:
+        print(
+            f"Collections do not match the manifest (expected {recorded}, found {counts}), "
+            "falling back to a full ingest"
+        )
+    delta = not full and compatible and intact
+    changed = {i for i, h in hashes.items() if not delta or previous.get(i) != h}
+    removed = sorted(set(previous) - set(hashes))
+    return delta, changed, removed
+
+
+def dense_text(item: dict) -> str:
+    """Text embedded for a FAQ item's dense vector (question + answer)."""
+    return f"Q: {item['original_question']}\nA: {item['answer']}"
+
+
+def item_metadata(item: dict) -> dict:
+    """Payload stored with a FAQ item's dense vector."""
+    return {
+        "source_id": item["id"],
+        "chunk_ix": 0,
+        "section": item["section"],
+        "original_question": item["original_question"],
+        "answer": item["answer"],
+        "generated_questions": item["generated_questions"],
+        "lang": "en",
+        "created_at": datetime.now(UTC).isoformat(),
+    }
+
+
+def item_questions(item: dict) -> list[str]:
+    """Original question followed by the generated question variants."""
+    generated_qs = item["generated_questions"]
+    if isinstance(generated_qs, dict):
+        # If it's a dict, extract the values
+        generated_qs = list(generated_qs.values())
+    elif not isinstance(generated_qs, list):
+        # If it's not a list or dict, make it a list
+        generated_qs = [generated_qs]
+    return [str(q) for q in [item["original_question"], *generated_qs]]
+
+
+def bm25_documents_for(item: dict) -> list[dict]:
+    """BM25 documents of a FAQ item, one per question variant."""
+    return [
+        {
+            "text": f"{q_str} {item['answer']}",  # Include answer for better matching
+            "id": f"{item['id']}_{q_str[:20]}",  # Unique ID for each question
+            "original_id": item["id"],
+            "variant_ix": variant_ix,
+            "question": q_str,
+            "answer": item["answer"],
+            "section": item["section"],
+            "lang": "en",
+        }
+        for variant_ix, q_str in enumerate(item_questions(item))
+    ]
+
+
+def prune_stale_points(
+    client: Any, collections: list[str], faq_data: list, hybrid: bool
+) -> dict[str, int]:
+    """Delete points a full ingest did not write, so only the current corpus remains.
+
+    Args:
+        client: Qdrant client
+        collections: Hybrid collection, or the dense and BM25 collections
+        faq_data: Every current FAQ item
+        hybrid: Storage mode is hybrid
+
+    Returns:
+        Deleted point count per collection
+    """
+    items = {point_id(item["id"]) for item in faq_data}
+    if hybrid:
+        keep = {collections[0]: items}
+    else:
+        variants = {
+            point_id(item["id"], variant_ix)
+            for item in faq_data
+            for variant_ix in range(len(item_questions(item)))
+        }
+        keep = {collections[0]: items, collections[1]: variants}
+    return {name: delete_stale_points(client, name, ids) for name, ids in keep.items()}
+
+
+def build_numpy_index(
+    s: Settings, emb: FastEmbedEmbeddings, cache: DiskEmbeddingCache | None, faq_data: list
+) -> None:
+    """Rebuild the in-process dense index from every FAQ item.
+
+    Unchanged items come from the embedding cache, so a rebuild only embeds what
+    changed even though the whole matrix is rewritten.
+    """
+    texts = [dense_text(item) for item in faq_data]
+    metas = [item_metadata(item) for item in faq_data]
+    blocks = (
+        cache.encode_batches(emb, texts, batch_size=s.ingest_batch_size, parallel=s.ingest_parallel)
+        if cache is not None
+        else emb.encode_batches(texts, batch_size=s.ingest_batch_size, parallel=s.ingest_parallel)
+    )
+    index = NumpyVectorStore.build(
+        s.dense_index_dir, "faq_prepared", texts, metas, blocks, emb.dim, s.dense_index_dtype
+    )
+    print(f"Built NumPy dense index at {index.path}: {len(texts)} vectors ({s.dense_index_dtype})")
+
+
+def build_token_index(s: Settings, faq_data: list) -> None:
+    """Rebuild the late-interaction reranker's document token vectors.
+
+    Keys are the ``source_id`` search hits carry (``"<item id>#0"``), so the reranker
+    finds every FAQ item without encoding it per request. Only new and changed items
+    are encoded; the rest are copied from the previous index.
+    """
+
+    def encode(texts: list[str]) -> Iterable[np.ndarray]:
+        model = LateInteractionTextEmbedding(s.reranker_model)
+        return model.passage_embed(texts, batch_size=s.ingest_batch_size)
+
+    store, encoded = TokenVectorStore.update(
+        s.late_interaction_index_dir,
+        [f"{item['id']}#0" for item in faq_data],
+        [dense_text(item) for item in faq_data],
+        encode,
+        s.late_interaction_dtype,
+    )
+    print(
+        f"Built late-interaction token index at {store.path}: {len(store)} documents "
+        f"({encoded} encoded), {len(store.tokens)} token vectors ({s.late_interaction_dtype})"
+    )
+
+
+def compact_embedding_cache(s: Settings, faq_path: Path) -> None:
+    """Drop embedding cache entries no longer referenced by the FAQ file."""
+    if not s.embedding_cache_dir:
+        print("Embedding cache is disabled (RAG_EMBEDDING_CACHE_DIR is empty)")
+        return
+
+    with open(faq_path, encoding="utf-8") as f:
+        faq_data = json.load(f)
+
+    cache = DiskEmbeddingCache(s.embedding_cache_dir, s.embedding_model)
+    kept, dropped = cache.compact([dense_text(item) for item in faq_data])
+    print(f"Compacted embedding cache {cache.path}: kept {kept}, dropped {dropped} entries")
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest FAQ data into Qdrant")
+    parser.add_argument(
+        "--compact-cache",
+        action="store_true",
+        help="Drop embedding cache entries not referenced by the FAQ file and exit",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-ingest every item instead of only new/changed ones",
+    )
+    args = parser.parse_args()
+
     s = Settings()
-    vs = QdrantVectorStore(s.qdrant_url)
-    bm25_client = BM25QdrantClient(s.qdrant_url)
+    faq_path = Path("data/prepared/faq_prepared.json")
+    if args.compact_cache:
+        compact_embedding_cache(s, faq_path)
+        return
+
+    # Shared by all stores: batches are sent without waiting, each store is flushed
+    # once at the end
+    uploader = BatchUploader(
+        batch_size=s.upload_batch_size,
+        parallel=s.upload_parallel,
+        max_retries=s.upload_max_retries,
+    )
+    client = client_from_settings(s)
+    hybrid = s.storage_mode == "hybrid"
+    if hybrid:
+        store = QdrantHybridStore(
+            s.qdrant_url, collection_name=s.hybrid_collection, uploader=uploader, client=client
+        )
+    else:
+        vs = QdrantVectorStore(s.qdrant_url, uploader=uploader, client=client)
+        bm25_client = BM25QdrantClient(s.qdrant_url, uploader=uploader, client=client)
     emb = FastEmbedEmbeddings(s.embedding_model)
+    cache = (
+        DiskEmbeddingCache(s.embedding_cache_dir, s.embedding_model)
+        if s.embedding_cache_dir
+        else None
+    )
 
     # Process FAQ prepared data
-    faq_path = Path("data/prepared/faq_prepared.json")
     if faq_path.exists():
         print(f"Processing FAQ prepared data: {faq_path}")
 
@@ -29,54 +292,51 @@ def main() -> None:
 
         print(f"Found {len(faq_data)} FAQ items")
 
+        # Compare per-item content hashes with the previous run
+        manifest_path = Path(s.ingest_manifest_path)
+        manifest = load_manifest(manifest_path)
+        hashes = {item["id"]: item_hash(item) for item in faq_data}
+        previous = manifest.get("items", {})
+        collections = (
+            [store.collection_name] if hybrid else [vs.collection_name, bm25_client.collection_name]
+        )
+        delta, changed, removed = plan_ingest(
+            hashes,
+            manifest,
+            collection_counts(client, collections),
+            s.embedding_model,
+            s.storage_mode,
+            full=args.full,
+        )
+        print(
+            f"{'Delta' if delta else 'Full'} ingest: {len(changed)} new/changed, "
+            f"{len(hashes) - len(changed)} unchanged, {len(removed)} removed"
+        )
+
         # Prepare documents for both dense and sparse vectors
         dense_documents = []
         bm25_documents = []
+        sparse_texts = []  # hybrid mode: one BM25 text per FAQ item
 
         for item in faq_data:
+            if item["id"] not in changed:
+                continue
+
             # Create text for dense vectors (question + answer)
-            text_content = f"Q: {item['original_question']}\nA: {item['answer']}"
+            text_content = dense_text(item)
 
             # Create metadata
-            metadata = {
-                "source_id": item["id"],
-                "section": item["section"],
-                "original_question": item["original_question"],
-                "answer": item["answer"],
-                "generated_questions": item["generated_questions"],
-                "lang": "en",
-                "created_at": datetime.now(UTC).isoformat(),
-            }
+            metadata = item_metadata(item)
 
             # For dense vectors
             dense_documents.append({"text": text_content, "metadata": metadata, "id": item["id"]})
 
             # For BM25 - use all questions (original + generated)
-            generated_qs = item["generated_questions"]
-            if isinstance(generated_qs, dict):
-                # If it's a dict, extract the values
-                generated_qs = list(generated_qs.values())
-            elif not isinstance(generated_qs, list):
-                # If it's not a list or dict, make it a list
-                generated_qs = [generated_qs]
-
-            all_questions = [item["original_question"], *generated_qs]
-            for q in all_questions:
-                q_str = str(q)  # Ensure it's a string
-                bm25_documents.append(
-                    {
-                        "text": f"{q_str} {item['answer']}",  # Include answer for better matching
-                        "id": f"{item['id']}_{q_str[:20]}",  # Unique ID for each question
-                        "original_id": item["id"],
-                        "question": q_str,
-                        "answer": item["answer"],
-                        "section": item["section"],
-                        "lang": "en",
-                    }
-                )
+            sparse_texts.append(" ".join([*item_questions(item), item["answer"]]))
+            bm25_documents.extend(bm25_documents_for(item))
 
         # Create document metadata for dense vectors
-        meta_doc = {
+        meta_doc: dict[str, Any] = {
             "source_id": "faq_prepared",
             "title": "Fantasy Football Scout FAQ (Prepared)",
             "uri": str(faq_path),
@@ -87,27 +347,111 @@ def main() -> None:
         }
 
         # Upsert document for dense vectors
-        doc_id = vs.upsert_document(meta_doc)
+        doc_id: str = meta_doc["source_id"] if hybrid else vs.upsert_document(meta_doc)
+
+        # Remove deleted items; changed items may have fewer BM25 variants than before,
+        # so their old variants are dropped too before re-inserting
+        if hybrid:
+            store.delete_sources(removed)
+        else:
+            vs.delete_sources(removed)
+            bm25_client.delete_sources(removed + sorted(changed & set(previous)))
 
         # Prepare texts and metadata for dense vector storage
         texts = [doc["text"] for doc in dense_documents]
         metas = [doc["metadata"] for doc in dense_documents]
 
-        # Generate embeddings for dense vectors
-        print("Generating embeddings for dense vectors...")
-        vecs = emb.encode(texts)
+        # Generate embeddings block by block and insert each block as soon as it is
+        # ready, so only one batch of vectors is held in memory at a time
+        print(
+            f"Generating and inserting embeddings "
+            f"(batch_size={s.ingest_batch_size}, parallel={s.ingest_parallel})..."
+        )
+        # Unchanged texts are read from the on-disk embedding cache
+        blocks = (
+            cache.encode_batches(
+                emb, texts, batch_size=s.ingest_batch_size, parallel=s.ingest_parallel
+            )
+            if cache is not None
+            else emb.encode_batches(
+                texts, batch_size=s.ingest_batch_size, parallel=s.ingest_parallel
+            )
+        )
+        start = 0
+        for vecs in blocks:
+            end = start + len(vecs)
+            if hybrid:
+                # One point per FAQ item carrying both the dense and the BM25 vector
+                store.insert_items(
+                    doc_id,
+                    texts[start:end],
+                    sparse_texts[start:end],
+                    metas[start:end],
+                    vecs,
+                    wait=False,
+                )
+            else:
+                vs.insert_chunks(
+                    doc_id, texts[start:end], metas[start:end], vecs, start_ix=start, wait=False
+                )
+            start = end
+
+        if hybrid:
+            store.flush()
+            print(f"Successfully processed {len(faq_data)} FAQ items")
+            print(f"Upserted {len(dense_documents)} hybrid points")
+        else:
+            # Insert documents into BM25 collection
+            print("Inserting documents into BM25 collection...")
+            bm25_client.upsert_documents(bm25_documents, wait=False)
+            vs.flush()
+            bm25_client.flush()
 
-        # Insert chunks into dense vector store
-        print("Inserting chunks into dense vector store...")
-        vs.insert_chunks(doc_id, texts, metas, vecs)
+            print(f"Successfully processed {len(faq_data)} FAQ items")
+            print(f"Upserted {len(dense_documents)} dense vectors")
+            print(f"Upserted {len(bm25_documents)} BM25 documents")
+        print(f"Deleted {len(removed)} removed items")
+        if not delta:
+            # Points of items no longer in the corpus, or written under an older ID
+            # scheme, are not overwritten by a full ingest
+            pruned = prune_stale_points(client, collections, faq_data, hybrid)
+            print(f"Pruned stale points: {pruned}")
+        if not hybrid and s.dense_backend == "numpy":
+            build_numpy_index(s, emb, cache, faq_data)
+        if not hybrid and s.sparse_backend == "local":
+            documents = [doc for item in faq_data for doc in bm25_documents_for(item)]
+            index = LocalBM25Index.build(s.sparse_index_dir, documents)
+            print(
+                f"Built local BM25 index at {index.path}: {index.matrix.shape[0]} documents, "
+                f"{index.matrix.shape[1]} terms"
+            )
+        if is_late_interaction_model(s.reranker_model):
+            build_token_index(s, faq_data)
+        upload = uploader.stats()
+        print(
+            f"Uploaded {upload['points']} points in {upload['seconds']:.1f}s "
+            f"({upload['points_per_sec']:.0f} points/s)"
+        )
 
-        # Insert documents into BM25 collection
-        print("Inserting documents into BM25 collection...")
-        bm25_client.upsert_documents(bm25_documents)
+        save_manifest(
+            manifest_path,
+            {
+                "file_hash": meta_doc["hash"],
+                "embedding_model": s.embedding_model,
+                "storage_mode": s.storage_mode,
+                "created_at": meta_doc["created_at"],
+                "items": hashes,
+                # Checked by the next run: a wiped Qdrant volume leaves this file behind
+                "points": collection_counts(client, collections),
+            },
+        )
 
-        print(f"Successfully processed {len(faq_data)} FAQ items")
-        print(f"Created {len(dense_documents)} dense vectors")
-        print(f"Created {len(bm25_documents)} BM25 documents")
+        if cache is not None:
+            stats = cache.stats()
+            print(
+                f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries"
+            )
     else:
         print(f"FAQ prepared file not found: {faq_path}")
 
@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import json
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from src.rag_core.config import Settings
+from src.rag_core.generation import (
+    OpenRouterClient,
+    OpenRouterLLM,
+    build_json_prompt,
+    load_precomputed,
+    validate_answer,
+)
+from src.workers.ingest import dense_text, item_hash
+
+
+def item_source_id(item: dict) -> str:
+    """Source ID retrieval hits carry for a FAQ item."""
+    return f"{item['id']}#0"
+
+
+def item_prompt(item: dict) -> str:
+    """Answer prompt for a FAQ item's original question, with the item as the only context."""
+    return build_json_prompt(
+        item["original_question"], [(dense_text(item), {"source_id": item_source_id(item)}, 1.0)]
+    )
+
+
+async def _generate(llm: Any, prompt: str) -> str:
+    if hasattr(llm, "agenerate"):
+        return await llm.agenerate(prompt)
+    return await asyncio.to_thread(llm.generate, prompt)
+
+
+async def precompute_answers(
+    faq_data: list[dict],
+    llm: Any,
+    path: Path,
+    model: str = "",
+    concurrency: int = 8,
+    max_attempts: int = 2,
+    min_confidence: float = 0.5,
+    full: bool = False,
+) -> dict[str, int]:
+    """Generate, validate and store an answer for every FAQ item.
+
+    Each validated answer is appended to ``path`` as soon as it is ready, so an
+    interrupted run resumes where it stopped: items whose stored answer was
+    generated from the same item content and model are skipped. At the end the
+    file is rewritten with one entry per current item.
+
+    Args:
+        faq_data: Prepared FAQ items
+        llm: Object with ``agenerate(prompt)`` (or ``generate``) returning answer JSON
+        path: Precomputed answer file (JSON lines)
+        model: LLM model name recorded with each answer
+        concurrency: LLM calls in flight at once
+        max_attempts: Generations per item before it is left for the next run
+        min_confidence: Lowest model confidence accepted
+        full: Regenerate every item
+
+    Returns:
+        Counts of generated, skipped and failed items
+    """
+    existing = {} if full else load_precomputed(path)
+    todo = []
+    for item in faq_data:
+        entry = existing.get(item_source_id(item))
+        if entry and entry.get("item_hash") == item_hash(item) and entry.get("model") == model:
+            continue
+        todo.append(item)
+    print(f"Precomputing {len(todo)} answers, {len(faq_data) - len(todo)} up to date")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    counts = {"generated": 0, "skipped": len(faq_data) - len(todo), "failed": 0}
+
+    with open(path, "a", encoding="utf-8") as out:
+
+        async def run(item: dict) -> None:
+            source_id = item_source_id(item)
+            prompt = item_prompt(item)
+            async with semaphore:
+                for attempt in range(1, max_attempts + 1):
+                    t0 = time.perf_counter()
+                    raw = await _generate(llm, prompt)
+                    latency = time.perf_counter() - t0
+                    try:
+                        answer = validate_answer(raw, source_id, min_confidence)
+                        break
+                    except ValueError as e:
+                        print(f"Invalid answer for {source_id} (attempt {attempt}): {e}")
+                else:
+                    counts["failed"] += 1
+                    return
+            entry = {
+                "source_id": source_id,
+                "item_hash": item_hash(item),
+                "model": model,
+                "answer": answer,
+                "latency": latency,
+                "created_at": datetime.now(UTC).isoformat(),
+            }
+            out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            out.flush()
+            counts["generated"] += 1
+
+        await asyncio.gather(*(run(item) for item in todo))
+
+    compact_precomputed(path, {item_source_id(item) for item in faq_data})
+    return counts
+
+
+def compact_precomputed(path: Path, source_ids: set[str]) -> None:
+    """Atomically rewrite the answer file with the latest entry per current item."""
+    entries = load_precomputed(path)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for source_id, entry in entries.items():
+            if source_id in source_ids:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    tmp.replace(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute answers for every FAQ item")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Regenerate every answer instead of only missing/outdated ones",
+    )
+    args = parser.parse_args()
+
+    s = Settings()
+    if not s.openrouter_api_key:
+        raise SystemExit("RAG_OPENROUTER_API_KEY not set in .env file.")
+    faq_path = Path("data/prepared/faq_prepared.json")
+    with open(faq_path, encoding="utf-8") as f:
+        faq_data = json.load(f)
+    print(f"Found {len(faq_data)} FAQ items")
+
+    client = OpenRouterClient.from_settings(s)
+    llm = OpenRouterLLM(s.openrouter_model, client=client)
+
+    async def run() -> dict[str, int]:
+        try:
+            return await precompute_answers(
+                faq_data,
+                llm,
+                Path(s.precomputed_answers_path),
+                model=s.openrouter_model,
+                concurrency=s.openrouter_max_concurrency,
+                full=args.full,
+            )
+        finally:
+            await client.aclose()
+
+    counts = asyncio.run(run())
+    print(
+        f"Precomputed answers: {counts['generated']} generated, {counts['skipped']} up to date, "
+        f"{counts['failed']} failed (retried on the next run)"
+    )
+
+
+if __name__ == "__main__":
+    main()
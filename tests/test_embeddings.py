@@ -0,0 +1,184 @@
+"""Tests for embedding front-ends (no model download required)"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+import pytest
+
+from src.rag_core.embeddings import (
+    BatchingEmbedder,
+    CachedEmbeddings,
+    DiskEmbeddingCache,
+    FastEmbedEmbeddings,
+    QueryEmbeddingCache,
+)
+
+
+class _FakeEmbedder:
+    """Deterministic embedder: vector is [len(text), 1, 0, ...]."""
+
+    model_name = "fake"
+
+    def __init__(self, dim: int = 4) -> None:
+        self.dim = dim
+        self.batches: list[int] = []
+        self._lock = threading.Lock()
+
+    def encode(self, texts: str | list[str], normalize: bool = True, **_: Any) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        with self._lock:
+            self.batches.append(len(texts))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        out[:, 0] = [len(t) for t in texts]
+        out[:, 1] = 1.0
+        return out
+
+    def encode_one(self, text: str, normalize: bool = True, **kwargs: Any) -> np.ndarray:
+        return self.encode(text, normalize=normalize, **kwargs)[0]
+
+
+def test_batching_embedder_coalesces_concurrent_calls() -> None:
+    """Concurrent encode_one calls share batches and each caller gets its own row."""
+    inner = _FakeEmbedder()
+    emb = BatchingEmbedder(inner, max_batch=16, window_ms=50)
+    texts = ["x" * n for n in range(1, 17)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        vecs = list(pool.map(emb.encode_one, texts))
+
+    assert [int(v[0]) for v in vecs] == list(range(1, 17))
+    assert len(inner.batches) < len(texts)
+    assert sum(inner.batches) == len(texts)
+
+
+class _ShortEmbedder(_FakeEmbedder):
+    """Embedder whose first batch comes back one row short."""
+
+    def encode(self, texts: str | list[str], normalize: bool = True, **_: Any) -> np.ndarray:
+        out = super().encode(texts, normalize=normalize)
+        return out[:-1] if len(self.batches) == 1 else out
+
+
+def test_batching_embedder_survives_bad_batch() -> None:
+    """A malformed batch fails its callers, and the worker keeps serving later calls."""
+    emb = BatchingEmbedder(_ShortEmbedder(), max_batch=4, window_ms=1)
+
+    with pytest.raises(ValueError, match="0 rows for 1 texts"):
+        emb.encode_one("first")
+
+    assert int(emb.encode_one("second")[0]) == len("second")
+
+
+def test_query_cache_normalizes_and_evicts() -> None:
+    """Repeated queries hit the cache regardless of case/punctuation; LRU bounds size."""
+    inner = _FakeEmbedder()
+    emb = CachedEmbeddings(inner, QueryEmbeddingCache(capacity=2))
+
+    first = emb.encode_one("How much is Premium?")
+    again = emb.encode_one("  how much is premium ")
+    assert np.array_equal(first, again)
+    assert len(inner.batches) == 1
+
+    emb.encode_one("second question")
+    emb.encode_one("third question")  # evicts "how much is premium"
+    assert len(emb.cache) == 2
+    emb.encode_one("How much is Premium?")
+    assert len(inner.batches) == 4
+
+
+class _FakeTextEmbedding:
+    """Stand-in for fastembed.TextEmbedding yielding unnormalized rows."""
+
+    embedding_size = 3
+
+    def embed(self, texts: Any, batch_size: int = 256, **_: Any) -> Any:
+        for t in texts:
+            yield np.array([len(t), 0.0, 0.0])
+
+
+def _fastembed_stub() -> FastEmbedEmbeddings:
+    emb = FastEmbedEmbeddings.__new__(FastEmbedEmbeddings)
+    emb.model_name = "fake"
+    emb.model = _FakeTextEmbedding()
+    return emb
+
+
+def test_encode_batches_yields_normalized_blocks(tmp_path: Any) -> None:
+    """Blocks are bounded by batch_size and encode_into fills a memory-mapped matrix."""
+    emb = _fastembed_stub()
+    texts = ["a" * n for n in range(1, 8)]
+
+    blocks = list(emb.encode_batches(texts, batch_size=3))
+    assert [len(b) for b in blocks] == [3, 3, 1]
+    assert all(b.dtype == np.float32 for b in blocks)
+    assert np.allclose(np.vstack(blocks)[:, 0], 1.0, atol=1e-6)
+
+    out = emb.encode_into(texts, batch_size=3, mmap_path=tmp_path / "vecs.npy")
+    assert isinstance(out, np.memmap)
+    assert np.array_equal(np.load(tmp_path / "vecs.npy"), np.vstack(blocks))
+
+
+def test_disk_cache_only_embeds_new_texts(tmp_path: Any) -> None:
+    """A re-run reads unchanged texts from disk; compaction drops unreferenced ones."""
+    emb = _fastembed_stub()
+    calls: list[list[str]] = []
+    embed = emb.model.embed
+
+    def counting_embed(texts: Any, **kwargs: Any) -> Any:
+        texts = list(texts)
+        calls.append(texts)
+        return embed(texts, **kwargs)
+
+    emb.model.embed = counting_embed
+
+    cache = DiskEmbeddingCache(tmp_path, "fake")
+    first = np.vstack(list(cache.encode_batches(emb, ["a", "bb", "ccc"], batch_size=2)))
+    assert calls == [["a", "bb", "ccc"]]
+
+    cache = DiskEmbeddingCache(tmp_path, "fake")  # reopen from disk
+    second = np.vstack(list(cache.encode_batches(emb, ["a", "bb", "dddd"], batch_size=2)))
+    assert calls[-1] == ["dddd"]
+    assert np.array_equal(first[:2], second[:2])
+    assert cache.stats()["hits"] == 2
+
+    assert cache.compact(["a", "dddd"]) == (2, 2)
+    assert "a" in cache and "bb" not in cache
+
+
+class _LengthTextEmbedding(_FakeTextEmbedding):
+    """Rows that differ per text length even after normalization."""
+
+    def embed(self, texts: Any, batch_size: int = 256, **_: Any) -> Any:
+        for t in texts:
+            yield np.array([len(t), 1.0, 0.0])
+
+
+def test_disk_cache_appends_segments_without_rewriting(tmp_path: Any) -> None:
+    """Appends add a segment of the new rows only; small tail segments get merged."""
+    emb = _fastembed_stub()
+    emb.model = _LengthTextEmbedding()
+    texts = ["x" * n for n in range(1, 9)]
+
+    cache = DiskEmbeddingCache(tmp_path, "fake")
+    list(cache.encode_batches(emb, texts[:4]))
+    first = cache.path / "seg-000000.vectors.npy"
+    mtime = first.stat().st_mtime_ns
+
+    list(cache.encode_batches(emb, texts[:5]))
+    assert cache.segments == 2
+    list(cache.encode_batches(emb, texts[:6]))  # sizes 4, 1, 1 -> 4, 2
+    assert cache.segments == 2
+    assert first.stat().st_mtime_ns == mtime
+
+    cache = DiskEmbeddingCache(tmp_path, "fake")
+    expected = np.vstack(list(emb.encode_batches(texts, batch_size=3)))
+    got = np.vstack(list(cache.encode_batches(emb, texts, batch_size=3)))
+    assert np.array_equal(got, expected)
+    assert cache.stats()["hits"] == 6
+
+    assert cache.compact(texts) == (8, 0)
+    assert cache.segments == 1
+    assert np.array_equal(np.vstack(list(cache.encode_batches(emb, texts))), expected)
@@ -0,0 +1,289 @@
+"""Tests for the OpenRouter client, token streaming and answer precomputation against
+local stub servers"""
+
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from src.api.deps import get_rag
+from src.api.routes import query
+from src.rag_core.generation import (
+    Generator,
+    OpenRouterClient,
+    OpenRouterError,
+    OpenRouterLLM,
+    PrecomputedAnswers,
+    load_precomputed,
+)
+from src.rag_core.pipeline import SimpleRAG
+from src.workers.precompute_answers import precompute_answers
+
+TTFT_COUNT = "rag_llm_time_to_first_token_seconds_count"
+DELTAS = ['{"answer": ', '"Reset it in ', 'settings", ', '"citations": [], "confidence": 0.9}']
+
+
+def _chunk(delta: str) -> dict[str, Any]:
+    return {
+        "object": "chat.completion.chunk",
+        "choices": [{"index": 0, "delta": {"content": delta}}],
+    }
+
+
+class _StubSSEHandler(BaseHTTPRequestHandler):
+    """Chat completions endpoint streaming DELTAS; holds back all but the first delta
+    until the server's ``release`` event is set."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, text: str) -> None:
+        body = text.encode()
+        self.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self) -> None:
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(request)  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._send(": OPENROUTER PROCESSING\n\n")
+        self._send(f"data: {json.dumps(_chunk(DELTAS[0]))}\n\n")
+        self.server.release.wait(5)  # type: ignore[attr-defined]
+        for delta in DELTAS[1:]:
+            self._send(f"data: {json.dumps(_chunk(delta))}\n\n")
+        usage = {"choices": [], "usage": {"completion_tokens": 12}}
+        self._send(f"data: {json.dumps(usage)}\n\ndata: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """Non-streaming endpoint answering with the server's scripted statuses, then 200,
+    and its ``content`` as the completion."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        server: Any = self.server
+        self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.requests.append(self.path)
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            status = server.statuses.pop(0) if server.statuses else 200
+        time.sleep(server.delay)
+        with server.lock:
+            server.active -= 1
+        body = json.dumps({"choices": [{"message": {"content": server.content}}]}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+def _serve(handler: type[BaseHTTPRequestHandler]) -> Any:
+    server: Any = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.requests = []
+    server.release = threading.Event()
+    server.statuses = []
+    server.delay = 0.0
+    server.content = '{"answer": "ok"}'
+    server.lock = threading.Lock()
+    server.active = server.peak = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stub_server() -> Iterator[ThreadingHTTPServer]:
+    server = _serve(_StubSSEHandler)
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def scripted_server() -> Iterator[Any]:
+    server = _serve(_ScriptedHandler)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server: Any, **options: Any) -> OpenRouterClient:
+    api_key = "test-key"
+    return OpenRouterClient(
+        api_key=api_key, base_url=f"http://127.0.0.1:{server.server_address[1]}", **options
+    )
+
+
+def test_client_retries_rate_limits(scripted_server: Any) -> None:
+    """429 and 5xx are retried on the pooled connection; the call then succeeds."""
+    scripted_server.statuses = [429, 503]
+    client = _client(scripted_server, max_retries=3)
+
+    response = client.chat("question", "stub/model")
+
+    assert response["choices"][0]["message"]["content"] == '{"answer": "ok"}'
+    assert scripted_server.requests == ["/chat/completions"] * 3
+
+
+def test_client_does_not_retry_client_errors(scripted_server: Any) -> None:
+    scripted_server.statuses = [400]
+
+    with pytest.raises(OpenRouterError) as error:
+        _client(scripted_server).chat("question", "stub/model")
+
+    assert error.value.status_code == 400
+    assert len(scripted_server.requests) == 1
+
+
+def test_client_deadline_bounds_the_call(scripted_server: Any) -> None:
+    """A slow server fails the call at the deadline, retries included."""
+    scripted_server.delay = 1.0
+    client = _client(scripted_server, timeout=10.0, deadline=0.3)
+
+    t0 = time.perf_counter()
+    with pytest.raises(httpx.TimeoutException):
+        client.chat("question", "stub/model")
+    assert time.perf_counter() - t0 < 0.9
+
+
+def test_async_client_limits_concurrency(scripted_server: Any) -> None:
+    scripted_server.delay = 0.05
+    client = _client(scripted_server, max_concurrency=2)
+
+    async def run() -> list[dict[str, Any]]:
+        try:
+            return await asyncio.gather(*(client.achat(f"q{i}", "stub/model") for i in range(6)))
+        finally:
+            await client.aclose()
+
+    assert len(asyncio.run(run())) == 6
+    assert scripted_server.peak == 2
+
+
+def _llm(server: ThreadingHTTPServer) -> OpenRouterLLM:
+    api_key = "test-key"
+    return OpenRouterLLM(
+        "stub/model", base_url=f"http://127.0.0.1:{server.server_address[1]}/", api_key=api_key
+    )
+
+
+def test_stream_yields_deltas_as_they_arrive(stub_server: ThreadingHTTPServer) -> None:
+    """The first delta is available while the server still holds back the rest."""
+    observed = REGISTRY.get_sample_value(TTFT_COUNT) or 0.0
+    stream = _llm(stub_server).stream("question")
+
+    assert next(stream) == DELTAS[0]
+    stub_server.release.set()  # type: ignore[attr-defined]
+    assert [DELTAS[0], *stream] == DELTAS
+    assert stub_server.requests[0]["stream"] is True  # type: ignore[attr-defined]
+    assert REGISTRY.get_sample_value(TTFT_COUNT) == observed + 1
+
+
+def test_ask_stream_forwards_llm_deltas(stub_server: ThreadingHTTPServer) -> None:
+    """/v1/ask with stream=true emits one SSE event per LLM delta."""
+    stub_server.release.set()  # type: ignore[attr-defined]
+    rag = SimpleRAG(_NoEmbedder(), None, Generator(None, _llm(stub_server)))
+    app = FastAPI()
+    app.include_router(query.router)
+    app.dependency_overrides[get_rag] = lambda: rag
+
+    response = TestClient(app).post("/v1/ask", json={"query": "how?", "stream": True})
+
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert [event["delta"] for event in events] == DELTAS
+    assert json.loads("".join(DELTAS))["answer"] == "Reset it in settings"
+
+
+class _NoEmbedder:
+    def encode_one(self, text: str) -> list[float]:
+        return [1.0]
+
+
+def _faq(n: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": f"faq_{i}",
+            "section": "Transfers",
+            "original_question": f"Question {i}?",
+            "answer": f"Answer {i}.",
+            "generated_questions": [f"Variant {i}?"],
+        }
+        for i in range(n)
+    ]
+
+
+def _precompute(llm: OpenRouterLLM, *args: Any, **options: Any) -> dict[str, int]:
+    """One precompute run in its own event loop (closing the async pool after it)."""
+
+    async def run() -> dict[str, int]:
+        try:
+            return await precompute_answers(*args, llm=llm, **options)
+        finally:
+            await llm.client.aclose()
+
+    return asyncio.run(run())
+
+
+def test_precompute_answers_is_resumable(scripted_server: Any, tmp_path: Path) -> None:
+    """Only missing or changed items are sent to the LLM on a re-run."""
+    scripted_server.content = '{"answer": "See the FAQ", "citations": [], "confidence": 0.9}'
+    client = _client(scripted_server, max_concurrency=2)
+    llm = OpenRouterLLM("stub/model", client=client)
+    path = tmp_path / "precomputed.jsonl"
+    faq = _faq(4)
+
+    counts = _precompute(llm, faq[:3], path=path, model="stub/model")
+    assert counts == {"generated": 3, "skipped": 0, "failed": 0}
+
+    faq[0]["answer"] = "Changed."
+    counts = _precompute(llm, faq, path=path, model="stub/model")
+    assert counts == {"generated": 2, "skipped": 2, "failed": 0}
+    assert len(scripted_server.requests) == 5
+
+    entries = load_precomputed(path)
+    assert sorted(entries) == [f"faq_{i}#0" for i in range(4)]
+    assert entries["faq_1#0"]["answer"] == {
+        "answer": "See the FAQ",
+        "citations": ["faq_1#0"],
+        "confidence": 0.9,
+    }
+    assert len(path.read_text().splitlines()) == 4
+
+
+def test_precompute_answers_rejects_invalid_answers(scripted_server: Any, tmp_path: Path) -> None:
+    """Answers citing other sources (or not JSON) are retried, then left for the next run."""
+    scripted_server.content = '{"answer": "x", "citations": ["faq_9#0"], "confidence": 0.9}'
+    llm = OpenRouterLLM("stub/model", client=_client(scripted_server))
+    path = tmp_path / "precomputed.jsonl"
+
+    counts = _precompute(llm, _faq(1), path=path, max_attempts=2)
+
+    assert counts == {"generated": 0, "skipped": 0, "failed": 1}
+    assert len(scripted_server.requests) == 2
+    assert len(PrecomputedAnswers(path)) == 0
@@ -1,7 +1,96 @@
 """Test script to verify ingestion works correctly"""
 
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance,
+    PointStruct,
+    SparseVector,
+    SparseVectorParams,
+    VectorParams,
+)
+
 from src.rag_core.config import Settings
-from src.rag_core.storage import BM25QdrantClient, QdrantVectorStore
+from src.rag_core.storage import BM25QdrantClient, QdrantVectorStore, point_id
+from src.workers.ingest import collection_counts, plan_ingest, prune_stale_points
+
+MANIFEST = {
+    "embedding_model": "emb",
+    "storage_mode": "split",
+    "items": {"a": "h1", "b": "h2", "c": "h3"},
+    "points": {"documents": 3, "bm25_documents": 9},
+}
+INTACT = {"documents": 3, "bm25_documents": 9}
+
+
+def test_delta_ingest_of_new_changed_and_deleted_items() -> None:
+    hashes = {"a": "h1", "b": "h2-changed", "d": "h4"}
+
+    delta, changed, removed = plan_ingest(hashes, MANIFEST, INTACT, "emb", "split")
+
+    assert delta
+    assert changed == {"b", "d"}
+    assert removed == ["c"]
+
+
+def test_stale_manifest_falls_back_to_full_ingest() -> None:
+    """Wiped or missing collections, another model, or --full ingest everything."""
+    hashes = {"a": "h1", "b": "h2", "c": "h3"}
+    stale_counts = [
+        {"documents": 0, "bm25_documents": 0},
+        {"documents": None, "bm25_documents": 9},
+        {"documents": 3, "bm25_documents": 8},
+    ]
+    for counts in stale_counts:
+        assert plan_ingest(hashes, MANIFEST, counts, "emb", "split") == (False, set(hashes), [])
+    assert not plan_ingest(hashes, MANIFEST, INTACT, "other", "split")[0]
+    assert not plan_ingest(hashes, MANIFEST, INTACT, "emb", "split", full=True)[0]
+    assert not plan_ingest(hashes, {**MANIFEST, "points": {}}, INTACT, "emb", "split")[0]
+    assert plan_ingest(hashes, MANIFEST, INTACT, "emb", "split") == (True, set(), [])
+
+
+def test_collection_counts() -> None:
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "documents", vectors_config=VectorParams(size=2, distance=Distance.DOT)
+    )
+    client.upsert("documents", points=[PointStruct(id=i, vector=[1.0, 0.0]) for i in range(3)])
+
+    assert collection_counts(client, ["documents", "bm25_documents"]) == {
+        "documents": 3,
+        "bm25_documents": None,
+    }
+
+
+def test_full_ingest_prunes_legacy_and_removed_points() -> None:
+    """Loop-index integer IDs and removed items are deleted; current points stay."""
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "documents", vectors_config=VectorParams(size=2, distance=Distance.DOT)
+    )
+    client.create_collection("bm25_documents", sparse_vectors_config={"bm25": SparseVectorParams()})
+    faq_data = [{"id": "a", "original_question": "q", "generated_questions": ["g1", "g2"]}]
+    current = {point_id("a")}
+    variants = {point_id("a", i) for i in range(3)}
+    sparse = {"bm25": SparseVector(indices=[1], values=[1.0])}
+    client.upsert(
+        "documents",
+        points=[
+            *(PointStruct(id=i, vector=[1.0, 0.0]) for i in range(3)),
+            PointStruct(id=point_id("removed"), vector=[1.0, 0.0]),
+            *(PointStruct(id=pid, vector=[0.0, 1.0]) for pid in current),
+        ],
+    )
+    client.upsert(
+        "bm25_documents",
+        points=[PointStruct(id=i, vector=sparse) for i in range(5)]
+        + [PointStruct(id=pid, vector=sparse) for pid in variants],
+    )
+
+    pruned = prune_stale_points(client, ["documents", "bm25_documents"], faq_data, hybrid=False)
+
+    assert pruned == {"documents": 4, "bm25_documents": 5}
+    assert {str(p.id) for p in client.scroll("documents")[0]} == current
+    assert {str(p.id) for p in client.scroll("bm25_documents")[0]} == variants
 
 
 def test_collections() -> None:
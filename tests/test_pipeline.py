@@ -0,0 +1,489 @@
+"""Tests for batched answering, answer caching, request coalescing, precomputed answers
+and /v1/ask/batch"""
+
+import json
+import threading
+import time
+from typing import Any
+
+import numpy as np
+import redis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from qdrant_client import QdrantClient
+
+from src.api.deps import _CacheVersion, get_rag
+from src.api.routes import query
+from src.rag_core.config import Settings
+from src.rag_core.generation import Generator, PrecomputedAnswers
+from src.rag_core.observability import SemanticAnswerCache, SingleFlight, TwoLevelCache
+from src.rag_core.pipeline import SimpleRAG
+
+
+class _FakeEmbedder:
+    """Embedder stub counting encode calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def encode(self, texts: list[str], **_: Any) -> np.ndarray:
+        self.calls += 1
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    def encode_one(self, text: str) -> np.ndarray:
+        self.calls += 1
+        return np.ones(4, dtype=np.float32)
+
+
+class _FakeRetriever:
+    """Retriever stub answering a batch with one hit per query."""
+
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    def retrieve_many(self, queries: list[str], qvecs: np.ndarray, **_: Any) -> list:
+        self.batches.append(list(queries))
+        return [[(f"doc for {q}", {"source_id": q}, 1.0)] for q in queries]
+
+    def retrieve(self, query: str, qvec: np.ndarray, **_: Any) -> list:
+        self.batches.append([query])
+        return [(f"doc for {query}", {"source_id": query}, 1.0)]
+
+
+class _SlowGenerator:
+    """Generator stub whose latency depends on the question, tracking concurrency."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def generate(self, prompt: str) -> dict[str, Any]:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.2 if "slow" in prompt else 0.01)
+        with self.lock:
+            self.active -= 1
+        return {"answer": prompt[-20:]}
+
+
+def _rag(
+    concurrency: int = 2, answer_cache: SemanticAnswerCache | None = None
+) -> tuple[SimpleRAG, _FakeEmbedder, _FakeRetriever, _SlowGenerator]:
+    emb, retr, gen = _FakeEmbedder(), _FakeRetriever(), _SlowGenerator()
+    rag = SimpleRAG(
+        emb,
+        retr,
+        gen,  # type: ignore[arg-type]
+        llm_concurrency=concurrency,
+        answer_cache=answer_cache,
+    )
+    return rag, emb, retr, gen
+
+
+def test_answer_many_batches_and_yields_in_completion_order() -> None:
+    """One encode and one retrieval for the batch; bounded concurrent LLM calls."""
+    rag, emb, retr, gen = _rag(concurrency=2)
+
+    out = list(rag.answer_many(["slow one", "fast a", "fast b"]))
+
+    assert emb.calls == 1
+    assert retr.batches == [["slow one", "fast a", "fast b"]]
+    assert sorted(i for i, _ in out) == [0, 1, 2]
+    assert out[-1][0] == 0  # the slow question finishes last
+    assert gen.peak == 2
+
+
+def test_ask_batch_streams_ndjson() -> None:
+    """Every question comes back as its own JSON line."""
+    rag, *_ = _rag()
+    app = FastAPI()
+    app.include_router(query.router)
+    app.dependency_overrides[get_rag] = lambda: rag
+
+    response = TestClient(app).post("/v1/ask/batch", json={"queries": ["a", "b"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted((line["index"], line["query"]) for line in lines) == [(0, "a"), (1, "b")]
+
+
+def test_semantic_cache_threshold_and_scope() -> None:
+    """Near-duplicate queries of the same scope hit; others miss."""
+    cache = SemanticAnswerCache(capacity=4, threshold=0.95)
+    cache.put(np.array([1.0, 0.0, 0.0]), {"answer": "a"}, scope="k=6", latency=1.5)
+
+    assert cache.lookup(np.array([0.99, 0.05, 0.0]), scope="k=6") == {"answer": "a"}
+    assert cache.lookup(np.array([0.6, 0.8, 0.0]), scope="k=6") is None
+    assert cache.lookup(np.array([1.0, 0.0, 0.0]), scope="k=3") is None
+
+
+def test_semantic_cache_evicts_lru_and_expired() -> None:
+    """A full cache evicts its least recently used entry; expired entries are dropped."""
+    cache = SemanticAnswerCache(capacity=2, threshold=0.99, ttl=60)
+    a, b, c = np.eye(3)
+    cache.put(a, "a")
+    cache.put(b, "b")
+    cache.lookup(a)  # a is now more recent than b
+    cache.put(c, "c")
+
+    assert cache.lookup(a) == "a"
+    assert cache.lookup(b) is None
+    assert cache.lookup(c) == "c"
+
+    cache._now = lambda: time.time() + 120  # type: ignore[method-assign]
+    assert cache.lookup(a) is None
+    assert len(cache) == 0
+
+
+def test_semantic_cache_reloads_from_qdrant() -> None:
+    """Persisted entries of the same corpus version survive a restart."""
+    client = QdrantClient(":memory:")
+    SemanticAnswerCache(corpus_version="v1", client=client).put(
+        np.array([1.0, 2.0, 3.0]), {"answer": "kept"}, scope="s"
+    )
+
+    assert SemanticAnswerCache(corpus_version="v1", client=client).lookup(
+        np.array([1.0, 2.0, 3.0]), scope="s"
+    ) == {"answer": "kept"}
+    assert len(SemanticAnswerCache(corpus_version="v2", client=client)) == 0
+
+
+def test_semantic_cache_collection_stays_bounded() -> None:
+    """Re-stored answers overwrite their point; evicted and expired points are deleted."""
+    client = QdrantClient(":memory:")
+    cache = SemanticAnswerCache(capacity=2, ttl=60, corpus_version="v1", client=client)
+    a, b, c = np.eye(3)
+    cache.put(a, "a", key="a")
+    cache.put(a, "a again", key="a")
+    cache.put(b, "b", key="b")
+    assert client.count("answer_cache").count == 2
+
+    cache.put(c, "c", key="c")  # evicts a
+    assert client.count("answer_cache").count == 2
+
+    later = SemanticAnswerCache(capacity=2, ttl=60, corpus_version="v1", client=client)
+    later._now = lambda: time.time() + 120  # type: ignore[method-assign]
+    later.put(a, "fresh", key="a")
+    assert client.count("answer_cache").count == 1
+
+
+def test_semantic_cache_loads_most_recent_live_entries() -> None:
+    client = QdrantClient(":memory:")
+    writer = SemanticAnswerCache(capacity=8, ttl=60, corpus_version="v1", client=client)
+    now = time.time()
+    for i, offset in enumerate([-30, 10, 20, 30]):  # the first entry has already expired
+        writer._now = lambda offset=offset: now + offset - 60  # type: ignore[method-assign]
+        writer.put(np.eye(4)[i], str(i), key=str(i))
+
+    reader = SemanticAnswerCache(capacity=2, threshold=0.99, corpus_version="v1", client=client)
+
+    assert [reader.lookup(v) for v in np.eye(4)] == [None, None, "2", "3"]
+
+
+def test_answer_served_from_semantic_cache() -> None:
+    """A repeated question skips retrieval and generation."""
+    rag, _, retr, gen = _rag(answer_cache=SemanticAnswerCache(capacity=8))
+
+    first = rag.answer("how do I reset my password?")
+    second = rag.answer("how do I reset my password?")
+    batch = list(rag.answer_many(["how do I reset my password?"]))
+
+    assert first == second == batch[0][1]
+    assert len(retr.batches) == 1
+    assert gen.peak == 1
+
+
+class _CountingLLM:
+    """LLM stub counting calls; stream pauses after its first delta until released."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = threading.Event()
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        time.sleep(0.2)
+        return json.dumps({"answer": "shared"})
+
+    def stream(self, prompt: str) -> Any:
+        self.calls += 1
+        yield '{"answer": '
+        self.release.wait(5)
+        yield '"shared"}'
+
+
+def test_identical_concurrent_questions_share_one_run() -> None:
+    llm = _CountingLLM()
+    rag = SimpleRAG(
+        _FakeEmbedder(), _FakeRetriever(), Generator(None, llm), coalescer=SingleFlight()
+    )
+    results: list[dict[str, Any]] = []
+
+    threads = [
+        threading.Thread(target=lambda q=q: results.append(rag.answer(q)))
+        for q in ["Reset password?", "  reset PASSWORD? "] * 3
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert llm.calls == 1
+    assert results == [{"answer": "shared"}] * 6
+
+
+def test_stream_follower_joins_in_progress_stream() -> None:
+    """A late subscriber gets the chunks already sent, then the rest live."""
+    llm = _CountingLLM()
+    rag = SimpleRAG(
+        _FakeEmbedder(), _FakeRetriever(), Generator(None, llm), coalescer=SingleFlight()
+    )
+
+    leader = rag.answer_stream("reset password?")
+    first = next(leader)
+    follower = rag.answer_stream("reset password?")
+    joined = next(follower)
+    llm.release.set()
+
+    chunks = [first, *leader]
+    assert [joined, *follower] == chunks
+    assert [json.loads(chunk)["delta"] for chunk in chunks] == ['{"answer": ', '"shared"}']
+    assert llm.calls == 1
+
+
+def test_answer_and_stream_do_not_join_each_other() -> None:
+    """A stream caller never follows an answer flight for the same question, or vice versa."""
+    llm = _CountingLLM()
+    rag = SimpleRAG(
+        _FakeEmbedder(), _FakeRetriever(), Generator(None, llm), coalescer=SingleFlight()
+    )
+
+    stream = rag.answer_stream("reset password?")
+    first = next(stream)
+    answered: list[dict[str, Any]] = []
+    thread = threading.Thread(target=lambda: answered.append(rag.answer("reset password?")))
+    thread.start()
+    thread.join()
+    llm.release.set()
+
+    assert answered == [{"answer": "shared"}]
+    assert [json.loads(chunk)["delta"] for chunk in [first, *stream]] == [
+        '{"answer": ',
+        '"shared"}',
+    ]
+    assert llm.calls == 2
+
+
+def test_singleflight_propagates_errors_to_followers() -> None:
+    flight = SingleFlight()
+    started = threading.Event()
+    errors: list[BaseException] = []
+
+    def fail() -> None:
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    def call() -> None:
+        try:
+            flight.do("key", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    call()
+    leader.join()
+
+    assert len(errors) == 2
+    assert errors[0] is errors[1]
+
+
+class _FakeLockRedis:
+    """Redis stand-in for the producer path of SingleFlight (strings and lists only)."""
+
+    def __init__(self, fail_release: bool = False) -> None:
+        self.values: dict[str, Any] = {}
+        self.fail_release = fail_release
+
+    def set(self, key: str, value: str, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+    def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+    def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        # Compare-and-delete, as the release script does
+        if self.fail_release:
+            raise redis.ConnectionError("connection lost")
+        if self.values.get(key) != token:
+            return 0
+        del self.values[key]
+        return 1
+
+    def rpush(self, key: str, value: str) -> None:
+        self.values.setdefault(key, []).append(value)
+
+    def expire(self, key: str, ttl: int) -> None:
+        pass
+
+    def publish(self, channel: str, message: str) -> None:
+        pass
+
+
+def test_singleflight_keeps_a_lock_taken_over_by_another_producer() -> None:
+    """A producer that outlived its lock must not release the new owner's lock."""
+    fake = _FakeLockRedis()
+    flight = SingleFlight()
+    flight.redis = fake  # type: ignore[assignment]
+    lock = flight._keys("answer:q")[0]
+
+    def slow() -> str:
+        fake.values[lock] = "other-process"  # our lock expired and was taken over
+        return "answer"
+
+    assert flight.do("q", slow) == "answer"
+    assert fake.values[lock] == "other-process"
+
+
+def test_singleflight_survives_redis_failure_after_producing() -> None:
+    """A Redis error while releasing the lock does not fail a produced answer."""
+    flight = SingleFlight()
+    flight.redis = _FakeLockRedis(fail_release=True)  # type: ignore[assignment]
+
+    assert flight.do("q", lambda: "answer") == "answer"
+
+
+def _memory_cache() -> TwoLevelCache:
+    return TwoLevelCache(None, max_memory_items=16)
+
+
+def test_two_level_cache_memory_level_is_thread_safe() -> None:
+    """Concurrent sets and gets evicting from a tiny LRU neither raise nor exceed the bound."""
+    cache = TwoLevelCache(None, max_memory_items=4)
+    errors: list[BaseException] = []
+
+    def hammer(worker: int) -> None:
+        try:
+            for i in range(2000):
+                cache.set(f"{worker}-{i % 16}", i)
+                cache.get(f"{(worker + 1) % 8}-{i % 16}")
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=hammer, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(cache.memory_store) <= 4
+
+
+def test_answer_cache_replays_hits_and_follows_version() -> None:
+    version = ["corpus-1"]
+    llm = _CountingLLM()
+    llm.release.set()
+    rag = SimpleRAG(
+        _FakeEmbedder(),
+        _FakeRetriever(),
+        Generator(None, llm),
+        result_cache=_memory_cache(),
+        cache_version=lambda: version[0],
+    )
+    hits = REGISTRY.get_sample_value("rag_cache_hits_total") or 0.0
+
+    streamed = list(rag.answer_stream("Reset password?"))  # miss: generated and cached
+    answered = rag.answer("  reset PASSWORD? ")
+    replayed = list(rag.answer_stream("reset password?"))
+
+    assert llm.calls == 1
+    assert answered == {"answer": "shared"}
+    assert len(streamed) == 2
+    assert [json.loads(json.loads(chunk)["delta"]) for chunk in replayed] == [answered]
+    assert REGISTRY.get_sample_value("rag_cache_hits_total") == hits + 2
+
+    version[0] = "corpus-2"
+    rag.answer("reset password?")
+    assert llm.calls == 2
+
+
+def test_cache_version_follows_ingest_manifest(tmp_path: Any) -> None:
+    manifest = tmp_path / "manifest.json"
+    s = Settings(ingest_manifest_path=str(manifest), openrouter_api_key="")
+    version = _CacheVersion(s)
+    before = version()
+
+    manifest.write_text(json.dumps({"file_hash": "abc"}))
+
+    assert version() != before
+    assert version().endswith("|abc")
+
+
+class _ScoredRetriever:
+    """Retriever stub returning two hits with the given scores."""
+
+    def __init__(self, top: float, runner_up: float) -> None:
+        self.scores = (top, runner_up)
+
+    def retrieve(self, query: str, qvec: np.ndarray, **_: Any) -> list:
+        return [
+            ("Q: Reset?\nA: In settings.", {"source_id": "faq_1#0"}, self.scores[0]),
+            ("Q: Delete?\nA: Email us.", {"source_id": "faq_2#0"}, self.scores[1]),
+        ]
+
+
+def test_precomputed_answer_needs_a_clear_top_hit(tmp_path: Any) -> None:
+    path = tmp_path / "precomputed.jsonl"
+    answer = {"answer": "In settings.", "citations": ["faq_1#0"], "confidence": 0.9}
+    entries = [
+        {"source_id": "faq_1#0", "item_hash": "h1", "answer": answer, "latency": 1.5},
+        {"source_id": "faq_2#0", "item_hash": "stale", "answer": answer, "latency": 1.5},
+    ]
+    path.write_text("".join(json.dumps(e) + "\n" for e in entries))
+    precomputed = PrecomputedAnswers(path, item_hashes={"faq_1": "h1", "faq_2": "h2"})
+    assert len(precomputed) == 1
+
+    def rag(top: float, runner_up: float) -> tuple[SimpleRAG, _CountingLLM]:
+        llm = _CountingLLM()
+        pipeline = SimpleRAG(
+            _FakeEmbedder(),
+            _ScoredRetriever(top, runner_up),
+            Generator(None, llm),
+            precomputed=precomputed,
+            precomputed_min_score=0.5,
+            precomputed_min_margin=0.3,
+        )
+        return pipeline, llm
+
+    served = REGISTRY.get_sample_value("rag_answers_total", {"source": "precomputed"}) or 0.0
+    saved = REGISTRY.get_sample_value("rag_precomputed_saved_seconds_total") or 0.0
+
+    clear, llm = rag(0.9, 0.2)
+    assert clear.answer("reset?") == answer
+    replayed = list(clear.answer_stream("how to reset?"))
+    assert [json.loads(json.loads(chunk)["delta"]) for chunk in replayed] == [answer]
+    assert llm.calls == 0
+    assert REGISTRY.get_sample_value("rag_answers_total", {"source": "precomputed"}) == served + 2
+    assert REGISTRY.get_sample_value("rag_precomputed_saved_seconds_total") == saved + 3.0
+
+    for top, runner_up in [(0.9, 0.7), (0.4, 0.0)]:
+        close, llm = rag(top, runner_up)
+        close.answer("reset?")
+        assert llm.calls == 1
+
+    # Without thresholds precomputed answers are never served
+    llm = _CountingLLM()
+    SimpleRAG(
+        _FakeEmbedder(), _ScoredRetriever(0.9, 0.2), Generator(None, llm), precomputed=precomputed
+    ).answer("reset?")
+    assert llm.calls == 1
@@ -1,6 +1,23 @@
 """Test script to verify reranker works correctly"""
 
-from src.rag_core.retrieval import CrossEncoderReranker
+import threading
+from typing import Any
+
+import numpy as np
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+from src.rag_core.observability import TwoLevelCache
+from src.rag_core.retrieval import (
+    CrossEncoderReranker,
+    LateInteractionReranker,
+    RerankBatcher,
+    RerankScoreCache,
+)
+from src.rag_core.retrieval.late_interaction import maxsim
+from src.rag_core.retrieval.rerank_batching import limit_sequence_length, pair_lengths
+from src.rag_core.storage import TokenVectorStore
 
 
 def test_reranker() -> bool:
@@ -38,5 +55,214 @@ def test_reranker() -> bool:
     return True
 
 
+class _FakeCrossEncoder:
+    """TextCrossEncoder stub scoring by text length and recording its inputs."""
+
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def rerank_pairs(self, pairs: list[tuple[str, str]], **_: Any) -> list[float]:
+        self.calls.append([doc for _, doc in pairs])
+        return [float(len(doc)) for _, doc in pairs]
+
+
+def test_score_cache_skips_inference_when_warm() -> None:
+    """Only cache misses reach the cross-encoder; a repeated query needs no inference."""
+    reranker = CrossEncoderReranker("fake", score_cache=RerankScoreCache(capacity=8))
+    model = _FakeCrossEncoder()
+    reranker.model = model  # type: ignore[assignment]
+
+    first = reranker.rerank("What does it cost?", [("bb", {}), ("a", {})], return_scores=True)
+    assert [t for t, _, _ in first] == ["bb", "a"]
+    assert model.calls == [["bb", "a"]]
+
+    # Same question after normalization, plus one new document
+    second = reranker.rerank(
+        "what does it COST", [("a", {}), ("ccc", {}), ("bb", {})], return_scores=True
+    )
+    assert [(t, s) for t, _, s in second] == [("ccc", 3.0), ("bb", 2.0), ("a", 1.0)]
+    assert model.calls[1] == ["ccc"]
+
+    reranker.rerank("What does it cost?", [("ccc", {}), ("a", {})])
+    assert len(model.calls) == 2
+
+
+def test_score_cache_evicts_least_recently_used() -> None:
+    """The cache stays within capacity, dropping the oldest pairs first."""
+    cache = RerankScoreCache(capacity=2)
+    cache.put_many({"a": 1.0, "b": 2.0})
+    assert cache.get_many(["a"]) == [1.0]
+    cache.put_many({"c": 3.0})
+
+    assert len(cache) == 2
+    assert cache.get_many(["a", "b", "c"]) == [1.0, None, 3.0]
+
+
+class _FakeRedis:
+    """Dict-backed stand-in for the Redis calls the score cache makes, counting round trips."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+        self.round_trips = 0
+
+    def mget(self, keys: list[str]) -> list[str | None]:
+        self.round_trips += 1
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction: bool = True) -> "_FakeRedis._Pipeline":
+        return self._Pipeline(self)
+
+    class _Pipeline:
+        def __init__(self, redis: "_FakeRedis") -> None:
+            self.redis = redis
+            self.ops: list[tuple[str, str]] = []
+
+        def setex(self, key: str, ttl: int, value: str) -> None:
+            self.ops.append((key, value))
+
+        def execute(self) -> None:
+            self.redis.round_trips += 1
+            self.redis.data.update(self.ops)
+
+
+def test_score_cache_redis_tier_batches_round_trips() -> None:
+    """Local misses are read with one MGET and new scores written in one pipeline."""
+    tier = TwoLevelCache(None, max_memory_items=0)
+    fake = _FakeRedis()
+    tier.redis = fake  # type: ignore[assignment]
+    writer = RerankScoreCache(capacity=8, redis_cache=tier)
+    writer.put_many({"a": 1.0, "b": 2.0, "c": 3.0})
+    assert fake.round_trips == 1
+
+    reader = RerankScoreCache(capacity=8, redis_cache=tier)
+    assert reader.get_many(["a", "x", "c"]) == [1.0, None, 3.0]
+    assert fake.round_trips == 2
+    # Shared hits are kept locally, so only the remaining miss goes to Redis
+    assert reader.get_many(["a", "x"]) == [1.0, None]
+    assert fake.round_trips == 3
+
+
+def test_pairs_are_scored_in_length_buckets() -> None:
+    """Similar-length pairs share a model call; scores come back in input order."""
+    reranker = CrossEncoderReranker("fake", bucket_size=2)
+    model = _FakeCrossEncoder()
+    reranker.model = model  # type: ignore[assignment]
+    docs = ["a b c d e", "a", "a b c d", "a b"]
+
+    out = reranker.rerank("q", [(d, {}) for d in docs], return_scores=True)
+
+    assert model.calls == [["a", "a b"], ["a b c d", "a b c d e"]]
+    assert [t for t, _, _ in out] == ["a b c d e", "a b c d", "a b", "a"]
+
+
+def test_batcher_merges_concurrent_requests() -> None:
+    """Requests arriving within the window are scored in one batch."""
+    model = _FakeCrossEncoder()
+    batcher = RerankBatcher(model, max_pairs=64, window_ms=200.0, bucket_size=64)
+    results: dict[str, Any] = {}
+
+    def ask(query: str, docs: list[str]) -> None:
+        results[query] = list(batcher.score(query, docs))
+
+    threads = [
+        threading.Thread(target=ask, args=("q1", ["aaa", "b"])),
+        threading.Thread(target=ask, args=("q2", ["cc"])),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(model.calls) == 1
+    assert results == {"q1": [3.0, 1.0], "q2": [2.0]}
+
+
+def test_max_seq_len_truncates_pairs() -> None:
+    """The tokenizer limit is lowered to max_seq_len and lengths respect it."""
+    unk, pad = "[UNK]", "[PAD]"
+    vocab = {unk: 0, pad: 1, **{w: i + 2 for i, w in enumerate("abcdef")}}
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token=unk))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.enable_truncation(max_length=512)
+    tokenizer.enable_padding(pad_id=1, pad_token=pad)
+
+    class _Model:
+        model = type("Onnx", (), {"tokenizer": tokenizer})()
+
+    limit_sequence_length(_Model(), 4)
+    lengths = pair_lengths(_Model(), [("a", "b c d e f"), ("a", "b")])
+
+    assert tokenizer.truncation["max_length"] == 4
+    assert list(lengths) == [4, 2]
+
+
+def test_maxsim_matches_per_document_loop() -> None:
+    """Vectorised MaxSim equals summing each query token's best document token."""
+    rng = np.random.default_rng(0)
+    q = rng.standard_normal((3, 8)).astype(np.float32)
+    docs = [rng.standard_normal((n, 8)).astype(np.float32) for n in (4, 1, 7)]
+
+    expected = [float((d @ q.T).max(axis=0).sum()) for d in docs]
+
+    np.testing.assert_allclose(maxsim(q, docs), expected, rtol=1e-5)
+
+
+_WORDS = {"cost": 0, "price": 1, "team": 2, "transfer": 3}
+
+
+class _FakeLateInteraction:
+    """LateInteractionTextEmbedding stub: one token per word, words as basis vectors."""
+
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def _embed(self, text: str) -> np.ndarray:
+        rows = [np.eye(4, dtype=np.float32)[_WORDS[w]] for w in text.split() if w in _WORDS]
+        return np.array(rows or [np.zeros(4, dtype=np.float32)])
+
+    def query_embed(self, queries: list[str]) -> list[np.ndarray]:
+        return [self._embed(q) for q in queries]
+
+    def passage_embed(self, texts: list[str]) -> list[np.ndarray]:
+        self.encoded.extend(texts)
+        return [self._embed(t) for t in texts]
+
+
+def test_late_interaction_uses_precomputed_token_vectors(tmp_path) -> None:
+    """Stored candidates are scored from the store; only unknown ones are encoded."""
+    model = _FakeLateInteraction()
+    store = TokenVectorStore.build(tmp_path, ["a#0"], [model._embed("cost price")])
+    reranker = LateInteractionReranker("fake", store=store)
+    reranker.model = model  # type: ignore[assignment]
+
+    out = reranker.rerank(
+        "cost price",
+        [("team transfer", {"source_id": "b#0"}), ("ignored", {"source_id": "a#0"})],
+        return_scores=True,
+    )
+
+    assert [(m["source_id"], s) for _, m, s in out] == [("a#0", 2.0), ("b#0", 0.0)]
+    assert model.encoded == ["team transfer"]
+
+
+def test_token_store_update_encodes_only_changed_documents(tmp_path) -> None:
+    """Unchanged documents are copied from the previous store; removed ones are dropped."""
+    model = _FakeLateInteraction()
+    encode = model.passage_embed
+
+    TokenVectorStore.update(tmp_path, ["a#0", "b#0"], ["cost price", "team"], encode)
+    store, n = TokenVectorStore.update(
+        tmp_path, ["b#0", "c#0", "a#0"], ["team transfer", "price", "cost price"], encode
+    )
+
+    assert n == 2
+    assert model.encoded == ["cost price", "team", "team transfer", "price"]
+    assert list(store.rows) == ["b#0", "c#0", "a#0"]
+    for key, text in (("a#0", "cost price"), ("b#0", "team transfer"), ("c#0", "price")):
+        assert np.array_equal(store.get(key), model._embed(text))
+    assert np.array_equal(np.load(store.version_path / "tokens.npy"), store.tokens)
+    assert (tmp_path / "CURRENT").read_text() == store.version_path.name
+
+
 if __name__ == "__main__":
     test_reranker()
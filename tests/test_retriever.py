@@ -0,0 +1,225 @@
+"""Tests for HybridRetriever leg fan-out and score fusion"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+import pytest
+
+from src.rag_core.retrieval import FUSION_METHODS, HybridRetriever, fuse
+
+
+class _FakeLeg:
+    """Search stub returning fixed hits after an optional delay."""
+
+    def __init__(self, hits: list[tuple[str, dict, float]], delay: float = 0.0) -> None:
+        self.hits = hits
+        self.delay = delay
+
+    def search(self, *_: Any, **__: Any) -> list[tuple[str, dict, float]]:
+        time.sleep(self.delay)
+        return self.hits
+
+    search_grouped = search
+
+
+def test_legs_run_concurrently() -> None:
+    """Retrieval should cost the slower leg, not the sum of both."""
+    bm25 = _FakeLeg([("a", {}, 2.0)], delay=0.2)
+    vs = _FakeLeg([("b", {}, 0.9)], delay=0.2)
+    retriever = HybridRetriever(bm25=bm25, vs=vs, leg_timeout=5.0)
+
+    t0 = time.perf_counter()
+    hits = retriever.retrieve("q", np.zeros(4, dtype=np.float32), k=5)
+    elapsed = time.perf_counter() - t0
+
+    assert {h[0] for h in hits} == {"a", "b"}
+    assert elapsed < 0.35
+
+
+def test_late_leg_is_dropped() -> None:
+    """A leg that misses its timeout is ignored and the other leg answers alone."""
+    bm25 = _FakeLeg([("a", {}, 2.0)], delay=1.0)
+    vs = _FakeLeg([("b", {}, 0.9)])
+    retriever = HybridRetriever(bm25=bm25, vs=vs, leg_timeout=0.1)
+
+    hits = retriever.retrieve("q", np.zeros(4, dtype=np.float32), k=5)
+
+    assert [h[0] for h in hits] == ["b"]
+
+
+def test_queued_leg_is_not_timed_out() -> None:
+    """Time a leg spends waiting for a pool worker does not count against its timeout."""
+    bm25 = _FakeLeg([("a", {}, 2.0)], delay=0.15)
+    vs = _FakeLeg([("b", {}, 0.9)], delay=0.15)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        retriever = HybridRetriever(bm25=bm25, vs=vs, leg_timeout=0.25, executor=pool)
+        hits = retriever.retrieve("q", np.zeros(4, dtype=np.float32), k=5)
+
+    assert {h[0] for h in hits} == {"a", "b"}
+
+
+class _FakeHybridStore:
+    """Single-collection store stub counting search calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def search(self, *_: Any, **__: Any) -> list[tuple[str, dict, float]]:
+        self.calls += 1
+        return [("a", {}, 0.5), ("b", {}, 0.4)]
+
+
+def test_hybrid_store_single_call() -> None:
+    """In hybrid mode one server-side fused query replaces both legs."""
+    store = _FakeHybridStore()
+    retriever = HybridRetriever(hybrid_store=store)
+
+    hits = retriever.retrieve("q", np.zeros(4, dtype=np.float32), k=1)
+
+    assert store.calls == 1
+    assert [h[0] for h in hits] == ["a"]
+
+
+def test_fusion_merges_legs_by_source_id() -> None:
+    """Hits of the same FAQ item from both legs are fused into one candidate."""
+    bm25 = [
+        ("Q: variant\nA: x", {"source_id": "a#0", "leg": "bm25"}, 8.0),
+        ("Q: other\nA: y", {"source_id": "b#0"}, 4.0),
+    ]
+    dense = [
+        ("Q: orig\nA: x", {"source_id": "a#0", "leg": "dense"}, 0.9),
+        ("Q: third\nA: z", {"source_id": "c#0"}, 0.3),
+    ]
+
+    for method in FUSION_METHODS:
+        fused = fuse([bm25, dense], [0.5, 0.5], method)
+        assert fused[0][1]["source_id"] == "a#0", method
+        assert len(fused) == 3
+        assert fused[0][1]["leg"] == "bm25"  # metadata from the first leg
+
+    rrf = fuse([bm25, dense], [1.0, 1.0], "rrf")
+    assert rrf[0][2] == pytest.approx(2 / 61)
+
+
+def test_fusion_keeps_best_duplicate_and_rejects_unknown_method() -> None:
+    """A candidate repeated within a leg counts once, with its best score."""
+    leg = [
+        ("x", {"source_id": "a#0"}, 1.0),
+        ("y", {"source_id": "b#0"}, 0.5),
+        ("x2", {"source_id": "a#0"}, 0.1),
+    ]
+
+    fused = fuse([leg], [1.0], "max")
+
+    assert [(m["source_id"], s) for _, m, s in fused] == [("a#0", 1.0), ("b#0", 0.5)]
+    with pytest.raises(ValueError):
+        fuse([leg], [1.0], "borda")
+
+
+def test_per_request_fusion_reaches_hybrid_store() -> None:
+    """Server-side fusion methods are forwarded to the hybrid store per request."""
+    seen: list[Any] = []
+
+    class _Store:
+        def search(self, *_: Any, fusion: str | None = None, **__: Any) -> list:
+            seen.append(fusion)
+            return []
+
+    retriever = HybridRetriever(hybrid_store=_Store())
+    retriever.retrieve("q", np.zeros(4, dtype=np.float32), k=1, fusion="dbsf")
+    retriever.retrieve("q", np.zeros(4, dtype=np.float32), k=1, fusion="zscore")
+
+    assert seen == ["dbsf", None]
+
+
+class _CountingLeg(_FakeLeg):
+    """Search stub recording the k each call asked for."""
+
+    def __init__(self, hits: list[tuple[str, dict, float]]) -> None:
+        super().__init__(hits)
+        self.ks: list[int] = []
+
+    def search(self, *_: Any, k: int = 10, **__: Any) -> list[tuple[str, dict, float]]:
+        self.ks.append(k)
+        return self.hits[:k]
+
+    search_grouped = search
+
+
+class _ReverseReranker:
+    """Reranker stub reversing its candidates and recording how many it got."""
+
+    def __init__(self) -> None:
+        self.sizes: list[int] = []
+
+    def rerank(self, _query: str, candidates: list, return_scores: bool = False) -> list:
+        self.sizes.append(len(candidates))
+        return [(t, m, float(i)) for i, (t, m, _) in enumerate(candidates)][::-1]
+
+
+def test_cascade_oversamples_and_reranks_top_n() -> None:
+    """Legs fetch candidate_k, only rerank_top_n reach the reranker, k come back."""
+    hits = [(f"t{i}", {"source_id": f"{i}#0"}, 1.0 - i / 100) for i in range(30)]
+    bm25, vs = _CountingLeg(hits), _CountingLeg(hits)
+    rr = _ReverseReranker()
+    retriever = HybridRetriever(bm25=bm25, vs=vs, reranker=rr, candidate_k=25, rerank_top_n=5)
+
+    out = retriever.retrieve("q", np.zeros(4, dtype=np.float32), k=3)
+
+    assert bm25.ks == vs.ks == [25]
+    assert rr.sizes == [5]
+    assert [h[0] for h in out] == ["t4", "t3", "t2"]
+
+
+def test_early_exit_skips_reranker_on_decisive_top1() -> None:
+    """A fused top-1 far ahead of top-2 is returned without the cross-encoder."""
+    rr = _ReverseReranker()
+    leg = _FakeLeg([("a", {"source_id": "a"}, 1.0), ("b", {"source_id": "b"}, 0.2)])
+    retriever = HybridRetriever(bm25=leg, vs=leg, reranker=rr, early_exit_margin=0.5)
+    assert [h[0] for h in retriever.retrieve("q", np.zeros(4), k=2)] == ["a", "b"]
+    assert rr.sizes == []
+
+    close = _FakeLeg([("a", {"source_id": "a"}, 1.0), ("b", {"source_id": "b"}, 0.9)])
+    retriever = HybridRetriever(bm25=close, vs=close, reranker=rr, early_exit_margin=0.5)
+    retriever.retrieve("q", np.zeros(4), k=2)
+    assert rr.sizes == [2]
+
+
+class _BatchLeg(_CountingLeg):
+    """Search stub with a batch API, recording how often each entry point is used."""
+
+    def __init__(self, hits: list[tuple[str, dict, float]]) -> None:
+        super().__init__(hits)
+        self.batch_calls = 0
+
+    def search_batch(self, queries: Any, k: int = 10, **_: Any) -> list:
+        self.batch_calls += 1
+        return [self.hits[:k] for _ in queries]
+
+
+class _BatchReranker(_ReverseReranker):
+    """Reverse reranker that also reranks many queries in one call."""
+
+    def rerank_many(self, queries: list[str], lists: list, return_scores: bool = False) -> list:
+        self.sizes.append(sum(len(c) for c in lists))
+        return [[(t, m, float(i)) for i, (t, m, _) in enumerate(c)][::-1] for c in lists]
+
+
+def test_retrieve_many_matches_retrieve_with_batched_calls() -> None:
+    """Batched retrieval uses search_batch / rerank_many and matches per-query results."""
+    hits = [(f"t{i}", {"source_id": f"{i}#0"}, 1.0 - i / 100) for i in range(10)]
+    bm25, vs = _BatchLeg(hits), _BatchLeg(hits)
+    retriever = HybridRetriever(
+        bm25=bm25, vs=vs, reranker=_ReverseReranker(), candidate_k=10, rerank_top_n=4
+    )
+    single = retriever.retrieve("q", np.zeros(4), k=3)
+
+    rr = _BatchReranker()
+    retriever.reranker = rr
+    batch = retriever.retrieve_many(["q1", "q2"], np.zeros((2, 4)), k=3)
+
+    assert batch == [single, single]
+    assert bm25.batch_calls == vs.batch_calls == 1
+    assert rr.sizes == [8]  # both queries' top-4 heads in one rerank_many call
@@ -0,0 +1,285 @@
+"""Tests for Qdrant storage helpers (in-memory Qdrant, no server needed)"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance,
+    Document,
+    FieldCondition,
+    Filter,
+    Fusion,
+    FusionQuery,
+    MatchValue,
+    Prefetch,
+    ScoredPoint,
+    VectorParams,
+)
+
+from src.rag_core.storage import (
+    BatchUploader,
+    LocalBM25Index,
+    NumpyVectorStore,
+    QdrantHybridStore,
+    QdrantVectorStore,
+    TokenVectorStore,
+    compile_filter,
+    point_id,
+)
+
+
+def _client(dim: int = 8) -> QdrantClient:
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        "docs", vectors_config=VectorParams(size=dim, distance=Distance.COSINE)
+    )
+    return client
+
+
+def test_uploader_writes_numpy_blocks_in_batches() -> None:
+    """All rows of a NumPy block should land in the collection after the barrier."""
+    client = _client()
+    uploader = BatchUploader(batch_size=4)
+    vecs = np.random.default_rng(0).random((10, 8), dtype=np.float32)
+    ids = [point_id(f"item-{i}") for i in range(10)]
+
+    uploader.upload_vectors(client, "docs", ids, vecs, [{"i": i} for i in range(10)])
+    uploader.barrier(client, "docs")
+
+    assert client.count("docs").count == 10
+    assert uploader.stats()["points"] == 10
+
+
+def test_uploader_retries_failed_upload() -> None:
+    """A transient failure of the whole upload call should be retried."""
+    client = _client()
+    calls = {"n": 0}
+    upload = client.upload_collection
+
+    def flaky(**kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise ConnectionError("connection reset")
+        return upload(**kwargs)
+
+    client.upload_collection = flaky
+    uploader = BatchUploader(batch_size=4, max_retries=3)
+    vecs = np.ones((3, 8), dtype=np.float32)
+
+    uploader.upload_vectors(client, "docs", [point_id(str(i)) for i in range(3)], vecs, [{}] * 3)
+
+    assert calls["n"] == 2
+    assert client.count("docs").count == 3
+
+
+def test_vectorstore_searches_with_numpy_query() -> None:
+    """Dense search should accept a float32 query vector on a shared client."""
+    client = QdrantClient(":memory:")
+    vs = QdrantVectorStore(collection_name="documents", client=client)
+    vecs = np.eye(3, 512, dtype=np.float32)
+    metas = [{"source_id": f"item-{i}", "chunk_ix": 0, "lang": "en"} for i in range(3)]
+    vs.insert_chunks("doc", ["a", "b", "c"], metas, vecs)
+
+    hits = vs.search(vecs[1], k=1, filters={"lang": "en"})
+
+    assert vs.client is client
+    assert [(text, meta["source_id"]) for text, meta, _ in hits] == [("b", "item-1#0")]
+
+
+def test_hybrid_store_fuses_prefetch_legs_server_side() -> None:
+    """One query_points call: filtered BM25 and dense prefetch legs fused by Qdrant."""
+    client = MagicMock()
+    client.query_points.return_value = SimpleNamespace(
+        points=[
+            ScoredPoint(
+                id=point_id("item-1"),
+                version=0,
+                score=0.5,
+                payload={"text": "b", "source_id": "item-1", "chunk_ix": 0},
+            )
+        ]
+    )
+    store = QdrantHybridStore(collection_name="faq_hybrid", fusion="rrf", client=client)
+
+    hits = store.search(
+        "reset password",
+        np.ones(4, dtype=np.float32),
+        k=3,
+        filters={"lang": "en"},
+        fusion="dbsf",
+        prefetch_k=10,
+    )
+
+    assert hits == [("b", {"text": "b", "source_id": "item-1#0", "chunk_ix": 0}, 0.5)]
+    query_filter = Filter(must=[FieldCondition(key="lang", match=MatchValue(value="en"))])
+    client.query_points.assert_called_once_with(
+        collection_name="faq_hybrid",
+        prefetch=[
+            Prefetch(
+                query=Document(text="reset password", model="Qdrant/bm25"),
+                using="bm25",
+                limit=10,
+                filter=query_filter,
+            ),
+            Prefetch(query=[1.0] * 4, using="dense", limit=10, filter=query_filter),
+        ],
+        query=FusionQuery(fusion=Fusion.DBSF),
+        limit=3,
+        with_payload=True,
+    )
+
+
+def test_compile_filter_operators_and_cache() -> None:
+    """Equality, lists, 'in' and ranges compile to one AND filter, cached by content."""
+    filters = {"lang": "en", "section": ["Rules", "Scoring"], "version": {"gte": 2, "lt": 5}}
+
+    compiled = compile_filter(filters)
+
+    assert compiled is compile_filter(dict(reversed(filters.items())))
+    conditions = {c.key: c for c in compiled.must}
+    assert conditions["lang"].match.value == "en"
+    assert conditions["section"].match.any == ["Rules", "Scoring"]
+    assert (conditions["version"].range.gte, conditions["version"].range.lt) == (2, 5)
+    assert compile_filter(None) is None
+    assert compile_filter({"source_id": {"in": ["a"]}}, {"source_id": "original_id"}).must[
+        0
+    ].key == ("original_id")
+    with pytest.raises(ValueError):
+        compile_filter({"lang": {"like": "e%"}})
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_numpy_store_topk_and_filters(tmp_path, dtype: str) -> None:
+    """The in-process index should rank by cosine and honour payload filters."""
+    vecs = np.eye(4, 8, dtype=np.float32)
+    vecs[3] += vecs[0]  # item-3 is the runner-up for a query along axis 0
+    metas = [
+        {"source_id": f"item-{i}", "chunk_ix": 0, "section": "Rules" if i % 2 else "Scoring"}
+        for i in range(4)
+    ]
+    texts = [f"text {i}" for i in range(4)]
+    store = NumpyVectorStore.build(tmp_path, "doc", texts, metas, [vecs[:3], vecs[3:]], 8, dtype)
+
+    reopened = NumpyVectorStore(tmp_path)
+    hits = reopened.search(vecs[0], k=2)
+    filtered = reopened.search(vecs[0], k=5, filters={"section": "Rules"})
+
+    assert store.vectors.dtype == np.dtype(dtype)
+    assert [meta["source_id"] for _, meta, _ in hits] == ["item-0#0", "item-3#0"]
+    assert hits[0][1]["text"] == "text 0"
+    assert hits[0][2] == pytest.approx(1.0, abs=1e-3)
+    assert [meta["source_id"] for _, meta, _ in filtered] == ["item-3#0", "item-1#0"]
+    assert reopened.search(vecs[0], filters={"section": "Missing"}) == []
+
+
+def test_numpy_store_build_swaps_versions_atomically(tmp_path) -> None:
+    """Rebuilds publish a new version directory; open stores keep their own pair."""
+    vecs = np.eye(3, 4, dtype=np.float32)
+    metas = [{"source_id": f"item-{i}"} for i in range(3)]
+    texts = [f"text {i}" for i in range(3)]
+    first = NumpyVectorStore.build(tmp_path, "doc", texts, metas, [vecs], 4)
+
+    # A build interrupted before publishing is never opened and gets cleaned up
+    (tmp_path / "v-000002").mkdir()
+    second = NumpyVectorStore.build(tmp_path, "doc", texts[:2], metas[:2], [vecs[:2]], 4)
+    third = NumpyVectorStore.build(tmp_path, "doc", texts[:1], metas[:1], [vecs[:1]], 4)
+
+    assert (tmp_path / "CURRENT").read_text() == third.version_path.name == "v-000004"
+    assert sorted(p.name for p in tmp_path.glob("v-*")) == ["v-000003", "v-000004"]
+    assert len(NumpyVectorStore(tmp_path).vectors) == 1
+    assert len(second.vectors) == len(second.payload) == 2
+    assert first.search(vecs[2], k=1)[0][1]["source_id"] == "item-2#2"
+
+
+def test_local_bm25_matches_terms_batches_and_filters(tmp_path) -> None:
+    """Local BM25 should rank by term overlap and score batches like single queries."""
+    documents = [
+        {
+            "text": "How do transfers work?",
+            "id": "a_0",
+            "original_id": "a",
+            "variant_ix": 0,
+            "section": "Rules",
+            "lang": "en",
+        },
+        {
+            "text": "What does premium cost?",
+            "id": "b_0",
+            "original_id": "b",
+            "variant_ix": 0,
+            "section": "Account",
+            "lang": "en",
+        },
+        {
+            "text": "Transfer deadline before each gameweek",
+            "id": "a_1",
+            "original_id": "a",
+            "variant_ix": 1,
+            "section": "Rules",
+            "lang": "en",
+        },
+    ]
+    LocalBM25Index.build(tmp_path, documents)
+    index = LocalBM25Index(tmp_path)
+
+    hits = index.search("transfer deadline", k=5)
+    batch = index.search_batch(["transfer deadline", "premium price"], k=5)
+
+    assert [meta["id"] for _, meta, _ in hits] == ["a_1", "a_0"]
+    assert hits[0][0] == point_id("a", 1)
+    assert batch[0] == hits
+    assert [meta["id"] for _, meta, _ in batch[1]] == ["b_0"]
+    assert index.search("transfer", filters={"section": "Account"}) == []
+    assert len(index.search("transfer", filters={"source_id": "a"})) == 2
+
+    grouped = index.search_grouped("transfer deadline premium", k=5)
+    assert [meta["source_id"] for _, meta, _ in grouped] == ["a#0", "b#0"]
+    assert grouped[0][1]["id"] == "a_1"  # best variant of item a
+
+
+def test_local_bm25_rebuild_publishes_a_new_version(tmp_path) -> None:
+    """A rebuild never touches the files an open index reads from."""
+    first = [{"text": "transfer deadline", "id": "a_0", "original_id": "a", "variant_ix": 0}]
+    second = [*first, {"text": "premium price", "id": "b_0", "original_id": "b", "variant_ix": 0}]
+    old = LocalBM25Index.build(tmp_path, first)
+    new = LocalBM25Index.build(tmp_path, second)
+
+    assert (tmp_path / "CURRENT").read_text() == new.version_path.name != old.version_path.name
+    assert not list(tmp_path.glob("*.npy"))
+    assert [meta["id"] for _, meta, _ in old.search("transfer premium")] == ["a_0"]
+    assert len(LocalBM25Index(tmp_path).search("transfer premium")) == 2
+
+
+def test_token_store_roundtrip(tmp_path) -> None:
+    """Per-document token matrices come back from the memory-mapped store by key."""
+    rng = np.random.default_rng(0)
+    matrices = [rng.standard_normal((n, 4)).astype(np.float32) for n in (3, 1, 5)]
+    TokenVectorStore.build(tmp_path, ["a#0", "b#0", "c#0"], matrices, dtype="float16")
+    store = TokenVectorStore(tmp_path)
+
+    assert len(store) == 3 and "b#0" in store and "d#0" not in store
+    assert store.tokens.dtype == np.float16
+    np.testing.assert_allclose(store.get("c#0"), matrices[2], atol=1e-2)
+    assert store.get("b#0").shape == (1, 4)
+
+
+def test_search_batch_matches_search(tmp_path) -> None:
+    """Batched dense search returns what per-query search does, for both backends."""
+    rng = np.random.default_rng(1)
+    vecs = rng.standard_normal((6, 512)).astype(np.float32)
+    texts = [f"t{i}" for i in range(6)]
+    metas = [{"source_id": f"s{i}", "chunk_ix": 0} for i in range(6)]
+    queries = rng.standard_normal((3, 512)).astype(np.float32)
+
+    numpy_store = NumpyVectorStore.build(tmp_path, "doc", texts, metas, [vecs], 512)
+    qdrant_store = QdrantVectorStore(collection_name="documents", client=QdrantClient(":memory:"))
+    qdrant_store.insert_chunks("doc", texts, metas, vecs)
+
+    for store in (numpy_store, qdrant_store):
+        batch = store.search_batch(queries, k=3)
+        assert [[h[1]["source_id"] for h in hits] for hits in batch] == [
+            [h[1]["source_id"] for h in store.search(q, k=3)] for q in queries
+        ]